@@ -0,0 +1,148 @@
+import numpy as np
+from typing import Dict, List, Tuple, Optional, Sequence, Union
+
+QUERY_CHUNK = 256
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows as float32; zero rows stay zero"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1).astype(np.float32)
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Best ``k`` columns per row of a score matrix, highest first, without a full sort"""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(np.float32)
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind='stable')
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+class EmbeddingIndex:
+    """Exact cosine similarity search over an L2-normalized float32 matrix.
+
+    Rows map to ids through ``ids`` / ``id_to_row``. A query is one
+    matrix-vector product plus ``argpartition``; batches of queries become
+    one matrix-matrix product per chunk.
+    """
+
+    def __init__(self, ids: Sequence, vectors: np.ndarray, normalized: bool = False):
+        self.ids = list(ids)
+        # Pre-normalized float32 input (e.g. a memory-mapped store) is used as is, without a copy
+        self.vectors = vectors if normalized else normalize_rows(vectors)
+        if len(self.ids) != len(self.vectors):
+            raise ValueError("ids and vectors must have the same length")
+        self.id_to_row = {player_id: row for row, player_id in enumerate(self.ids)}
+
+    @classmethod
+    def from_dict(cls, embeddings: Dict[str, np.ndarray]) -> 'EmbeddingIndex':
+        ids = list(embeddings)
+        vectors = np.stack([embeddings[player_id] for player_id in ids]) if ids else np.empty((0, 0), dtype=np.float32)
+        return cls(ids, vectors)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, player_id) -> bool:
+        return player_id in self.id_to_row
+
+    def vector(self, player_id) -> np.ndarray:
+        if player_id not in self.id_to_row:
+            raise ValueError(f"Player {player_id} not found in embeddings")
+        return self.vectors[self.id_to_row[player_id]]
+
+    def search(self, queries: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-``k`` rows and cosine scores for each query vector, shape (n_queries, k)"""
+        queries = normalize_rows(np.atleast_2d(queries))
+        rows, scores = [], []
+        for start in range(0, len(queries), QUERY_CHUNK):
+            chunk_rows, chunk_scores = _top_k(queries[start:start + QUERY_CHUNK] @ self.vectors.T, k)
+            rows.append(chunk_rows)
+            scores.append(chunk_scores)
+        if not rows:
+            return np.empty((0, k), dtype=np.int64), np.empty((0, k), dtype=np.float32)
+        return np.vstack(rows), np.vstack(scores)
+
+    def similar_batch(self, player_ids: Sequence, top_k: int = 5) -> Dict[str, List[Tuple[str, float]]]:
+        """Most similar players for several players at once, excluding each player itself"""
+        query_rows = np.array([self.id_to_row[player_id] if player_id in self.id_to_row else -1 for player_id in player_ids])
+        missing = [player_id for player_id, row in zip(player_ids, query_rows) if row < 0]
+        if missing:
+            raise ValueError(f"Player {missing[0]} not found in embeddings")
+        rows, scores = self.search(self.vectors[query_rows], top_k + 1)
+        results = {}
+        for player_id, query_row, row_list, score_list in zip(player_ids, query_rows, rows, scores):
+            keep = row_list != query_row
+            results[player_id] = [(self.ids[row], float(score))
+                                  for row, score in zip(row_list[keep][:top_k], score_list[keep][:top_k])]
+        return results
+
+    def similar(self, player_id, top_k: int = 5) -> List[Tuple[str, float]]:
+        """Most similar players to one player, excluding the player itself"""
+        return self.similar_batch([player_id], top_k)[player_id]
+
+class IVFIndex(EmbeddingIndex):
+    """Approximate search with an inverted-file index over spherical k-means cells.
+
+    Rows are grouped by nearest centroid and stored contiguously per cell; a
+    query scans only the ``n_probe`` cells whose centroids score highest, so
+    the cost per query is about ``n_probe / n_lists`` of an exact scan.
+    """
+
+    def __init__(self, ids: Sequence, vectors: np.ndarray, n_lists: Optional[int] = None,
+                 n_probe: int = 8, n_iter: int = 10, sample_size: int = 50000, random_state: int = 42):
+        super().__init__(ids, vectors)
+        n = len(self.vectors)
+        self.n_lists = max(1, min(n, n_lists or int(4 * np.sqrt(n))))
+        self.n_probe = n_probe
+        rng = np.random.RandomState(random_state)
+        self.centroids = self._train(self.vectors[rng.choice(n, min(n, sample_size), replace=False)],
+                                     n_iter, rng)
+
+        # Store each cell's rows contiguously so a probe reads one slice
+        assignment = self._assign(self.vectors)
+        self.order = np.argsort(assignment, kind='stable')
+        self.sorted_vectors = self.vectors[self.order]
+        self.offsets = np.concatenate(([0], np.cumsum(np.bincount(assignment, minlength=self.n_lists))))
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.concatenate([
+            np.argmax(vectors[start:start + 8192] @ self.centroids.T, axis=1)
+            for start in range(0, len(vectors), 8192)
+        ]) if len(vectors) else np.empty(0, dtype=np.int64)
+
+    def _train(self, sample: np.ndarray, n_iter: int, rng: np.random.RandomState) -> np.ndarray:
+        """Spherical k-means: centroids are mean directions of their cells"""
+        self.centroids = sample[rng.choice(len(sample), self.n_lists, replace=False)].copy()
+        for _ in range(n_iter):
+            assignment = self._assign(sample)
+            sums = np.zeros_like(self.centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=self.n_lists)
+            # Reseed empty cells from random sample points
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            self.centroids = normalize_rows(sums)
+        return self.centroids
+
+    def search(self, queries: np.ndarray, k: int = 5, n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top-``k`` rows and cosine scores; rows are indices into ``ids``"""
+        queries = normalize_rows(np.atleast_2d(queries))
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        cells, _ = _top_k(queries @ self.centroids.T, n_probe)
+        rows = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for i, query in enumerate(queries):
+            candidates = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in cells[i]])
+            top, top_scores = _top_k((self.sorted_vectors[candidates] @ query)[None, :], k)
+            rows[i, :top.shape[1]] = self.order[candidates[top[0]]]
+            scores[i, :top.shape[1]] = top_scores[0]
+        return rows, scores
+
+    def similar_batch(self, player_ids: Sequence, top_k: int = 5) -> Dict[str, List[Tuple[str, float]]]:
+        results = super().similar_batch(player_ids, top_k)
+        # Cells may hold fewer than k candidates; drop the unfilled slots
+        return {player_id: [(other, score) for other, score in pairs if np.isfinite(score)]
+                for player_id, pairs in results.items()}
@@ -0,0 +1,89 @@
+import os
+import json
+import shutil
+import threading
+import numpy as np
+from datetime import datetime
+from typing import Optional, Sequence
+from .embedding_index import EmbeddingIndex, normalize_rows
+
+CURRENT_FILE = "CURRENT"
+VECTORS_FILE = "embeddings.npy"
+IDS_FILE = "ids.json"
+KEEP_VERSIONS = 2
+
+def save_embeddings(directory: str, ids: Sequence, vectors: np.ndarray) -> str:
+    """Materialize normalized embeddings as a new version and switch to it atomically.
+
+    Each version is a directory with ``embeddings.npy`` and ``ids.json``;
+    the ``CURRENT`` pointer file is replaced with ``os.replace`` only after
+    both are written, so readers see either the old or the new version.
+    """
+    version = datetime.now().strftime("%Y%m%d%H%M%S%f")
+    version_dir = os.path.join(directory, version)
+    os.makedirs(version_dir, exist_ok=True)
+    np.save(os.path.join(version_dir, VECTORS_FILE), normalize_rows(vectors))
+    with open(os.path.join(version_dir, IDS_FILE), "w") as f:
+        json.dump([str(player_id) for player_id in ids], f)
+
+    tmp_path = os.path.join(directory, f"{CURRENT_FILE}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(directory, CURRENT_FILE))
+
+    # Old versions may still be mapped by running servers; keep the most recent few
+    versions = sorted(name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name)))
+    for stale in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(directory, stale), ignore_errors=True)
+    return version
+
+class EmbeddingStore:
+    """Serves an ``EmbeddingIndex`` over the memory-mapped current version of an embedding directory.
+
+    No torch is involved: the vectors were encoded at save time. ``index()``
+    checks the ``CURRENT`` pointer and swaps in a newly saved version.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.version: Optional[str] = None
+        self._index: Optional[EmbeddingIndex] = None
+        self._pointer_stat = None
+        self._lock = threading.Lock()
+
+    def _current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def refresh(self) -> bool:
+        """Load the current version if it changed since the last call; True when swapped"""
+        try:
+            stat = os.stat(os.path.join(self.directory, CURRENT_FILE))
+            pointer_stat = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except FileNotFoundError:
+            return False
+        if pointer_stat == self._pointer_stat:
+            return False
+        with self._lock:
+            if pointer_stat == self._pointer_stat:
+                return False
+            version = self._current_version()
+            if version is None or version == self.version:
+                self._pointer_stat = pointer_stat
+                return False
+            version_dir = os.path.join(self.directory, version)
+            vectors = np.load(os.path.join(version_dir, VECTORS_FILE), mmap_mode="r")
+            with open(os.path.join(version_dir, IDS_FILE)) as f:
+                ids = json.load(f)
+            self._index = EmbeddingIndex(ids, vectors, normalized=True)
+            self.version = version
+            self._pointer_stat = pointer_stat
+            return True
+
+    def index(self) -> Optional[EmbeddingIndex]:
+        """Index for the latest saved version, or None if nothing has been saved yet"""
+        self.refresh()
+        return self._index
@@ -0,0 +1,267 @@
+import os
+import hashlib
+import logging
+import queue
+import threading
+from datetime import datetime
+from typing import Dict, List, Tuple, Any, Optional
+import numpy as np
+import joblib
+
+logger = logging.getLogger(__name__)
+
+# Results stay in memory unless a cache directory is configured or passed in
+EXPLANATION_CACHE_DIR = os.getenv("EXPLANATION_CACHE_DIR")
+BACKGROUND_SIZE = int(os.getenv("SHAP_BACKGROUND_SIZE", "100"))
+MAX_EXPLAINED_ROWS = int(os.getenv("SHAP_MAX_ROWS", "5000"))
+TREE_MODEL_TYPES = ("XGBClassifier", "LGBMClassifier", "RandomForestClassifier",
+                    "ExtraTreesClassifier", "GradientBoostingClassifier", "DecisionTreeClassifier")
+
+def sample_background(X: np.ndarray, size: int = BACKGROUND_SIZE, seed: int = 0) -> np.ndarray:
+    """Uniform row sample used as the SHAP reference distribution"""
+    X = np.asarray(X, dtype=np.float64)
+    if len(X) <= size:
+        return X
+    rng = np.random.RandomState(seed)
+    return X[np.sort(rng.choice(len(X), size, replace=False))]
+
+def linear_shap_values(model: Any, X: np.ndarray, background: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Exact interventional SHAP for a linear model in log-odds space.
+
+    For f(x) = w.x + b with independent features, phi_j = w_j * (x_j - E[x_j]),
+    so no sampling is needed. Returns (values, expected_value); binary models
+    give values of shape (n_samples, n_features).
+    """
+    coef = np.atleast_2d(model.coef_)
+    mean = np.asarray(background, dtype=np.float64).mean(axis=0)
+    values = (np.asarray(X, dtype=np.float64) - mean)[:, :, None] * coef.T[None, :, :]
+    expected = mean @ coef.T + np.atleast_1d(model.intercept_)
+    if coef.shape[0] == 1:
+        return values[:, :, 0], expected[0]
+    return values, expected
+
+def tree_shap_values(model: Any, X: np.ndarray, background: np.ndarray) -> Tuple[np.ndarray, Any]:
+    """TreeExplainer SHAP for the positive class of a fitted tree ensemble"""
+    import shap
+    explainer = shap.TreeExplainer(model, data=background, feature_perturbation="interventional")
+    values = explainer.shap_values(X, check_additivity=False)
+    expected = explainer.expected_value
+    # Older shap returns one array per class, newer a trailing class axis
+    if isinstance(values, list):
+        values = values[-1]
+        expected = np.atleast_1d(expected)[-1]
+    elif values.ndim == 3:
+        values = values[:, :, -1]
+        expected = np.atleast_1d(expected)[-1]
+    return np.asarray(values, dtype=np.float64), float(np.atleast_1d(expected)[-1])
+
+def row_keys(X: np.ndarray) -> List[bytes]:
+    """Stable per-row hash of a scaled feature matrix"""
+    X = np.ascontiguousarray(np.asarray(X, dtype=np.float64) + 0.0)
+    return [hashlib.blake2b(row.tobytes(), digest_size=16).digest() for row in X]
+
+def _stack_feature_names(stacking: Any) -> List[str]:
+    names = list(stacking.named_estimators_)
+    n_outputs = stacking.final_estimator_.n_features_in_
+    if n_outputs == len(names):
+        return names
+    classes = list(stacking.classes_)
+    return [f"{name}_{cls}" for name in names for cls in classes]
+
+def head_shap_values(stacking: Any, X_scaled: np.ndarray, reference: np.ndarray) -> Dict[str, Any]:
+    """Exact linear SHAP of the stacking head for any rows, against a stored reference mean"""
+    values, expected = linear_shap_values(stacking.final_estimator_, stacking.transform(X_scaled),
+                                          np.atleast_2d(reference))
+    return {'feature_names': _stack_feature_names(stacking), 'values': values, 'expected_value': expected}
+
+def explain_stacking(stacking: Any, feature_columns: List[str], X_scaled: np.ndarray,
+                     background: np.ndarray) -> Dict[str, Any]:
+    """SHAP for a fitted StackingClassifier, picking an explainer per model type.
+
+    The LogisticRegression head is explained over the stacked base-model
+    outputs with exact linear SHAP; tree base models are explained over the
+    input features with TreeExplainer. Other base models are skipped.
+    """
+    X_scaled = np.asarray(X_scaled, dtype=np.float64)
+    result: Dict[str, Any] = {'head': None, 'base_models': {}, 'skipped': []}
+
+    # Stacking head over base-model outputs
+    head = stacking.final_estimator_
+    if hasattr(head, 'coef_'):
+        values, expected = linear_shap_values(head, stacking.transform(X_scaled), stacking.transform(background))
+        result['head'] = {
+            'explainer': 'linear',
+            'feature_names': _stack_feature_names(stacking),
+            'values': values,
+            'expected_value': expected
+        }
+    else:
+        result['skipped'].append('final_estimator')
+
+    # Tree base models over the input features
+    for name, model in stacking.named_estimators_.items():
+        if type(model).__name__ not in TREE_MODEL_TYPES:
+            result['skipped'].append(name)
+            continue
+        values, expected = tree_shap_values(model, X_scaled, background)
+        result['base_models'][name] = {
+            'explainer': 'tree',
+            'feature_names': list(feature_columns),
+            'values': values,
+            'expected_value': expected
+        }
+    return result
+
+def summarize(explanation: Dict[str, Any], feature_columns: List[str]) -> Dict[str, Any]:
+    """Global mean |SHAP| summaries from a per-row explanation"""
+    summary: Dict[str, Any] = {'base_models': {}, 'skipped': explanation['skipped']}
+    if explanation['head'] is not None:
+        head = explanation['head']
+        # Multiclass heads carry a class axis; sum it out per stacked input
+        importance = np.abs(head['values']).mean(0).reshape(len(head['feature_names']), -1).sum(1)
+        summary['head'] = {
+            'explainer': head['explainer'],
+            'expected_value': np.asarray(head['expected_value']).tolist(),
+            'importance': dict(zip(head['feature_names'], map(float, importance)))
+        }
+    normalized = []
+    for name, base in explanation['base_models'].items():
+        importance = np.abs(base['values']).mean(0)
+        summary['base_models'][name] = {
+            'explainer': base['explainer'],
+            'expected_value': base['expected_value'],
+            'importance': dict(zip(feature_columns, map(float, importance)))
+        }
+        total = importance.sum()
+        normalized.append(importance / total if total > 0 else importance)
+    # Features ranked by their average normalized share across the tree bases
+    if normalized:
+        summary['feature_importance'] = dict(zip(feature_columns, map(float, np.mean(normalized, axis=0))))
+    else:
+        summary['feature_importance'] = {}
+    return summary
+
+class ExplanationCache:
+    """Per-model-version SHAP results computed off the request path.
+
+    A single background worker explains a sampled dataset whenever a new
+    model version is scheduled; per-row values and the global summary are
+    kept in memory, and on disk when ``cache_dir`` is set, so lookups never
+    run an explainer.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = EXPLANATION_CACHE_DIR,
+                 background_size: int = BACKGROUND_SIZE, max_rows: int = MAX_EXPLAINED_ROWS):
+        self.cache_dir = cache_dir
+        self.background_size = background_size
+        self.max_rows = max_rows
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._jobs: "queue.Queue[Tuple[str, Any, np.ndarray]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self.latest_version: Optional[str] = None
+
+    def _path(self, version: str) -> Optional[str]:
+        return os.path.join(self.cache_dir, f"{version}.joblib") if self.cache_dir else None
+
+    def _entry(self, version: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(version)
+        path = self._path(version)
+        if entry is None and path is not None and os.path.exists(path):
+            entry = joblib.load(path)
+            with self._lock:
+                self._entries[version] = entry
+        return entry
+
+    def status(self, version: str) -> str:
+        """'ready', 'pending' or 'missing' for a model version"""
+        with self._lock:
+            if version in self._pending:
+                return 'pending'
+        return 'ready' if self._entry(version) is not None else 'missing'
+
+    def schedule(self, version: str, meta_model: Any, X_scaled: np.ndarray) -> bool:
+        """Queue a background explanation run unless this version is cached or queued"""
+        with self._lock:
+            self.latest_version = version
+        if self.status(version) != 'missing':
+            return False
+        with self._lock:
+            self._pending.add(version)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+        self._jobs.put((version, meta_model, np.asarray(X_scaled, dtype=np.float64)))
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until every scheduled explanation has been computed"""
+        if self._worker is None:
+            return
+        done = threading.Event()
+        self._jobs.put((None, done, None))
+        done.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            version, meta_model, X_scaled = self._jobs.get()
+            if version is None:
+                meta_model.set()
+                continue
+            try:
+                self._compute(version, meta_model, X_scaled)
+            except Exception:
+                logger.exception("SHAP explanation for model %s failed", version)
+            finally:
+                with self._lock:
+                    self._pending.discard(version)
+
+    def _compute(self, version: str, meta_model: Any, X_scaled: np.ndarray) -> None:
+        rows = sample_background(X_scaled, self.max_rows, seed=1)
+        background = sample_background(X_scaled, self.background_size)
+        explanation = explain_stacking(meta_model.meta_model, meta_model.feature_columns, rows, background)
+
+        # Per-row values: averaged tree-base SHAP in input-feature space
+        base_values = [base['values'] for base in explanation['base_models'].values()]
+        row_values = np.mean(base_values, axis=0) if base_values else np.zeros_like(rows)
+        entry = {
+            'version': version,
+            'computed_at': datetime.now().isoformat(),
+            'n_rows': len(rows),
+            'background_size': len(background),
+            'feature_columns': list(meta_model.feature_columns),
+            'summary': summarize(explanation, meta_model.feature_columns),
+            'rows': dict(zip(row_keys(rows), row_values))
+        }
+        path = self._path(version)
+        if path is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            joblib.dump(entry, tmp_path)
+            os.replace(tmp_path, path)
+        with self._lock:
+            self._entries[version] = entry
+
+    def get_summary(self, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Global summary for a version (default: the most recently scheduled)"""
+        version = version or self.latest_version
+        if version is None:
+            return None
+        entry = self._entry(version)
+        if entry is None:
+            return None
+        return {key: entry[key] for key in ('version', 'computed_at', 'n_rows', 'background_size', 'summary')}
+
+    def get_row_values(self, version: str, X_scaled: np.ndarray) -> Optional[np.ndarray]:
+        """Cached per-row SHAP values; rows that were not explained are NaN"""
+        entry = self._entry(version)
+        if entry is None:
+            return None
+        values = np.full(np.shape(X_scaled), np.nan)
+        for i, key in enumerate(row_keys(X_scaled)):
+            cached = entry['rows'].get(key)
+            if cached is not None:
+                values[i] = cached
+        return values
@@ -1,8 +1,11 @@
 import pandas as pd
 import numpy as np
 import os
-from typing import Dict, List, Tuple, Any
-import shap
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Tuple, Any, Optional
 from sklearn.ensemble import StackingClassifier, VotingClassifier
 from sklearn.preprocessing import StandardScaler
 from xgboost import XGBClassifier
@@ -13,8 +16,18 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 import joblib
 from .train_predict import train_final_model
-from .social_sentiment import get_sentiment_scores
+from .social_sentiment import read_sentiment_scores
 from .player_embeddings import get_player_embeddings
+from .explanations import EXPLANATION_CACHE_DIR, ExplanationCache, head_shap_values, sample_background
+
+DATA_PATH = os.path.join("data", "predictions_latest.csv")
+META_MODEL_DIR = os.getenv("META_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models_store"))
+META_MODEL_PATH = os.path.join(META_MODEL_DIR, "meta_model.joblib")
+# SHAP results for the meta model are stored next to it
+explanation_cache = ExplanationCache(cache_dir=EXPLANATION_CACHE_DIR or os.path.join(META_MODEL_DIR, "explanations"))
+NON_FEATURE_COLUMNS = ["actual_outcome", "game_time", "sport", "prop_type"]
+
+logger = logging.getLogger(__name__)
 
 class MetaModel:
     def __init__(self):
@@ -28,11 +41,16 @@ class MetaModel:
         }
         self.meta_model = None
         self.scaler = StandardScaler()
-        self.explainer = None
+        self.feature_columns: List[str] = []
+        self.accuracy: Optional[float] = None
+        self.data_hash: Optional[str] = None
+        self.trained_at: Optional[str] = None
+        self.stack_reference: Optional[np.ndarray] = None
         
     def train(self, X: pd.DataFrame, y: pd.Series) -> float:
         """Train the meta model with stacking and voting"""
         # Scale features
+        self.feature_columns = list(X.columns)
         X_scaled = self.scaler.fit_transform(X)
         
         # Create stacking ensemble
@@ -46,38 +64,85 @@ class MetaModel:
         # Train meta model
         self.meta_model.fit(X_scaled, y)
         
-        # Create SHAP explainer
-        self.explainer = shap.TreeExplainer(self.meta_model.final_estimator_)
+        # Mean stacked base-model output: the reference point for per-row head SHAP
+        if hasattr(self.meta_model.final_estimator_, 'coef_'):
+            self.stack_reference = self.meta_model.transform(sample_background(X_scaled)).mean(axis=0)
         
         # Calculate accuracy
         accuracy = self.meta_model.score(X_scaled, y)
+        self.accuracy = float(accuracy)
+        self.trained_at = datetime.now().isoformat()
         return accuracy
     
+    @property
+    def version(self) -> Optional[str]:
+        """Identifier of this fit, used to key cached explanations"""
+        if self.trained_at is None:
+            return None
+        stamp = self.trained_at.replace('-', '').replace(':', '').split('.')[0]
+        return f"{stamp}-{(self.data_hash or 'nodata')[:8]}"
+    
     def predict(self, X: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
         """Make predictions with confidence scores and SHAP values"""
+        X = X[self.feature_columns]
         X_scaled = self.scaler.transform(X)
         
-        # Get base model predictions
+        # Get base model predictions (the fitted clones live on the stacking model)
         base_predictions = {}
-        for name, model in self.base_models.items():
+        for name, model in self.meta_model.named_estimators_.items():
             base_predictions[name] = model.predict_proba(X_scaled)
         
         # Get meta model prediction
         meta_pred = self.meta_model.predict(X_scaled)
         meta_proba = self.meta_model.predict_proba(X_scaled)
         
-        # Calculate SHAP values
-        shap_values = self.explainer.shap_values(X_scaled)
-        
-        # Get feature importance
-        feature_importance = dict(zip(X.columns, np.abs(shap_values).mean(0)))
+        # Per-row SHAP of the linear head is exact and cheap, so every row gets it;
+        # tree-model SHAP only comes from the background explanation cache
+        shap_values, shap_feature_names = None, None
+        if self.stack_reference is not None:
+            head = head_shap_values(self.meta_model, X_scaled, self.stack_reference)
+            shap_values, shap_feature_names = head['values'], head['feature_names']
+        summary = explanation_cache.get_summary(self.version)
+        feature_importance = summary['summary']['feature_importance'] if summary else {}
         
         return meta_pred, meta_proba, {
             'base_predictions': base_predictions,
             'shap_values': shap_values,
+            'shap_feature_names': shap_feature_names,
             'feature_importance': feature_importance
         }
     
+    def save(self, path: str = META_MODEL_PATH) -> None:
+        """Save the fitted stack, scaler and training metadata"""
+        if self.meta_model is None:
+            raise ValueError("No meta model to save")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        joblib.dump({
+            'meta_model': self.meta_model,
+            'scaler': self.scaler,
+            'feature_columns': self.feature_columns,
+            'accuracy': self.accuracy,
+            'data_hash': self.data_hash,
+            'trained_at': self.trained_at,
+            'stack_reference': self.stack_reference
+        }, tmp_path)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str = META_MODEL_PATH) -> "MetaModel":
+        """Load a saved meta model; no refitting happens"""
+        artifacts = joblib.load(path)
+        model = cls()
+        model.meta_model = artifacts['meta_model']
+        model.scaler = artifacts['scaler']
+        model.feature_columns = artifacts['feature_columns']
+        model.accuracy = artifacts['accuracy']
+        model.data_hash = artifacts['data_hash']
+        model.trained_at = artifacts['trained_at']
+        model.stack_reference = artifacts.get('stack_reference')
+        return model
+    
     def calibrate_confidence(self, predictions: np.ndarray, 
                            sentiment_scores: Dict[str, float],
                            player_embeddings: Dict[str, np.ndarray]) -> np.ndarray:
@@ -102,13 +167,110 @@ class MetaModel:
         calibrated = np.clip(calibrated, 0, 1)
         return calibrated
 
+def _file_hash(path: str) -> str:
+    """Content hash of a training file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _feature_frame(df: pd.DataFrame) -> pd.DataFrame:
+    return df.drop(columns=NON_FEATURE_COLUMNS, errors='ignore')
+
+def train_meta_model(data_path: str = DATA_PATH, model_path: str = META_MODEL_PATH) -> MetaModel:
+    """Fit a MetaModel on the training CSV and save it tagged with the CSV hash"""
+    data_hash = _file_hash(data_path)
+    df = pd.read_csv(data_path)
+    meta_model = MetaModel()
+    meta_model.train(_feature_frame(df), df["actual_outcome"])
+    meta_model.data_hash = data_hash
+    meta_model.save(model_path)
+    _schedule_explanations(meta_model, df)
+    return meta_model
+
+def _schedule_explanations(meta_model: MetaModel, df: pd.DataFrame) -> None:
+    """Queue background SHAP for this model version on its training data"""
+    if df.empty:
+        return
+    X_scaled = meta_model.scaler.transform(_feature_frame(df)[meta_model.feature_columns])
+    explanation_cache.schedule(meta_model.version, meta_model, X_scaled)
+
+def ensure_explanations(meta_model: MetaModel, data_path: str = DATA_PATH) -> bool:
+    """Queue background SHAP for a model version that has none cached; True if queued or running"""
+    status = explanation_cache.status(meta_model.version)
+    if status == 'missing' and os.path.exists(data_path):
+        _schedule_explanations(meta_model, pd.read_csv(data_path))
+        status = explanation_cache.status(meta_model.version)
+    return status == 'pending'
+
+# Process-wide MetaModel: loaded once, swapped in place by the background refit
+# 'failed_hash' is the CSV content whose last refit raised; it is not retried until the data changes
+_meta_state: Dict[str, Any] = {'model': None, 'file_stamp': None, 'failed_hash': None}
+_meta_lock = threading.Lock()
+_refit_thread: Optional[threading.Thread] = None
+
+def _refit_in_background(data_path: str, model_path: str, data_hash: str) -> None:
+    try:
+        meta_model = train_meta_model(data_path, model_path)
+        with _meta_lock:
+            _meta_state['model'] = meta_model
+            _meta_state['failed_hash'] = None
+    except Exception:
+        logger.exception("MetaModel background refit failed for %s (sha256 %s); not retrying until it changes",
+                         data_path, data_hash[:12])
+        with _meta_lock:
+            _meta_state['failed_hash'] = data_hash
+
+def _schedule_refit_if_stale(data_path: str, model_path: str) -> None:
+    """Start a background refit when the training CSV content has changed"""
+    global _refit_thread
+    if not os.path.exists(data_path):
+        return
+    stat = os.stat(data_path)
+    file_stamp = (stat.st_mtime_ns, stat.st_size)
+    with _meta_lock:
+        # Only re-hash when the file metadata moved
+        if _meta_state['file_stamp'] == file_stamp:
+            return
+        _meta_state['file_stamp'] = file_stamp
+        current = _meta_state['model']
+        data_hash = _file_hash(data_path)
+        if current is not None and current.data_hash == data_hash:
+            return
+        if _meta_state['failed_hash'] == data_hash:
+            return
+        if _refit_thread is not None and _refit_thread.is_alive():
+            # Let the running refit finish, then check again on the next call
+            _meta_state['file_stamp'] = None
+            return
+        _refit_thread = threading.Thread(
+            target=_refit_in_background, args=(data_path, model_path, data_hash), daemon=True
+        )
+        _refit_thread.start()
+
+def get_meta_model(data_path: str = DATA_PATH, model_path: str = META_MODEL_PATH) -> MetaModel:
+    """Return the process-wide MetaModel, loading it from disk on first use"""
+    with _meta_lock:
+        if _meta_state['model'] is None:
+            if os.path.exists(model_path):
+                _meta_state['model'] = MetaModel.load(model_path)
+                ensure_explanations(_meta_state['model'], data_path)
+            elif os.path.exists(data_path):
+                # First run with no saved artifacts: train once synchronously
+                _meta_state['model'] = train_meta_model(data_path, model_path)
+            else:
+                raise ValueError(f"No saved meta model at {model_path} and no training data at {data_path}")
+    _schedule_refit_if_stale(data_path, model_path)
+    return _meta_state['model']
+
 def predict_optimal_lineup(sport: str = None, 
                          confidence_threshold: float = 0.7,
                          time_window: str = None,
                          prop_type: str = None) -> Tuple[pd.DataFrame, float, Dict[str, Any]]:
     """Get predictions with all smart features integrated"""
     # Load latest predictions
-    df = pd.read_csv(os.path.join("data", "predictions_latest.csv")) if os.path.exists("data/predictions_latest.csv") else pd.DataFrame()
+    df = pd.read_csv(DATA_PATH) if os.path.exists(DATA_PATH) else pd.DataFrame()
     
     # Apply filters
     if sport:
@@ -118,17 +280,16 @@ def predict_optimal_lineup(sport: str = None,
     if prop_type:
         df = df[df['prop_type'] == prop_type]
     
-    # Initialize and train meta model
-    meta_model = MetaModel()
-    X = df.drop(columns=["actual_outcome", "game_time", "sport", "prop_type"], errors='ignore')
-    y = df["actual_outcome"]
-    accuracy = meta_model.train(X, y)
+    # Pure inference against the persisted meta model
+    meta_model = get_meta_model()
+    accuracy = meta_model.accuracy
+    X = _feature_frame(df)
     
     # Get predictions with confidence
     predictions, probabilities, metadata = meta_model.predict(X)
     
     # Get sentiment scores
-    sentiment_scores = get_sentiment_scores(df['teams'].tolist())
+    sentiment_scores = read_sentiment_scores(df['teams'].tolist())
     
     # Get player embeddings
     player_embeddings = get_player_embeddings(df['players'].tolist())
@@ -150,4 +311,4 @@ def predict_optimal_lineup(sport: str = None,
     df["predicted_outcome"] = predictions
     df["confidence"] = calibrated_probs
     
-    return df, accuracy, metadata
\ No newline at end of file
+    return df, accuracy, metadata
@@ -1,13 +1,20 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Any, Optional, Union
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 import torch
 import torch.nn as nn
-from torch.utils.data import Dataset, DataLoader
 import os
 import json
+import time
+from .embedding_index import EmbeddingIndex
+from .embedding_store import save_embeddings
+
+# Intra-op threads for embedding training; unset keeps torch's default
+NUM_THREADS = int(os.getenv("EMBEDDING_NUM_THREADS", "0")) or None
+# Player stats carry one row per player and match; rows are keyed (and averaged) by this column
+ID_COLUMN = 'player_id'
 
 class PlayerEmbeddingModel(nn.Module):
     def __init__(self, input_dim: int, embedding_dim: int = 32):
@@ -21,19 +28,20 @@ class PlayerEmbeddingModel(nn.Module):
             nn.Dropout(0.2),
             nn.Linear(64, embedding_dim)
         )
-        
-    def forward(self, x):
+        self.decoder = nn.Sequential(
+            nn.Linear(embedding_dim, 64),
+            nn.ReLU(),
+            nn.Linear(64, 128),
+            nn.ReLU(),
+            nn.Linear(128, input_dim)
+        )
+    
+    def encode(self, x):
         return self.encoder(x)
-
-class PlayerDataset(Dataset):
-    def __init__(self, features: np.ndarray):
-        self.features = torch.FloatTensor(features)
         
-    def __len__(self):
-        return len(self.features)
-    
-    def __getitem__(self, idx):
-        return self.features[idx]
+    def forward(self, x):
+        """Reconstruct the input through the embedding bottleneck"""
+        return self.decoder(self.encoder(x))
 
 class PlayerEmbeddings:
     def __init__(self, embedding_dim: int = 32):
@@ -41,98 +49,181 @@ class PlayerEmbeddings:
         self.scaler = StandardScaler()
         self.model = None
         self.feature_names = None
+        self.history: Dict[str, Any] = {}
         
-    def prepare_features(self, player_data: pd.DataFrame) -> np.ndarray:
-        """Prepare and normalize player features"""
-        # Select numerical features
-        numerical_cols = player_data.select_dtypes(include=[np.number]).columns
-        self.feature_names = numerical_cols.tolist()
+    def prepare_features(self, player_data: pd.DataFrame, fit: bool = True) -> np.ndarray:
+        """Prepare and normalize player features; ``fit=False`` reuses the trained columns and scaler"""
+        if fit:
+            # Select numerical features
+            numerical_cols = player_data.select_dtypes(include=[np.number]).columns
+            self.feature_names = numerical_cols.drop(ID_COLUMN, errors='ignore').tolist()
         
         # Handle missing values
-        features = player_data[numerical_cols].fillna(0)
+        features = player_data.reindex(columns=self.feature_names).fillna(0)
         
         # Scale features
-        scaled_features = self.scaler.fit_transform(features)
-        return scaled_features
+        if fit:
+            return self.scaler.fit_transform(features)
+        return self.scaler.transform(features)
     
-    def train_model(self, player_data: pd.DataFrame, epochs: int = 100, batch_size: int = 32):
-        """Train the embedding model"""
-        # Prepare features
-        features = self.prepare_features(player_data)
+    def train_model(self, player_data: pd.DataFrame, epochs: int = 100, batch_size: int = 256,
+                    learning_rate: float = 1e-3, patience: int = 10, min_delta: float = 1e-4,
+                    validation_split: float = 0.1, num_threads: Optional[int] = NUM_THREADS,
+                    checkpoint_path: Optional[str] = None, verbose: bool = True,
+                    random_state: int = 42) -> Dict[str, Any]:
+        """Train the encoder/decoder on reconstruction loss.
         
-        # Create dataset and dataloader
-        dataset = PlayerDataset(features)
-        dataloader = DataLoader(dataset, batch_size=batch_size, shuffle=True)
+        Features live in one float32 tensor; each epoch permutes it once and
+        slices contiguous batches, so there is no per-item Dataset overhead.
+        Training stops after ``patience`` epochs without a ``min_delta``
+        improvement in validation reconstruction loss and keeps the best
+        weights. With ``checkpoint_path`` the best state is written there and
+        an existing checkpoint is resumed from.
+        """
+        # Prepare features
+        features = torch.from_numpy(np.ascontiguousarray(self.prepare_features(player_data), dtype=np.float32))
+        generator = torch.Generator().manual_seed(random_state)
+        order = torch.randperm(len(features), generator=generator)
+        n_val = int(len(features) * validation_split) if len(features) >= 10 else 0
+        train_features, val_features = features[order[n_val:]], features[order[:n_val]]
         
         # Initialize model
         self.model = PlayerEmbeddingModel(features.shape[1], self.embedding_dim)
-        optimizer = torch.optim.Adam(self.model.parameters())
+        optimizer = torch.optim.Adam(self.model.parameters(), lr=learning_rate)
         criterion = nn.MSELoss()
         
-        # Training loop
-        self.model.train()
-        for epoch in range(epochs):
-            total_loss = 0
-            for batch in dataloader:
-                optimizer.zero_grad()
-                output = self.model(batch)
-                loss = criterion(output, batch)  # Autoencoder reconstruction loss
-                loss.backward()
-                optimizer.step()
-                total_loss += loss.item()
-            
-            if (epoch + 1) % 10 == 0:
-                print(f"Epoch [{epoch+1}/{epochs}], Loss: {total_loss/len(dataloader):.4f}")
+        start_epoch = 0
+        best_loss = float('inf')
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            checkpoint = torch.load(checkpoint_path)
+            if checkpoint['feature_names'] == self.feature_names:
+                self.model.load_state_dict(checkpoint['model_state'])
+                optimizer.load_state_dict(checkpoint['optimizer_state'])
+                start_epoch, best_loss = checkpoint['epoch'] + 1, checkpoint['best_loss']
+        best_state = {k: v.clone() for k, v in self.model.state_dict().items()}
+        
+        previous_threads = torch.get_num_threads()
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        history: Dict[str, Any] = {'train_loss': [], 'val_loss': [], 'best_epoch': start_epoch - 1}
+        epochs_without_improvement = 0
+        n_samples = 0
+        started = time.perf_counter()
+        try:
+            for epoch in range(start_epoch, epochs):
+                # Training loop
+                self.model.train()
+                shuffled = train_features[torch.randperm(len(train_features), generator=generator)]
+                total_loss = 0.0
+                for batch in torch.split(shuffled, batch_size):
+                    optimizer.zero_grad(set_to_none=True)
+                    loss = criterion(self.model(batch), batch)
+                    loss.backward()
+                    optimizer.step()
+                    total_loss += loss.item() * len(batch)
+                n_samples += len(shuffled)
+                train_loss = total_loss / len(shuffled)
+                
+                # Early stopping on held-out reconstruction loss
+                if n_val:
+                    self.model.eval()
+                    with torch.inference_mode():
+                        val_loss = criterion(self.model(val_features), val_features).item()
+                else:
+                    val_loss = train_loss
+                history['train_loss'].append(train_loss)
+                history['val_loss'].append(val_loss)
+                
+                if val_loss < best_loss - min_delta:
+                    best_loss = val_loss
+                    history['best_epoch'] = epoch
+                    epochs_without_improvement = 0
+                    best_state = {k: v.clone() for k, v in self.model.state_dict().items()}
+                    if checkpoint_path:
+                        self._save_checkpoint(checkpoint_path, optimizer, epoch, best_loss)
+                else:
+                    epochs_without_improvement += 1
+                
+                if verbose and (epoch + 1) % 10 == 0:
+                    print(f"Epoch [{epoch+1}/{epochs}], Loss: {train_loss:.4f}, Val Loss: {val_loss:.4f}")
+                if epochs_without_improvement >= patience:
+                    if verbose:
+                        print(f"Early stopping at epoch {epoch+1}; best epoch {history['best_epoch']+1}")
+                    break
+        finally:
+            torch.set_num_threads(previous_threads)
+        
+        elapsed = time.perf_counter() - started
+        self.model.load_state_dict(best_state)
+        self.model.eval()
+        history['best_loss'] = best_loss
+        history['samples_per_sec'] = n_samples / elapsed if elapsed > 0 else 0.0
+        self.history = history
+        return history
     
-    def get_embeddings(self, player_data: pd.DataFrame) -> Dict[str, np.ndarray]:
-        """Generate embeddings for players"""
+    def _save_checkpoint(self, path: str, optimizer: torch.optim.Optimizer, epoch: int, best_loss: float):
+        """Write the current training state atomically"""
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        torch.save({
+            'model_state': self.model.state_dict(),
+            'optimizer_state': optimizer.state_dict(),
+            'feature_names': self.feature_names,
+            'epoch': epoch,
+            'best_loss': best_loss
+        }, tmp_path)
+        os.replace(tmp_path, path)
+    
+    def encode(self, player_data: pd.DataFrame) -> np.ndarray:
+        """Embedding matrix for players, one row per row of ``player_data``"""
         if self.model is None:
             raise ValueError("Model must be trained before generating embeddings")
         
-        # Prepare features
-        features = self.prepare_features(player_data)
+        # Prepare features with the columns and scaler fit during training
+        features = self.prepare_features(player_data, fit=False)
         
-        # Generate embeddings
         self.model.eval()
-        with torch.no_grad():
-            embeddings = self.model(torch.FloatTensor(features)).numpy()
+        with torch.inference_mode():
+            return self.model.encode(torch.from_numpy(features.astype(np.float32))).numpy()
+    
+    def player_vectors(self, player_data: pd.DataFrame) -> Tuple[pd.Index, np.ndarray]:
+        """Player ids and one embedding per player, averaged over that player's rows.
         
-        # Create player to embedding mapping
-        player_embeddings = {}
-        for idx, player_id in enumerate(player_data.index):
-            player_embeddings[player_id] = embeddings[idx]
+        Ids come from the ``player_id`` column, or from the index when there is none.
+        """
+        embeddings = self.encode(player_data)
+        ids = player_data[ID_COLUMN] if ID_COLUMN in player_data.columns else player_data.index
+        codes, players = pd.factorize(ids)
+        if len(players) == len(codes):
+            return players, embeddings
+        return players, pd.DataFrame(embeddings).groupby(codes).mean().to_numpy(dtype=embeddings.dtype)
+    
+    def get_embeddings(self, player_data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Generate embeddings for players"""
+        players, embeddings = self.player_vectors(player_data)
         
-        return player_embeddings
+        # Create player to embedding mapping
+        return dict(zip(players, embeddings))
     
-    def get_similar_players(self, player_id: str, player_embeddings: Dict[str, np.ndarray], 
+    def get_similar_players(self, player_id: str, player_embeddings: Union[Dict[str, np.ndarray], EmbeddingIndex],
                           top_k: int = 5) -> List[Tuple[str, float]]:
-        """Find similar players based on embedding similarity"""
-        if player_id not in player_embeddings:
-            raise ValueError(f"Player {player_id} not found in embeddings")
-        
-        # Get target player embedding
-        target_embedding = player_embeddings[player_id]
-        
-        # Calculate similarities
-        similarities = []
-        for pid, embedding in player_embeddings.items():
-            if pid != player_id:
-                similarity = np.dot(target_embedding, embedding) / (
-                    np.linalg.norm(target_embedding) * np.linalg.norm(embedding)
-                )
-                similarities.append((pid, similarity))
-        
-        # Sort by similarity and return top k
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return similarities[:top_k]
+        """Find similar players by cosine similarity; pass an ``EmbeddingIndex`` to reuse it across queries"""
+        index = player_embeddings if isinstance(player_embeddings, EmbeddingIndex) else EmbeddingIndex.from_dict(player_embeddings)
+        return index.similar(player_id, top_k)
     
-    def save_model(self, path: str):
-        """Save model and scaler"""
+    def materialize_embeddings(self, player_data: pd.DataFrame, path: str) -> str:
+        """Write embeddings for ``player_data`` to the memory-mapped store served by the API"""
+        players, embeddings = self.player_vectors(player_data)
+        return save_embeddings(os.path.join(path, 'index'), players, embeddings)
+    
+    def save_model(self, path: str, player_data: Optional[pd.DataFrame] = None):
+        """Save model and scaler, and materialize embeddings for ``player_data`` if given"""
         if self.model is None:
             raise ValueError("No model to save")
         
         # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.makedirs(path, exist_ok=True)
         
         # Save model state
         torch.save({
@@ -144,6 +235,10 @@ class PlayerEmbeddings:
         # Save scaler
         import joblib
         joblib.dump(self.scaler, f"{path}/scaler.joblib")
+        
+        # Switch the served embeddings only once the model they came from is on disk
+        if player_data is not None:
+            self.materialize_embeddings(player_data, path)
     
     def load_model(self, path: str):
         """Load model and scaler"""
@@ -154,7 +249,9 @@ class PlayerEmbeddings:
         
         # Initialize and load model
         self.model = PlayerEmbeddingModel(len(self.feature_names), self.embedding_dim)
-        self.model.load_state_dict(checkpoint['model_state'])
+        # Models saved before the decoder existed only carry encoder weights
+        self.model.load_state_dict(checkpoint['model_state'], strict=False)
+        self.model.eval()
         
         # Load scaler
         import joblib
@@ -172,6 +269,6 @@ def generate_player_embeddings(player_data: pd.DataFrame,
     player_embeddings = embeddings.get_embeddings(player_data)
     
     # Save model
-    embeddings.save_model(model_path)
+    embeddings.save_model(model_path, player_data)
     
     return player_embeddings 
\ No newline at end of file
@@ -0,0 +1,160 @@
+import os
+import math
+import logging
+import time
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+DECAY_HOURS = float(os.getenv('SENTIMENT_DECAY_HOURS', '24'))
+FLUSH_SIZE = int(os.getenv('SENTIMENT_FLUSH_SIZE', '50'))
+FLUSH_SECONDS = float(os.getenv('SENTIMENT_FLUSH_SECONDS', '60'))
+
+# Posts decayed below this weight are forgotten by the duplicate filter
+MIN_WEIGHT = 1e-3
+
+def post_value(post: Dict) -> float:
+    """Combined post score in [-1, 1]: 0.4 VADER + 0.6 transformer"""
+    return post['vader_score'] * 0.4 + post['transformer_score'] * 0.6
+
+def post_key(post: Dict) -> tuple:
+    return (post.get('title'), post['text'], post['created_at'])
+
+def neutral_snapshot(team: str) -> Dict[str, Any]:
+    return {'team': team, 'overall_score': 0.5, 'confidence': 0.0, 'volume': 0, 'updated_at': None}
+
+class _TeamState:
+    """Decayed sums for one team, all expressed at time ``t_ref``"""
+    __slots__ = ('t_ref', 'weight', 'total', 'squares', 'seen', 'prune_at')
+
+    def __init__(self):
+        self.t_ref: Optional[float] = None
+        self.weight = 0.0
+        self.total = 0.0
+        self.squares = 0.0
+        self.seen: Dict[tuple, float] = {}
+        self.prune_at = 1024
+
+class SentimentAggregator:
+    """Streaming per-team time-decayed sentiment.
+
+    Each team keeps the decayed weight, weighted sum and weighted sum of
+    squares at a reference time; a post of age ``a`` enters with weight
+    ``exp(-a / decay_hours)``, so an update is O(1) and the score, variance and
+    effective volume at any later time come from rescaling the three sums.
+    Updated teams are queued as snapshots and written to ``store`` in batches.
+    """
+
+    def __init__(self, decay_hours: float = DECAY_HOURS, store=None, flush_size: int = FLUSH_SIZE,
+                 flush_seconds: float = FLUSH_SECONDS, source: str = 'combined'):
+        self.tau = decay_hours * 3600
+        self.store = store
+        self.flush_size = flush_size
+        self.flush_seconds = flush_seconds
+        self.source = source
+        self._states: Dict[str, _TeamState] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def teams(self) -> List[str]:
+        with self._lock:
+            return list(self._states)
+
+    def track(self, teams: Iterable[str]):
+        """Register teams so the poller starts fetching them"""
+        with self._lock:
+            for team in teams:
+                self._states.setdefault(team, _TeamState())
+
+    def _advance(self, state: _TeamState, t: float):
+        """Move the reference time forward to ``t``, decaying the sums"""
+        if state.t_ref is None:
+            state.t_ref = t
+        elif t > state.t_ref:
+            decay = math.exp(-(t - state.t_ref) / self.tau)
+            state.weight *= decay
+            state.total *= decay
+            state.squares *= decay
+            state.t_ref = t
+
+    def add(self, team: str, value: float, created_at: float, key: Optional[tuple] = None) -> bool:
+        """Add one scored post (``created_at`` as a POSIX timestamp); False if already seen"""
+        with self._lock:
+            return self._add(self._states.setdefault(team, _TeamState()), value, created_at, key)
+
+    def _add(self, state: _TeamState, value: float, created_at: float, key: Optional[tuple]) -> bool:
+        if key is not None:
+            if key in state.seen:
+                return False
+            state.seen[key] = created_at
+        self._advance(state, created_at)
+        weight = math.exp(-(state.t_ref - created_at) / self.tau)
+        state.weight += weight
+        state.total += weight * value
+        state.squares += weight * value * value
+        return True
+
+    def update(self, team: str, posts: List[Dict], now: Optional[float] = None) -> Dict[str, Any]:
+        """Add a poll's scored posts for a team, queue its snapshot and flush when due"""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._states.setdefault(team, _TeamState())
+            for post in posts:
+                created_at = post['created_at']
+                created_at = created_at.timestamp() if isinstance(created_at, datetime) else float(created_at)
+                self._add(state, post_value(post), created_at, post_key(post))
+            # Forget keys whose posts no longer carry weight; doubling keeps this amortized O(1)
+            if len(state.seen) >= state.prune_at:
+                horizon = now + self.tau * math.log(MIN_WEIGHT)
+                state.seen = {key: t for key, t in state.seen.items() if t >= horizon}
+                state.prune_at = max(1024, 2 * len(state.seen))
+            snapshot = self._snapshot(team, state, now)
+            self._pending[team] = snapshot
+        if self._flush_due():
+            self.flush()
+        return snapshot
+
+    def _snapshot(self, team: str, state: _TeamState, now: float) -> Dict[str, Any]:
+        if state.t_ref is None or state.weight <= 0:
+            return neutral_snapshot(team)
+        mean = state.total / state.weight
+        std = math.sqrt(max(state.squares / state.weight - mean * mean, 0.0))
+        decay = math.exp(-max(now - state.t_ref, 0.0) / self.tau)
+        return {
+            'team': team,
+            'overall_score': (mean + 1) / 2,  # Normalize to [0, 1]
+            'confidence': 1 - min(std, 1),  # Lower std = higher confidence
+            'volume': int(round(state.weight * decay)),  # Decayed post count
+            'updated_at': datetime.fromtimestamp(now),
+        }
+
+    def snapshot(self, team: str, now: Optional[float] = None) -> Dict[str, Any]:
+        """Current score for a team; neutral if nothing has been seen for it"""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._states.get(team)
+            return self._snapshot(team, state, now) if state is not None else neutral_snapshot(team)
+
+    def _flush_due(self) -> bool:
+        return len(self._pending) >= self.flush_size or time.monotonic() - self._last_flush >= self.flush_seconds
+
+    def flush(self) -> int:
+        """Write queued snapshots to the store in one batch; returns the number written"""
+        with self._lock:
+            pending, self._pending = list(self._pending.values()), {}
+            self._last_flush = time.monotonic()
+        if not pending or self.store is None:
+            return 0
+        try:
+            self.store.write_snapshots(pending, self.source)
+        except Exception:
+            logger.exception("Sentiment snapshot flush failed")
+            # Keep the snapshots for the next flush unless newer ones replaced them
+            with self._lock:
+                for snapshot in pending:
+                    self._pending.setdefault(snapshot['team'], snapshot)
+            return 0
+        return len(pending)
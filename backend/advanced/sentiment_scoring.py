@@ -0,0 +1,75 @@
+import os
+import time
+import numpy as np
+from typing import Dict, List, Any, Sequence, Union
+
+BATCH_SIZE = int(os.getenv('SENTIMENT_BATCH_SIZE', '32'))
+MAX_LENGTH = int(os.getenv('SENTIMENT_MAX_LENGTH', '512'))
+
+def transformer_scores(transformer, texts: Sequence[str], batch_size: int = BATCH_SIZE,
+                       max_length: int = MAX_LENGTH) -> np.ndarray:
+    """Signed transformer scores (positive label -> +score, else -score) in sized batches.
+
+    Texts are ordered by length before batching so each forward pass pads to
+    similar lengths, and truncated to the model's ``max_length``; scores are
+    returned in the input order.
+    """
+    scores = np.zeros(len(texts), dtype=np.float32)
+    if not len(texts):
+        return scores
+    order = np.argsort([len(text) for text in texts], kind='stable')
+    outputs = transformer([texts[i] for i in order], batch_size=batch_size,
+                          truncation=True, max_length=max_length)
+    signed = [output['score'] if output['label'] == 'POSITIVE' else -output['score'] for output in outputs]
+    scores[order] = signed
+    return scores
+
+def vader_scores(vader, texts: Sequence[str]) -> np.ndarray:
+    """VADER compound scores for a list of texts in one pass"""
+    polarity_scores = vader.polarity_scores
+    return np.fromiter((polarity_scores(text)['compound'] for text in texts), dtype=np.float32, count=len(texts))
+
+def score_texts(texts: Sequence[str], transformer, vader, batch_size: int = BATCH_SIZE,
+                max_length: int = MAX_LENGTH, topics: Union[str, Sequence[str], None] = None,
+                dedup=None) -> Dict[str, Any]:
+    """Score texts with both models; identical texts (reposts, retweets) are scored once.
+
+    With a ``DuplicateFilter`` as ``dedup``, near duplicates within each topic,
+    including ones scored on earlier polls, reuse the stored scores instead.
+    """
+    start = time.perf_counter()
+    if dedup is not None and len(texts):
+        def scorer(unique: List[str]) -> np.ndarray:
+            return np.column_stack([vader_scores(vader, unique),
+                                    transformer_scores(transformer, unique, batch_size, max_length)])
+        
+        filtered = dedup.score(topics if topics is not None else '', texts, scorer)
+        vader_all, transformer_all = filtered['scores'][:, 0], filtered['scores'][:, 1]
+        unique_count = filtered['scored']
+    else:
+        positions: Dict[str, int] = {}
+        inverse = np.array([positions.setdefault(text, len(positions)) for text in texts], dtype=np.int64)
+        unique = list(positions)
+        vader_all = vader_scores(vader, unique)[inverse]
+        transformer_all = transformer_scores(transformer, unique, batch_size, max_length)[inverse]
+        unique_count = len(unique)
+    seconds = time.perf_counter() - start
+    return {
+        'vader_score': vader_all,
+        'transformer_score': transformer_all,
+        'posts': len(texts),
+        'unique': unique_count,
+        'saved': len(texts) - unique_count,
+        'seconds': seconds,
+        'posts_per_sec': len(texts) / seconds if seconds > 0 else 0.0,
+    }
+
+def score_posts(posts: List[Dict], texts: Sequence[str], transformer, vader,
+                batch_size: int = BATCH_SIZE, max_length: int = MAX_LENGTH,
+                topics: Union[str, Sequence[str], None] = None, dedup=None) -> Dict[str, Any]:
+    """Fill ``vader_score`` / ``transformer_score`` on fetched posts; returns throughput stats"""
+    scored = score_texts(texts, transformer, vader, batch_size, max_length, topics, dedup)
+    for post, vader_score, transformer_score in zip(posts, scored['vader_score'], scored['transformer_score']):
+        post['vader_score'] = float(vader_score)
+        post['transformer_score'] = float(transformer_score)
+    return {key: scored[key] for key in ('posts', 'unique', 'saved', 'seconds', 'posts_per_sec')}
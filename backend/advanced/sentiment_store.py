@@ -0,0 +1,75 @@
+import os
+import threading
+import psycopg2
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from typing import Dict, List, Any, Optional
+
+POOL_MAX_CONNECTIONS = int(os.getenv('SENTIMENT_DB_POOL_SIZE', '4'))
+
+class SentimentStore:
+    """Batched writes and latest-snapshot reads for the ``social_sentiment`` table"""
+
+    def __init__(self, **connect_kwargs):
+        self.connect_kwargs = connect_kwargs or {
+            'host': os.getenv('DB_HOST'),
+            'port': os.getenv('DB_PORT'),
+            'user': os.getenv('DB_USER'),
+            'password': os.getenv('DB_PASSWORD'),
+            'dbname': os.getenv('DB_NAME'),
+        }
+        self._pool: Optional[ThreadedConnectionPool] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ThreadedConnectionPool:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadedConnectionPool(1, POOL_MAX_CONNECTIONS, **self.connect_kwargs)
+            return self._pool
+
+    def write_snapshots(self, snapshots: List[Dict[str, Any]], source: str = 'combined'):
+        """Insert many team snapshots in one statement; teams missing from ``teams`` are skipped"""
+        pool = self._get_pool()
+        conn = pool.getconn()
+        try:
+            with conn, conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO social_sentiment (team_id, sentiment_score, confidence, volume, source, created_at)
+                    SELECT t.id, v.score, v.confidence, v.volume, v.source, v.created_at
+                    FROM (VALUES %s) AS v(team, score, confidence, volume, source, created_at)
+                    JOIN teams t ON t.name = v.team
+                """, [
+                    (s['team'], float(s['overall_score']), float(s['confidence']), int(s['volume']),
+                     source, s['updated_at'])
+                    for s in snapshots
+                ], template="(%s, %s::float, %s::float, %s::integer, %s, %s::timestamp)")
+        finally:
+            pool.putconn(conn)
+
+    def latest(self, teams: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Most recent snapshot per team for the given team names"""
+        pool = self._get_pool()
+        conn = pool.getconn()
+        try:
+            with conn, conn.cursor() as cur:
+                cur.execute("""
+                    SELECT DISTINCT ON (t.name) t.name, s.sentiment_score, s.confidence, s.volume, s.created_at
+                    FROM social_sentiment s
+                    JOIN teams t ON t.id = s.team_id
+                    WHERE t.name = ANY(%s)
+                    ORDER BY t.name, s.created_at DESC
+                """, (list(teams),))
+                rows = cur.fetchall()
+        finally:
+            pool.putconn(conn)
+        return {
+            name: {'team': name, 'overall_score': score, 'confidence': confidence,
+                   'volume': volume, 'updated_at': created_at}
+            for name, score, confidence, volume, created_at in rows
+        }
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
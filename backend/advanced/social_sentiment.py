@@ -2,12 +2,29 @@ import tweepy
 import praw
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Any, Optional, Sequence, Union
 from textblob import TextBlob
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from transformers import pipeline
 import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from .sentiment_scoring import score_posts, BATCH_SIZE, MAX_LENGTH
+from .sentiment_aggregator import SentimentAggregator
+from .sentiment_store import SentimentStore
+from .text_dedup import DuplicateFilter
+
+logger = logging.getLogger(__name__)
+
+# In-flight API requests allowed per platform during a multi-team fan-out
+TWITTER_CONCURRENCY = int(os.getenv('TWITTER_CONCURRENCY', '8'))
+REDDIT_CONCURRENCY = int(os.getenv('REDDIT_CONCURRENCY', '4'))
+REDDIT_SUBREDDIT = 'sportsbetting'
+SENTIMENT_POLL_SECONDS = float(os.getenv('SENTIMENT_POLL_SECONDS', '300'))
+SENTIMENT_TEAMS = [team.strip() for team in os.getenv('SENTIMENT_TEAMS', '').split(',') if team.strip()]
 
 class SocialSentimentAnalyzer:
     def __init__(self):
@@ -32,9 +49,18 @@ class SocialSentimentAnalyzer:
         # Initialize sentiment analyzers
         self.vader = SentimentIntensityAnalyzer()
         self.transformer = pipeline('sentiment-analysis')
+        self.batch_size = BATCH_SIZE
+        self.max_length = MAX_LENGTH
+        self.scoring_stats: Dict[str, Any] = {}
+        # Per-topic near-duplicate index, kept across polls
+        self.dedup = DuplicateFilter()
         
-    def get_twitter_sentiment(self, query: str, count: int = 100) -> List[Dict]:
-        """Get sentiment from Twitter"""
+        # tweepy and praw are blocking clients; fan-outs run them on a dedicated pool
+        self._executor = ThreadPoolExecutor(max_workers=TWITTER_CONCURRENCY + REDDIT_CONCURRENCY,
+                                            thread_name_prefix='sentiment-fetch')
+        
+    def fetch_twitter_posts(self, query: str, count: int = 100) -> List[Dict]:
+        """Fetch tweets without scoring them"""
         tweets = []
         try:
             # Search tweets
@@ -44,53 +70,97 @@ class SocialSentimentAnalyzer:
                 lang="en",
                 tweet_mode="extended"
             ).items(count):
-                # Get sentiment scores
-                vader_score = self.vader.polarity_scores(tweet.full_text)
-                transformer_score = self.transformer(tweet.full_text)[0]
-                
                 tweets.append({
                     'text': tweet.full_text,
-                    'created_at': tweet.created_at,
-                    'vader_score': vader_score['compound'],
-                    'transformer_score': transformer_score['score'] if transformer_score['label'] == 'POSITIVE' else -transformer_score['score']
+                    'created_at': tweet.created_at
                 })
         except Exception as e:
             print(f"Twitter API error: {e}")
         
         return tweets
     
-    def get_reddit_sentiment(self, subreddit: str, query: str, limit: int = 100) -> List[Dict]:
-        """Get sentiment from Reddit"""
+    def fetch_reddit_posts(self, subreddit: str, query: str, limit: int = 100) -> List[Dict]:
+        """Fetch Reddit submissions without scoring them"""
         posts = []
         try:
             # Search subreddit
             for submission in self.reddit.subreddit(subreddit).search(query, limit=limit):
-                # Get sentiment scores
-                vader_score = self.vader.polarity_scores(submission.title + " " + submission.selftext)
-                transformer_score = self.transformer(submission.title + " " + submission.selftext)[0]
-                
                 posts.append({
                     'title': submission.title,
                     'text': submission.selftext,
                     'created_at': datetime.fromtimestamp(submission.created_utc),
-                    'score': submission.score,
-                    'vader_score': vader_score['compound'],
-                    'transformer_score': transformer_score['score'] if transformer_score['label'] == 'POSITIVE' else -transformer_score['score']
+                    'score': submission.score
                 })
         except Exception as e:
             print(f"Reddit API error: {e}")
         
         return posts
     
+    def score_posts(self, posts: List[Dict], topics: Union[str, Sequence[str], None] = None) -> List[Dict]:
+        """Score fetched posts in one batched pass and record throughput in ``scoring_stats``.
+
+        Near duplicates of posts already scored for the same topic reuse those scores.
+        """
+        # Reddit posts are scored on title plus body, tweets on their text
+        texts = [post['title'] + " " + post['text'] if 'title' in post else post['text'] for post in posts]
+        self.scoring_stats = score_posts(posts, texts, self.transformer, self.vader,
+                                         self.batch_size, self.max_length, topics, self.dedup)
+        if posts:
+            logger.debug("Scored %d posts (%d run through inference, %d near duplicates) at %.1f posts/sec",
+                         self.scoring_stats['posts'], self.scoring_stats['unique'],
+                         self.scoring_stats['saved'], self.scoring_stats['posts_per_sec'])
+        return posts
+    
+    def get_twitter_sentiment(self, query: str, count: int = 100) -> List[Dict]:
+        """Get sentiment from Twitter"""
+        return self.score_posts(self.fetch_twitter_posts(query, count), query)
+    
+    def get_reddit_sentiment(self, subreddit: str, query: str, limit: int = 100) -> List[Dict]:
+        """Get sentiment from Reddit"""
+        return self.score_posts(self.fetch_reddit_posts(subreddit, query, limit), query)
+    
     def aggregate_sentiment(self, team: str) -> Dict[str, float]:
         """Aggregate sentiment from both platforms"""
-        # Get data from both platforms
-        twitter_data = self.get_twitter_sentiment(team)
-        reddit_data = self.get_reddit_sentiment('sportsbetting', team)
+        # Fetch from both platforms, then score everything in one batched pass
+        return self.summarize(self.score_posts(
+            self.fetch_twitter_posts(team) + self.fetch_reddit_posts(REDDIT_SUBREDDIT, team), team
+        ))
+    
+    async def fetch_scored_posts_many(self, teams: List[str]) -> Dict[str, List[Dict]]:
+        """Scored posts per team, with concurrent fetches and one scoring pass.
+
+        Fetches for every team start together, capped per platform by
+        ``TWITTER_CONCURRENCY`` / ``REDDIT_CONCURRENCY``, so a slate costs about
+        one team's fetch latency.
+        """
+        teams = list(dict.fromkeys(teams))
+        loop = asyncio.get_running_loop()
+        twitter_limit = asyncio.Semaphore(TWITTER_CONCURRENCY)
+        reddit_limit = asyncio.Semaphore(REDDIT_CONCURRENCY)
         
-        # Combine all data
-        all_data = twitter_data + reddit_data
+        async def fetch(limit: asyncio.Semaphore, fetcher, *args) -> List[Dict]:
+            async with limit:
+                return await loop.run_in_executor(self._executor, fetcher, *args)
         
+        fetched = await asyncio.gather(
+            *[fetch(twitter_limit, self.fetch_twitter_posts, team) for team in teams],
+            *[fetch(reddit_limit, self.fetch_reddit_posts, REDDIT_SUBREDDIT, team) for team in teams]
+        )
+        team_posts = [twitter + reddit for twitter, reddit in zip(fetched[:len(teams)], fetched[len(teams):])]
+        
+        # Score the whole slate at once; inference is CPU-bound, keep it off the event loop
+        await loop.run_in_executor(None, self.score_posts, [post for posts in team_posts for post in posts],
+                                   [team for team, posts in zip(teams, team_posts) for _ in posts])
+        return dict(zip(teams, team_posts))
+    
+    async def aggregate_sentiment_many(self, teams: List[str]) -> Dict[str, Dict[str, float]]:
+        """Aggregate sentiment for several teams from one concurrent fetch and scoring pass"""
+        team_posts = await self.fetch_scored_posts_many(teams)
+        return {team: self.summarize(posts) for team, posts in team_posts.items()}
+    
+    @staticmethod
+    def summarize(all_data: List[Dict]) -> Dict[str, float]:
+        """Time-decayed score, confidence and volume for scored posts"""
         if not all_data:
             return {
                 'overall_score': 0.5,
@@ -123,13 +193,82 @@ class SocialSentimentAnalyzer:
             'volume': volume
         }
 
+_analyzer: Optional[SocialSentimentAnalyzer] = None
+_analyzer_lock = threading.Lock()
+
+def get_analyzer() -> SocialSentimentAnalyzer:
+    """Return the process-wide analyzer, loading the pipeline and API clients on first use"""
+    global _analyzer
+    with _analyzer_lock:
+        if _analyzer is None:
+            _analyzer = SocialSentimentAnalyzer()
+        return _analyzer
+
+_aggregator: Optional[SentimentAggregator] = None
+
+def get_aggregator() -> SentimentAggregator:
+    """Return the process-wide streaming aggregator, persisting to the database when configured"""
+    global _aggregator
+    with _analyzer_lock:
+        if _aggregator is None:
+            _aggregator = SentimentAggregator(store=SentimentStore() if os.getenv('DB_NAME') else None)
+            _aggregator.track(SENTIMENT_TEAMS)
+        return _aggregator
+
+def _update_teams(aggregator: SentimentAggregator, team_posts: Dict[str, List[Dict]]):
+    for team, posts in team_posts.items():
+        aggregator.update(team, posts)
+
+async def poll_sentiment(interval: float = SENTIMENT_POLL_SECONDS):
+    """Background loop feeding newly fetched posts for tracked teams into the aggregator"""
+    aggregator = get_aggregator()
+    while True:
+        teams = aggregator.teams()
+        if teams:
+            try:
+                team_posts = await get_analyzer().fetch_scored_posts_many(teams)
+                # update() may flush snapshots to the database; keep that off the event loop
+                await asyncio.to_thread(_update_teams, aggregator, team_posts)
+            except Exception:
+                logger.exception("Sentiment poll failed")
+        await asyncio.sleep(interval)
+
+def read_sentiment(teams: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Precomputed sentiment per team: in-process aggregate, else latest stored snapshot, else neutral.
+
+    Never calls Twitter/Reddit; teams without data are tracked so the poller picks them up.
+    """
+    teams = list(dict.fromkeys(teams))
+    aggregator = get_aggregator()
+    sentiments = {team: aggregator.snapshot(team) for team in teams}
+    missing = [team for team, sentiment in sentiments.items() if sentiment['updated_at'] is None]
+    if missing and aggregator.store is not None:
+        try:
+            sentiments.update(aggregator.store.latest(missing))
+        except Exception:
+            logger.warning("Sentiment snapshot read failed; serving in-process values", exc_info=True)
+    aggregator.track(missing)
+    return sentiments
+
+async def read_sentiment_async(teams: List[str]) -> Dict[str, Dict[str, Any]]:
+    """``read_sentiment`` for async callers; the stored-snapshot fallback is a blocking database read"""
+    return await asyncio.to_thread(read_sentiment, teams)
+
+def read_sentiment_scores(teams: List[str]) -> Dict[str, float]:
+    """Precomputed overall scores for multiple teams"""
+    return {team: sentiment['overall_score'] for team, sentiment in read_sentiment(teams).items()}
+
+async def get_sentiment_scores_async(teams: List[str]) -> Dict[str, float]:
+    """Get sentiment scores for multiple teams concurrently"""
+    sentiments = await get_analyzer().aggregate_sentiment_many(teams)
+    return {team: sentiment['overall_score'] for team, sentiment in sentiments.items()}
+
 def get_sentiment_scores(teams: List[str]) -> Dict[str, float]:
     """Get sentiment scores for multiple teams"""
-    analyzer = SocialSentimentAnalyzer()
-    scores = {}
-    
-    for team in teams:
-        sentiment = analyzer.aggregate_sentiment(team)
-        scores[team] = sentiment['overall_score']
-    
-    return scores 
\ No newline at end of file
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(get_sentiment_scores_async(teams))
+    # Called from inside an event loop (e.g. a sync helper in an async route): run on a fresh loop
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, get_sentiment_scores_async(teams)).result()
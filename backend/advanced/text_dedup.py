@@ -0,0 +1,182 @@
+import re
+import zlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Sequence, Callable, Union
+
+NUM_PERM = 64
+BANDS = 16
+THRESHOLD = 0.7
+CAPACITY = 20000
+
+# Universal hashing modulo the Mersenne prime 2^31 - 1 keeps a * x + b inside uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_URL = re.compile(r"https?://\S+|www\.\S+")
+_RETWEET = re.compile(r"^rt\s+@\w+:?\s*")
+_MENTION = re.compile(r"[@#](\w+)")
+_NON_WORD = re.compile(r"[^a-z0-9']+")
+
+def normalize_text(text: str) -> str:
+    """Lowercase and drop retweet prefixes, links, @/# markers and punctuation"""
+    text = _RETWEET.sub("", text.lower().strip())
+    text = _MENTION.sub(r"\1", _URL.sub(" ", text))
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+def shingle_hashes(text: str, size: int = 3) -> np.ndarray:
+    """CRC32 hashes of word ``size``-grams of the normalized text"""
+    words = normalize_text(text).split()
+    shingles = [" ".join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))]
+    return np.array([zlib.crc32(shingle.encode()) for shingle in shingles], dtype=np.uint64) % _PRIME
+
+def _permutations(num_perm: int, seed: int):
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, int(_PRIME), size=num_perm).astype(np.uint64)
+    b = rng.randint(0, int(_PRIME), size=num_perm).astype(np.uint64)
+    return a[:, None], b[:, None]
+
+def minhash_signatures(texts: Sequence[str], num_perm: int = NUM_PERM, seed: int = 1) -> np.ndarray:
+    """MinHash signatures, shape (len(texts), num_perm), from one pass over all shingles"""
+    if not len(texts):
+        return np.empty((0, num_perm), dtype=np.uint64)
+    hashes = [shingle_hashes(text) for text in texts]
+    offsets = np.cumsum([0] + [len(h) for h in hashes[:-1]])
+    a, b = _permutations(num_perm, seed)
+    permuted = (a * np.concatenate(hashes)[None, :] + b) % _PRIME
+    return np.minimum.reduceat(permuted, offsets, axis=1).T
+
+class NearDuplicateIndex:
+    """Banded LSH over MinHash signatures with a bounded, insertion-ordered item store.
+
+    Signatures are split into ``bands`` bands; items sharing any band bucket
+    are candidates and are confirmed when the estimated Jaccard similarity
+    (fraction of equal signature slots) reaches ``threshold``. The oldest
+    items are evicted beyond ``capacity``.
+    """
+
+    def __init__(self, threshold: float = THRESHOLD, num_perm: int = NUM_PERM, bands: int = BANDS,
+                 capacity: int = CAPACITY):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.capacity = capacity
+        self._buckets: List[Dict[bytes, set]] = [{} for _ in range(bands)]
+        self._items: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._items
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def query(self, signature: np.ndarray) -> Optional[int]:
+        """Id of the most similar stored item at or above ``threshold``, or None"""
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(key, ()))
+        best, best_similarity = None, self.threshold
+        for item_id in candidates:
+            similarity = float(np.mean(self._items[item_id]['signature'] == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = item_id, similarity
+        return best
+
+    def add(self, signature: np.ndarray, value: Any = None) -> int:
+        item_id = self._next_id
+        self._next_id += 1
+        keys = self._band_keys(signature)
+        for bucket, key in zip(self._buckets, keys):
+            bucket.setdefault(key, set()).add(item_id)
+        self._items[item_id] = {'signature': signature, 'keys': keys, 'value': value}
+        while len(self._items) > self.capacity:
+            old_id, old = self._items.popitem(last=False)
+            for bucket, key in zip(self._buckets, old['keys']):
+                members = bucket[key]
+                members.discard(old_id)
+                if not members:
+                    del bucket[key]
+        return item_id
+
+    def value(self, item_id: int) -> Any:
+        return self._items[item_id]['value']
+
+    def set_value(self, item_id: int, value: Any):
+        if item_id in self._items:
+            self._items[item_id]['value'] = value
+
+class DuplicateFilter:
+    """Per-topic near-duplicate filtering in front of a batch scorer.
+
+    Each topic keeps its own LSH index across calls. A text whose near
+    duplicate was already scored (in this call or an earlier poll) reuses that
+    score instead of going through inference, so copies keep their weight but
+    cost nothing.
+    """
+
+    def __init__(self, threshold: float = THRESHOLD, num_perm: int = NUM_PERM, bands: int = BANDS,
+                 capacity: int = CAPACITY, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.capacity = capacity
+        self.seed = seed
+        self._indexes: Dict[str, NearDuplicateIndex] = {}
+        self._lock = threading.Lock()
+
+    def index(self, topic: str) -> NearDuplicateIndex:
+        if topic not in self._indexes:
+            self._indexes[topic] = NearDuplicateIndex(self.threshold, self.num_perm, self.bands, self.capacity)
+        return self._indexes[topic]
+
+    def score(self, topics: Union[str, Sequence[str]], texts: Sequence[str],
+              scorer: Callable[[List[str]], np.ndarray]) -> Dict[str, Any]:
+        """Scores for ``texts`` with ``scorer`` run only on texts that have no scored near duplicate.
+
+        ``scorer`` maps a list of texts to an array with one row (or value) per
+        text. Returns the per-text ``scores``, a ``new`` mask of texts with no
+        earlier near duplicate, and ``texts``/``scored``/``saved`` counts.
+        """
+        topics = [topics] * len(texts) if isinstance(topics, str) else list(topics)
+        signatures = minhash_signatures(texts, self.num_perm, self.seed)
+        with self._lock:
+            # Resolve every text to an index entry, adding unseen ones as pending
+            entries, pending = [], []
+            for topic, signature in zip(topics, signatures):
+                index = self.index(topic)
+                item_id = index.query(signature)
+                if item_id is None:
+                    item_id = index.add(signature)
+                    pending.append((index, item_id, len(entries)))
+                entries.append((index, item_id))
+
+        new_scores = np.asarray(scorer([texts[position] for _, _, position in pending])) if pending else None
+        with self._lock:
+            for row, (index, item_id, _) in enumerate(pending):
+                index.set_value(item_id, new_scores[row])
+            values = [index.value(item_id) if item_id in index else None for index, item_id in entries]
+            for row, (_, _, position) in enumerate(pending):
+                values[position] = new_scores[row]
+        # Duplicates of entries evicted or still being scored by a concurrent call are scored here
+        missing = [position for position, value in enumerate(values) if value is None]
+        if missing:
+            for position, value in zip(missing, np.asarray(scorer([texts[i] for i in missing]))):
+                values[position] = value
+                index, item_id = entries[position]
+                with self._lock:
+                    if item_id in index and index.value(item_id) is None:
+                        index.set_value(item_id, value)
+        is_new = np.zeros(len(texts), dtype=bool)
+        is_new[[position for _, _, position in pending]] = True
+        return {
+            'scores': np.array(values) if values else np.empty(0),
+            'new': is_new,
+            'texts': len(texts),
+            'scored': len(pending) + len(missing),
+            'saved': len(texts) - len(pending) - len(missing),
+        }
@@ -7,23 +7,42 @@ from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier,
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.preprocessing import StandardScaler
-from sklearn.feature_selection import RFE
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 from xgboost import XGBClassifier
-from skopt import BayesSearchCV
 import xgboost as xgb
 import lightgbm as lgb
 from sklearn.calibration import CalibratedClassifierCV
 import os
-from typing import Dict, List, Tuple, Optional
+import time
+from typing import Dict, List, Tuple, Optional, Any
 from datetime import datetime
 
+try:
+    from ..model_training.hyperparameter_tuning import HyperparameterTuner
+    from ..model_training.feature_selection import FeatureSelector
+    from ..model_training.rolling_features import rolling_features
+    from ..model_training import dataset
+    from ..model_evaluation.cross_validation import CrossValidator
+except ImportError:  # imported as top-level ``advanced`` with backend/ on sys.path
+    from model_training.hyperparameter_tuning import HyperparameterTuner
+    from model_training.feature_selection import FeatureSelector
+    from model_training.rolling_features import rolling_features
+    from model_training import dataset
+    from model_evaluation.cross_validation import CrossValidator
+
+try:
+    from sklearn.frozen import FrozenEstimator
+except ImportError:  # scikit-learn < 1.6 calibrates fitted models with cv='prefit'
+    FrozenEstimator = None
+
 class ModelTrainer:
     def __init__(self, model_dir: str = "models"):
         self.model_dir = model_dir
         self.scaler = StandardScaler()
         self.models = {}
         self.feature_importance = {}
+        # Shared folds with out-of-fold predictions cached next to the models
+        self.validator = CrossValidator(n_splits=5, cache_dir=os.path.join(model_dir, "oof_cache"))
         os.makedirs(model_dir, exist_ok=True)
     
     def prepare_features(self, data: pd.DataFrame, target_col: str) -> Tuple[np.ndarray, np.ndarray]:
@@ -66,24 +85,65 @@ class ModelTrainer:
             # Store model and feature importance
             self.models[name] = model
             self.feature_importance[name] = dict(zip(data.drop(columns=[target_col]).columns,
-                                                   model.feature_importances_))
+                                                   map(float, model.feature_importances_)))
             
             # Update best model
             if score > best_score:
                 best_score = score
                 best_model_name = name
         
-        # Calibrate best model
+        # Calibrate best model on its out-of-fold predictions; the fold fits run in parallel and are
+        # cached, and the model already fit on X_train is reused instead of five calibration refits
         best_model = self.models[best_model_name]
-        calibrated_model = CalibratedClassifierCV(best_model, cv=5)
-        calibrated_model.fit(X_train, y_train)
-        self.models['calibrated'] = calibrated_model
+        self.models['calibrated'] = self.validator.calibrate(best_model, X_train, y_train, fitted=best_model)
         
         # Save models and scaler
         self.save_models()
         
         return best_model_name, best_score
     
+    def update_models(self, new_data: pd.DataFrame, target_col: str, n_new_estimators: int = 20,
+                      holdout_size: float = 0.2) -> Tuple[str, float]:
+        """Continue the loaded ensembles on new rows instead of refitting from scratch.
+        
+        Boosted models add ``n_new_estimators`` rounds on top of the existing
+        trees, RandomForest adds that many trees fit on the new rows. The
+        fitted scaler is reused so existing splits stay valid. The most
+        recent ``holdout_size`` of ``new_data`` (rows are taken in order) is
+        held out to pick the best model and recalibrate it.
+        """
+        base_names = [name for name in ('rf', 'gb', 'xgb', 'lgb') if name in self.models]
+        if not base_names:
+            raise ValueError("No trained models to update. Train or load models first.")
+        if target_col not in new_data.columns or new_data.empty:
+            raise ValueError(f"New data must be non-empty and contain '{target_col}'")
+        
+        X = self.scaler.transform(new_data.drop(columns=[target_col]))
+        y = new_data[target_col].values
+        n_holdout = max(1, int(len(y) * holdout_size))
+        if n_holdout >= len(y):
+            raise ValueError("Not enough new rows to hold out a calibration set")
+        X_train, X_holdout = X[:-n_holdout], X[-n_holdout:]
+        y_train, y_holdout = y[:-n_holdout], y[-n_holdout:]
+        
+        best_score = -1.0
+        best_model_name = None
+        feature_names = new_data.drop(columns=[target_col]).columns
+        for name in base_names:
+            model = _continue_training(self.models[name], X_train, y_train, n_new_estimators)
+            score = accuracy_score(y_holdout, model.predict(X_holdout))
+            self.models[name] = model
+            self.feature_importance[name] = dict(zip(feature_names, map(float, model.feature_importances_)))
+            if score > best_score:
+                best_score = score
+                best_model_name = name
+        
+        # Recalibrate the best model on the recent holdout only
+        self.models['calibrated'] = _calibrate_prefit(self.models[best_model_name], X_holdout, y_holdout)
+        
+        self.save_models()
+        return best_model_name, best_score
+    
     def predict(self, data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
         """Make predictions using the calibrated model"""
         if 'calibrated' not in self.models:
@@ -130,6 +190,31 @@ class ModelTrainer:
             with open(importance_path, 'r') as f:
                 self.feature_importance = json.load(f)
 
+def _continue_training(model: Any, X: np.ndarray, y: np.ndarray, n_new_estimators: int) -> Any:
+    """Grow a fitted ensemble by n_new_estimators on (X, y), keeping its existing trees"""
+    if isinstance(model, lgb.LGBMClassifier):
+        params = {**model.get_params(), 'n_estimators': n_new_estimators}
+        return lgb.LGBMClassifier(**params).fit(X, y, init_model=model.booster_)
+    if isinstance(model, xgb.XGBClassifier):
+        params = {**model.get_params(), 'n_estimators': n_new_estimators}
+        return xgb.XGBClassifier(**params).fit(X, y, xgb_model=model.get_booster())
+    if isinstance(model, (RandomForestClassifier, GradientBoostingClassifier)):
+        missing = set(model.classes_) - set(np.unique(y))
+        if isinstance(model, RandomForestClassifier) and missing:
+            # New trees must see every class so their votes line up with the old ones
+            raise ValueError(f"New data is missing classes {sorted(missing)}; run a full retrain")
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + n_new_estimators)
+        model.fit(X, y)
+        model.set_params(warm_start=False)
+        return model
+    raise ValueError(f"Cannot continue training a {type(model).__name__}")
+
+def _calibrate_prefit(model: Any, X: np.ndarray, y: np.ndarray) -> CalibratedClassifierCV:
+    """Fit only the calibration map of an already trained model"""
+    if FrozenEstimator is not None:
+        return CalibratedClassifierCV(FrozenEstimator(model)).fit(X, y)
+    return CalibratedClassifierCV(model, cv='prefit').fit(X, y)
+
 def train_final_model(data: pd.DataFrame, target_col: str, model_dir: str = "models") -> ModelTrainer:
     """Train the final model and return the trainer"""
     trainer = ModelTrainer(model_dir=model_dir)
@@ -151,40 +236,38 @@ def predict_outcomes(data: pd.DataFrame, model_dir: str = "models") -> pd.DataFr
     
     return data
 
-def load_data(path="backend/data/predictions_latest.csv"):
-    df = pd.read_csv(path)
-    return df
+def load_data(path="backend/data/predictions_latest.csv", columns=None):
+    # Read the downcast Parquet copy of the CSV, converting it on first use
+    return dataset.load(path, columns=columns)
 
 def time_series_features(df, window=5):
     if len(df) < window:
         df['avg_goals_last_5'] = np.nan
         df['win_streak'] = 0
         return df
-    df = df.sort_values(["team", "match_date"])
-    df['avg_goals_last_5'] = (
-        df.groupby('team')['goals']
-          .rolling(window=window, min_periods=1)
-          .mean()
-          .reset_index(level=0, drop=True)
-    )
-    df['win_streak'] = 0
+    # One sorted, vectorized pass; ``win`` (1 = win, 0 = loss) feeds a run-length win streak
+    df = df.sort_values(["team", "match_date"], kind="mergesort")
+    result = np.where(df['win'] > 0, 1, -1) if 'win' in df.columns else np.zeros(len(df))
+    features = rolling_features(df.assign(result=result), 'team', 'match_date', ['goals'],
+                                windows=[window], ewm_spans=[], result_col='result')
+    df['avg_goals_last_5'] = features[f'goals_mean_{window}']
+    df['win_streak'] = features['win_streak']
     return df
 
 def recursive_elimination(X, y):
-    model = RandomForestClassifier(n_estimators=100)
-    rfe = RFE(model, n_features_to_select=10)
-    X_rfe = rfe.fit_transform(X, y)
-    return X_rfe
+    # Geometric RFE: drops 30% of the remaining features per round, importances cached by data hash.
+    # Nothing is written here: callers that serve this selection persist it with selector.save()
+    X = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X, columns=[f"feature_{i}" for i in range(X.shape[1])])
+    selector = FeatureSelector(method='rfe', n_features_to_select=10)
+    selected = selector.select_features(X, y)
+    return X[selected].values, selector
 
-def bayesian_optimize(X, y):
-    model = XGBClassifier(eval_metric='logloss', use_label_encoder=False)
-    search = BayesSearchCV(
-        model,
-        {"max_depth": (3, 10), "learning_rate": (0.01, 0.3, 'log-uniform')},
-        n_iter=20, cv=3
-    )
-    search.fit(X, y)
-    return search.best_estimator_
+def optimize_hyperparameters(X, y, model_dir: Optional[str] = None):
+    # Successive halving over a process pool; journaled under model_dir so an interrupted search resumes
+    journal_path = os.path.join(model_dir, "tuning_journal.sqlite") if model_dir else None
+    tuner = HyperparameterTuner(estimator='xgb', n_candidates=20, cv=3, journal_path=journal_path)
+    tuner.tune(X, y, {"max_depth": (3, 10), "learning_rate": (0.01, 0.3, 'log-uniform')})
+    return tuner.best_estimator(X, y)
 
 if __name__ == "__main__":
     train_final_model()
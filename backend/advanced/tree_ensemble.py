@@ -0,0 +1,583 @@
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.calibration import CalibratedClassifierCV
+
+# Per-node missing value handling
+MISSING_NONE = 0
+MISSING_ZERO = 1
+MISSING_NAN = 2
+ZERO_THRESHOLD = 1e-35  # LightGBM's kZeroThreshold
+
+
+class _TreeArrays:
+    """Node arrays for one tree; leaves have feature == -1"""
+
+    def __init__(self, feature, threshold, left, right, value,
+                 default_left=None, missing_type=None):
+        n_nodes = len(feature)
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        self.value = np.asarray(value, dtype=np.float64).reshape(n_nodes, -1)
+        self.default_left = (np.zeros(n_nodes, dtype=bool) if default_left is None
+                             else np.asarray(default_left, dtype=bool))
+        self.missing_type = (np.full(n_nodes, MISSING_NONE, dtype=np.int8) if missing_type is None
+                             else np.asarray(missing_type, dtype=np.int8))
+
+    @property
+    def depth(self) -> int:
+        depth = np.zeros(len(self.feature), dtype=np.int32)
+        # Parents always precede children in the layouts built below
+        for node in range(len(self.feature)):
+            if self.feature[node] >= 0:
+                depth[self.left[node]] = depth[node] + 1
+                depth[self.right[node]] = depth[node] + 1
+        return int(depth.max())
+
+
+class FlatTreeEnsemble:
+    """A fitted tree ensemble compiled to flat NumPy node arrays.
+
+    All trees are concatenated into single ``feature``/``threshold``/
+    ``left``/``right``/``value`` arrays. ``predict_proba`` walks every tree
+    for every row at once, one tree level per step, dropping (row, tree)
+    pairs as they reach a leaf. Leaf values are then combined the way the
+    source library does, so the probabilities match the native
+    ``predict_proba``.
+    """
+
+    def __init__(self, kind: str, trees: List[_TreeArrays], classes: np.ndarray,
+                 n_features: int, n_outputs: int, strict_less: bool = False,
+                 input_dtype: type = np.float64, tree_output: Optional[np.ndarray] = None,
+                 base_margin: Optional[np.ndarray] = None, learning_rate: float = 1.0,
+                 link: str = 'identity', sigmoid_scale: float = 1.0, loss: Any = None):
+        self.kind = kind
+        self.classes_ = np.asarray(classes)
+        self.n_features = n_features
+        self.n_outputs = n_outputs
+        self.n_trees = len(trees)
+        self.strict_less = strict_less
+        self.input_dtype = input_dtype
+        self.base_margin = base_margin
+        self.learning_rate = learning_rate
+        self.link = link
+        self.sigmoid_scale = sigmoid_scale
+        self.loss = loss
+        # Output column each tree adds to (boosted models with one tree per class)
+        self.tree_output = (np.zeros(self.n_trees, dtype=np.int32) if tree_output is None
+                            else np.asarray(tree_output, dtype=np.int32))
+
+        offsets = np.cumsum([0] + [len(t.feature) for t in trees])
+        self.roots = offsets[:-1].astype(np.int64)
+        self.feature = np.concatenate([t.feature for t in trees])
+        self.threshold = np.concatenate([t.threshold for t in trees])
+        self.left = np.concatenate([t.left + off for t, off in zip(trees, offsets)]).astype(np.int64)
+        self.right = np.concatenate([t.right + off for t, off in zip(trees, offsets)]).astype(np.int64)
+        self.value = np.concatenate([t.value for t in trees])
+        self.default_left = np.concatenate([t.default_left for t in trees])
+        self.missing_type = np.concatenate([t.missing_type for t in trees])
+        self.max_depth = max(t.depth for t in trees)
+
+        self.is_leaf = self.feature < 0
+        self._has_zero_missing = bool((self.missing_type == MISSING_ZERO).any())
+        self._nan_as_zero = kind == 'lgb'
+
+    ARRAY_FIELDS = ('roots', 'feature', 'threshold', 'left', 'right', 'value',
+                    'default_left', 'missing_type', 'is_leaf', 'tree_output')
+
+    def export(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """Split into small picklable state and the large node arrays"""
+        state = {k: v for k, v in self.__dict__.items() if k not in self.ARRAY_FIELDS}
+        state['__class__'] = type(self).__name__
+        arrays = {k: getattr(self, k) for k in self.ARRAY_FIELDS}
+        return state, arrays
+
+    @classmethod
+    def restore(cls, state: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> "FlatTreeEnsemble":
+        """Rebuild from export(); arrays may be read-only memory maps"""
+        flat = cls.__new__(cls)
+        flat.__dict__.update({k: v for k, v in state.items() if k != '__class__'})
+        for k in cls.ARRAY_FIELDS:
+            setattr(flat, k, arrays[k])
+        return flat
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Global leaf index reached in every tree, shape (n_samples, n_trees)"""
+        return self._leaf_indices(X).T
+
+    def _leaf_indices(self, X: np.ndarray) -> np.ndarray:
+        """Tree-major leaf indices, shape (n_trees, n_samples)"""
+        idx = None
+        for idx, _, _, _ in self._walk(X):
+            pass
+        return idx.reshape(self.n_trees, -1)
+
+    def _walk(self, X: np.ndarray):
+        """Descend every (tree, row) pair one level per step.
+
+        Yields ``(idx, active, node, child)`` after each level: the cursor
+        array, the flat (tree * n_samples + row) positions that moved, and
+        the node each moved from and to. The final ``idx`` holds leaves.
+        """
+        X = np.ascontiguousarray(X, dtype=self.input_dtype)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected input with {self.n_features} features, got shape {X.shape}")
+        n_samples = X.shape[0]
+        check_missing = self._has_zero_missing or bool(np.isnan(X).any())
+        X_flat = X.ravel()
+
+        # One (tree, row) cursor per entry; pairs that reached a leaf drop out of the active set
+        idx = np.repeat(self.roots, n_samples)
+        row_offset = np.tile(np.arange(n_samples, dtype=np.int64) * self.n_features, self.n_trees)
+        active = np.arange(idx.size)
+        empty = np.empty(0, dtype=np.int64)
+        yield idx, empty, empty, empty
+
+        for _ in range(self.max_depth):
+            node = idx[active]
+            internal = ~self.is_leaf[node]
+            active = active[internal]
+            if active.size == 0:
+                break
+            node = node[internal]
+            x = X_flat[row_offset[active] + self.feature[node]]
+            threshold = self.threshold[node]
+            go_left = x < threshold if self.strict_less else x <= threshold
+            if check_missing:
+                missing_type = self.missing_type[node]
+                nan = np.isnan(x)
+                if self._nan_as_zero:
+                    # LightGBM treats NaN as 0.0 unless the split tracks NaN explicitly
+                    x = np.where(nan & (missing_type != MISSING_NAN), 0.0, x)
+                    nan = np.isnan(x)
+                    go_left = x < threshold if self.strict_less else x <= threshold
+                missing = ((missing_type == MISSING_NAN) & nan) | \
+                          ((missing_type == MISSING_ZERO) & (np.abs(x) <= ZERO_THRESHOLD))
+                go_left = np.where(missing, self.default_left[node], go_left)
+            child = np.where(go_left, self.left[node], self.right[node])
+            idx[active] = child
+            yield idx, active, node, child
+
+    def _tree_scale(self) -> float:
+        """Factor each tree's leaf value is multiplied by in raw_predict"""
+        if self.kind == 'rf':
+            return 1.0 / self.n_trees
+        if self.kind == 'gb':
+            return self.learning_rate
+        return 1.0
+
+    def contributions(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Path decomposition of raw_predict into a bias and per-feature deltas.
+
+        Every split a row passes through moves its prediction from the
+        node's value to the child's; that delta is credited to the split
+        feature. Returns ``(bias, contribs)`` of shapes (n_outputs,) and
+        (n_samples, n_features, n_outputs) with
+        ``bias + contribs.sum(axis=1) == raw_predict(X)`` up to rounding.
+        """
+        n_samples = np.shape(X)[0]
+        scale = self._tree_scale()
+        width = self.value.shape[1]
+        flat = np.zeros(n_samples * self.n_features * self.n_outputs, dtype=np.float64)
+
+        for _, active, node, child in self._walk(X):
+            if active.size == 0:
+                continue
+            delta = (self.value[child] - self.value[node]) * scale
+            tree, row = np.divmod(active, n_samples)
+            cell = (row * self.n_features + self.feature[node]) * self.n_outputs
+            if width == self.n_outputs:
+                for k in range(width):
+                    flat += np.bincount(cell + k, weights=delta[:, k], minlength=flat.size)
+            else:
+                flat += np.bincount(cell + self.tree_output[tree], weights=delta[:, 0], minlength=flat.size)
+
+        # Bias: base margin plus every tree's root value, in the tree's output column
+        root_values = self.value[self.roots] * scale
+        bias = np.zeros(self.n_outputs) if self.base_margin is None else \
+            np.array(np.broadcast_to(self.base_margin, (self.n_outputs,)), dtype=np.float64)
+        if width == self.n_outputs:
+            bias += root_values.sum(axis=0)
+        else:
+            np.add.at(bias, self.tree_output, root_values[:, 0])
+        return bias, flat.reshape(n_samples, self.n_features, self.n_outputs)
+
+    def raw_predict(self, X: np.ndarray) -> np.ndarray:
+        """Aggregated leaf values before the output link, shape (n_samples, n_outputs)"""
+        leaf_values = self.value[self._leaf_indices(X)]  # (n_trees, n_samples, width)
+        n_samples = leaf_values.shape[1]
+
+        if self.kind == 'rf':
+            # Sequential sum of per-tree class distributions, as in sklearn
+            out = np.zeros((n_samples, self.n_outputs), dtype=np.float64)
+            for t in range(self.n_trees):
+                out += leaf_values[t]
+            out /= self.n_trees
+            return out
+
+        if self.kind == 'xgb':
+            # XGBoost accumulates margins in float32
+            out = np.broadcast_to(self.base_margin.astype(np.float32), (n_samples, self.n_outputs)).copy()
+            values = leaf_values[:, :, 0].astype(np.float32)
+            for t in range(self.n_trees):
+                out[:, self.tree_output[t]] += values[t]
+            return out
+
+        out = np.broadcast_to(self.base_margin, (n_samples, self.n_outputs)).copy()
+        values = leaf_values[:, :, 0]
+        if self.kind == 'gb':
+            for t in range(self.n_trees):
+                out[:, self.tree_output[t]] += self.learning_rate * values[t]
+        else:
+            for t in range(self.n_trees):
+                out[:, self.tree_output[t]] += values[t]
+        return out
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self._link(self.raw_predict(X))
+
+    def explain(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Probabilities and path contributions from one traversal"""
+        bias, contribs = self.contributions(X)
+        return self._link(bias + contribs.sum(axis=1)), bias, contribs
+
+    def _link(self, raw: np.ndarray) -> np.ndarray:
+        if self.kind == 'rf':
+            return raw
+        if self.kind == 'gb':
+            return _gb_raw_to_proba(self.loss, raw)
+        if self.link == 'sigmoid':
+            if self.kind == 'xgb':
+                p = np.float32(1) / (np.float32(1) + np.exp(-raw[:, 0]))
+            else:
+                p = 1.0 / (1.0 + np.exp(-self.sigmoid_scale * raw[:, 0]))
+            return np.column_stack([1 - p, p])
+        # softmax
+        shifted = raw - raw.max(axis=1, keepdims=True)
+        exp = np.exp(shifted)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class FlatCalibratedEnsemble:
+    """A binary CalibratedClassifierCV whose fold estimators are compiled.
+
+    Each fold's compiled ensemble produces the same response the native
+    estimator would hand to its calibrator (decision_function when it has
+    one, else the positive-class probability). The fitted calibrators are
+    reused as-is and fold probabilities are averaged like
+    ``CalibratedClassifierCV.predict_proba``.
+    """
+
+    def __init__(self, folds: List[FlatTreeEnsemble], calibrators: List[Any],
+                 uses_decision_function: List[bool], classes: np.ndarray):
+        self.folds = folds
+        self.calibrators = calibrators
+        self.uses_decision_function = uses_decision_function
+        self.classes_ = np.asarray(classes)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        mean_proba = np.zeros((X.shape[0], 2))
+        for flat, calibrator, decision in zip(self.folds, self.calibrators, self.uses_decision_function):
+            response = flat.raw_predict(X)[:, 0] if decision else flat.predict_proba(X)[:, 1]
+            proba = np.zeros((X.shape[0], 2))
+            proba[:, 1] = calibrator.predict(response)
+            proba[:, 0] = 1.0 - proba[:, 1]
+            proba[(1.0 < proba) & (proba <= 1.0 + 1e-5)] = 1.0
+            mean_proba += proba
+        mean_proba /= len(self.folds)
+        return mean_proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def explain(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Calibrated probabilities plus positive-class path contributions.
+
+        Contributions are in each fold's raw (pre-link) space for the
+        positive class, averaged over folds, so they rank features but do
+        not sum to the calibrated probability.
+        """
+        n_samples = np.shape(X)[0]
+        mean_proba = np.zeros((n_samples, 2))
+        bias_sum, contribs_sum = 0.0, 0.0
+        for flat, calibrator, decision in zip(self.folds, self.calibrators, self.uses_decision_function):
+            bias, contribs = flat.contributions(X)
+            positive = 0 if flat.n_outputs == 1 else 1
+            raw = bias + contribs.sum(axis=1)
+            response = raw[:, 0] if decision else flat._link(raw)[:, 1]
+            proba = np.zeros((n_samples, 2))
+            proba[:, 1] = calibrator.predict(response)
+            proba[:, 0] = 1.0 - proba[:, 1]
+            proba[(1.0 < proba) & (proba <= 1.0 + 1e-5)] = 1.0
+            mean_proba += proba
+            bias_sum = bias_sum + bias[positive:positive + 1]
+            contribs_sum = contribs_sum + contribs[:, :, positive:positive + 1]
+        n_folds = len(self.folds)
+        return mean_proba / n_folds, bias_sum / n_folds, contribs_sum / n_folds
+
+    def export(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        state: Dict[str, Any] = {
+            '__class__': type(self).__name__,
+            'calibrators': self.calibrators,
+            'uses_decision_function': self.uses_decision_function,
+            'classes_': self.classes_,
+            'folds': [],
+        }
+        arrays: Dict[str, np.ndarray] = {}
+        for i, flat in enumerate(self.folds):
+            fold_state, fold_arrays = flat.export()
+            state['folds'].append(fold_state)
+            arrays.update({f"fold{i}.{k}": v for k, v in fold_arrays.items()})
+        return state, arrays
+
+    @classmethod
+    def restore(cls, state: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> "FlatCalibratedEnsemble":
+        folds = []
+        for i, fold_state in enumerate(state['folds']):
+            prefix = f"fold{i}."
+            fold_arrays = {k[len(prefix):]: v for k, v in arrays.items() if k.startswith(prefix)}
+            folds.append(FlatTreeEnsemble.restore(fold_state, fold_arrays))
+        return cls(folds, state['calibrators'], state['uses_decision_function'], state['classes_'])
+
+
+def restore_compiled(state: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> Any:
+    """Rebuild any compiled model from its exported state and arrays"""
+    if state['__class__'] == FlatCalibratedEnsemble.__name__:
+        return FlatCalibratedEnsemble.restore(state, arrays)
+    return FlatTreeEnsemble.restore(state, arrays)
+
+
+def _gb_raw_to_proba(loss: Any, raw: np.ndarray) -> np.ndarray:
+    # sklearn >= 1.4 exposes predict_proba on the loss; older releases use _raw_prediction_to_proba
+    if hasattr(loss, 'predict_proba'):
+        return loss.predict_proba(raw)
+    return loss._raw_prediction_to_proba(raw)
+
+
+def _sklearn_tree(tree: Any, normalize: bool) -> _TreeArrays:
+    t = tree.tree_
+    value = t.value[:, 0, :].astype(np.float64)
+    if normalize:
+        # DecisionTreeClassifier.predict_proba normalises leaf counts
+        normalizer = value.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        value = value / normalizer
+    missing_type = None
+    default_left = None
+    if hasattr(t, 'missing_go_to_left'):
+        missing_type = np.full(t.node_count, MISSING_NAN, dtype=np.int8)
+        default_left = t.missing_go_to_left.astype(bool)
+    feature = np.where(t.children_left < 0, -1, t.feature)
+    return _TreeArrays(feature, t.threshold, t.children_left, t.children_right, value,
+                       default_left, missing_type)
+
+
+def _compile_random_forest(model: RandomForestClassifier) -> FlatTreeEnsemble:
+    trees = [_sklearn_tree(est, normalize=True) for est in model.estimators_]
+    return FlatTreeEnsemble('rf', trees, model.classes_, model.n_features_in_,
+                            n_outputs=len(model.classes_), input_dtype=np.float32)
+
+
+def _compile_gradient_boosting(model: GradientBoostingClassifier) -> FlatTreeEnsemble:
+    if model.init_ != 'zero' and type(model.init_).__name__ != 'DummyClassifier':
+        raise ValueError("Only the default prior or 'zero' init estimators can be compiled")
+    n_stages, n_outputs = model.estimators_.shape
+    trees, tree_output = [], []
+    for stage in range(n_stages):
+        for k in range(n_outputs):
+            trees.append(_sklearn_tree(model.estimators_[stage, k], normalize=False))
+            tree_output.append(k)
+    base_margin = model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0]
+    return FlatTreeEnsemble('gb', trees, model.classes_, model.n_features_in_, n_outputs,
+                            input_dtype=np.float32, tree_output=tree_output,
+                            base_margin=base_margin, learning_rate=model.learning_rate,
+                            loss=model._loss)
+
+
+def _compile_xgboost(model: Any) -> FlatTreeEnsemble:
+    learner = json.loads(model.get_booster().save_raw(raw_format='json'))['learner']
+    objective = learner['objective']['name']
+    params = learner['learner_model_param']
+    # XGBoost >= 3 stores one intercept per class as "[a,b,c]"
+    base_score = np.array([float(v) for v in str(params['base_score']).strip('[]').split(',')])
+    num_class = int(params.get('num_class', 0))
+    gbtree = learner['gradient_booster']['model']
+    if learner['gradient_booster'].get('name', 'gbtree') != 'gbtree':
+        raise ValueError("Only gbtree XGBoost boosters can be compiled")
+
+    trees = []
+    for tree in gbtree['trees']:
+        left = np.asarray(tree['left_children'])
+        feature = np.where(left < 0, -1, np.asarray(tree['split_indices']))
+        conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+        # Split conditions are float32; leaves store the leaf weight in the same slot.
+        # Internal nodes keep their (shrunk) node weight for path contributions
+        value = np.where(left < 0, conditions, np.asarray(tree['base_weights'], dtype=np.float32))
+        trees.append(_TreeArrays(
+            feature, conditions.astype(np.float64), left, tree['right_children'], value,
+            default_left=tree['default_left'],
+            missing_type=np.full(len(left), MISSING_NAN, dtype=np.int8)
+        ))
+
+    if objective == 'binary:logistic':
+        n_outputs, link = 1, 'sigmoid'
+        base_margin = np.log(base_score / (1 - base_score)).astype(np.float32)
+    elif objective in ('multi:softprob', 'multi:softmax'):
+        n_outputs, link = num_class, 'softmax'
+        base_margin = np.broadcast_to(base_score, (num_class,)).astype(np.float32)
+    else:
+        raise ValueError(f"Unsupported XGBoost objective: {objective}")
+
+    return FlatTreeEnsemble('xgb', trees, model.classes_, int(params['num_feature']), n_outputs,
+                            strict_less=True, input_dtype=np.float32,
+                            tree_output=gbtree['tree_info'], base_margin=base_margin, link=link)
+
+
+def _lgb_tree(structure: Dict[str, Any]) -> _TreeArrays:
+    feature, threshold, left, right, value, default_left, missing_type = [], [], [], [], [], [], []
+    missing_codes = {'None': MISSING_NONE, 'Zero': MISSING_ZERO, 'NaN': MISSING_NAN}
+    stack: List[Tuple[Dict[str, Any], int, str]] = [(structure, -1, '')]
+    while stack:
+        node, parent, side = stack.pop()
+        idx = len(feature)
+        if parent >= 0:
+            (left if side == 'l' else right)[parent] = idx
+        if 'leaf_value' in node:
+            feature.append(-1)
+            threshold.append(0.0)
+            value.append(node['leaf_value'])
+            default_left.append(False)
+            missing_type.append(MISSING_NONE)
+            left.append(-1)
+            right.append(-1)
+            continue
+        if node.get('decision_type', '<=') != '<=':
+            raise ValueError("Categorical LightGBM splits cannot be compiled")
+        feature.append(node['split_feature'])
+        threshold.append(node['threshold'])
+        value.append(node.get('internal_value', 0.0))
+        default_left.append(node.get('default_left', True))
+        missing_type.append(missing_codes.get(node.get('missing_type', 'None'), MISSING_NONE))
+        left.append(-1)
+        right.append(-1)
+        stack.append((node['right_child'], idx, 'r'))
+        stack.append((node['left_child'], idx, 'l'))
+    return _TreeArrays(feature, threshold, left, right, value, default_left, missing_type)
+
+
+def _compile_lightgbm(model: Any) -> FlatTreeEnsemble:
+    dump = model.booster_.dump_model()
+    if dump.get('average_output'):
+        raise ValueError("LightGBM random-forest mode cannot be compiled")
+    objective = dump['objective'].split()
+    n_outputs = int(dump['num_tree_per_iteration'])
+    trees = [_lgb_tree(info['tree_structure']) for info in dump['tree_info']]
+    tree_output = np.arange(len(trees)) % n_outputs
+
+    if objective[0] == 'binary':
+        link = 'sigmoid'
+        sigmoid_scale = 1.0
+        for param in objective[1:]:
+            if param.startswith('sigmoid:'):
+                sigmoid_scale = float(param.split(':', 1)[1])
+    elif objective[0] in ('multiclass', 'softmax'):
+        link, sigmoid_scale = 'softmax', 1.0
+    else:
+        raise ValueError(f"Unsupported LightGBM objective: {objective[0]}")
+
+    return FlatTreeEnsemble('lgb', trees, model.classes_, dump['max_feature_idx'] + 1, n_outputs,
+                            input_dtype=np.float64, tree_output=tree_output,
+                            base_margin=np.zeros(n_outputs), link=link,
+                            sigmoid_scale=sigmoid_scale)
+
+
+def _compile_calibrated(model: CalibratedClassifierCV) -> FlatCalibratedEnsemble:
+    if len(model.classes_) != 2:
+        raise ValueError("Only binary calibrated classifiers can be compiled")
+    folds, calibrators, decision = [], [], []
+    for calibrated in model.calibrated_classifiers_:
+        if calibrated.method not in ('sigmoid', 'isotonic'):
+            raise ValueError(f"Unsupported calibration method: {calibrated.method}")
+        folds.append(compile_ensemble(calibrated.estimator))
+        calibrators.append(calibrated.calibrators[0])
+        decision.append(hasattr(calibrated.estimator, 'decision_function'))
+    return FlatCalibratedEnsemble(folds, calibrators, decision, model.classes_)
+
+
+def compile_ensemble(model: Any) -> Any:
+    """Compile a fitted RF/GB/XGB/LGBM classifier (optionally wrapped in
+    CalibratedClassifierCV) into flat arrays"""
+    if isinstance(model, CalibratedClassifierCV):
+        return _compile_calibrated(model)
+    if isinstance(model, RandomForestClassifier):
+        return _compile_random_forest(model)
+    if isinstance(model, GradientBoostingClassifier):
+        return _compile_gradient_boosting(model)
+    module = type(model).__module__
+    if module.startswith('xgboost'):
+        return _compile_xgboost(model)
+    if module.startswith('lightgbm'):
+        return _compile_lightgbm(model)
+    raise ValueError(f"Cannot compile model of type {type(model).__name__}")
+
+
+def compile_models(models: Dict[str, Any]) -> Dict[str, Any]:
+    """Compile every supported model in a name -> model mapping, skipping the rest"""
+    compiled = {}
+    for name, model in models.items():
+        try:
+            compiled[name] = compile_ensemble(model)
+        except ValueError:
+            continue
+    return compiled
+
+
+def benchmark(model: Any, X: np.ndarray, batch_sizes: Tuple[int, ...] = (1, 10, 100, 1000),
+              repeats: int = 20) -> Dict[int, Dict[str, float]]:
+    """Median latency (ms) of native vs compiled predict_proba per batch size"""
+    flat = compile_ensemble(model)
+    results: Dict[int, Dict[str, float]] = {}
+    for batch_size in batch_sizes:
+        batch = X[:batch_size]
+        native_times, flat_times = [], []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            native = model.predict_proba(batch)
+            native_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            compiled = flat.predict_proba(batch)
+            flat_times.append(time.perf_counter() - start)
+        results[batch_size] = {
+            'native_ms': float(np.median(native_times) * 1000),
+            'flat_ms': float(np.median(flat_times) * 1000),
+            'max_abs_diff': float(np.max(np.abs(native - compiled))),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    import lightgbm as lgb
+    from xgboost import XGBClassifier
+
+    rng = np.random.RandomState(42)
+    X = rng.normal(size=(5000, 20))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=len(X)) > 0).astype(int)
+    candidates = {
+        'rf': RandomForestClassifier(n_estimators=100, random_state=42),
+        'gb': GradientBoostingClassifier(n_estimators=100, random_state=42),
+        'xgb': XGBClassifier(n_estimators=100, random_state=42),
+        'lgb': lgb.LGBMClassifier(n_estimators=100, random_state=42, verbose=-1),
+    }
+    for name, model in candidates.items():
+        model.fit(X, y)
+        for batch_size, row in benchmark(model, X).items():
+            print(f"{name:>4} batch={batch_size:<5} native={row['native_ms']:.3f}ms "
+                  f"flat={row['flat_ms']:.3f}ms max_abs_diff={row['max_abs_diff']:.2e}")
@@ -0,0 +1,180 @@
+import re
+import math
+import time
+import zlib
+import heapq
+import threading
+import numpy as np
+from collections import Counter, OrderedDict
+from typing import Dict, List, Tuple, Optional, Sequence
+
+CAPACITY = 200
+SKETCH_WIDTH = 2048
+SKETCH_DEPTH = 4
+HALF_LIFE_HOURS = 6.0
+MAX_TOPICS = 1000
+
+# Forward-decay weights grow as exp(age / tau); rescale before they get large
+_RESCALE_AT = 1e12
+
+STOP_WORDS = frozenset("""
+about above after again against all also and any are aren't because been before being below between both but
+can can't cannot could couldn't did didn't does doesn't doing don't down during each few for from further had
+hadn't has hasn't have haven't having he'd he'll he's her here here's hers herself him himself his how how's i'd
+i'll i'm i've into isn't it's its itself just let's like more most mustn't myself nor not now off once only other
+ought our ours ourselves out over own really same shan't she'd she'll she's should shouldn't some such than that
+that's the their theirs them themselves then there there's these they they'd they'll they're they've this those
+through too under until very was wasn't we'd we'll we're we've were weren't what what's when when's where where's
+which while who who's whom why why's will with won't would wouldn't you'd you'll you're you've your yours yourself
+yourselves going think know want still even much back well http https www com amp gt lt reddit removed deleted
+""".split())
+
+_TOKEN = re.compile(r"[a-z][a-z0-9']{3,}")
+_URL = re.compile(r"https?://\S+|www\.\S+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of four or more characters, without links and stop words"""
+    return [word for word in _TOKEN.findall(_URL.sub(" ", text.lower())) if word not in STOP_WORDS]
+
+def _hashes(terms: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    encoded = [term.encode() for term in terms]
+    h1 = np.array([zlib.crc32(term) for term in encoded], dtype=np.uint64)
+    h2 = np.array([zlib.adler32(term) | 1 for term in encoded], dtype=np.uint64)
+    return h1, h2
+
+class CountMinSketch:
+    """Count-Min sketch over weighted terms; rows are indexed by double hashing"""
+
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.float64)
+
+    def _columns(self, terms: Sequence[str]) -> np.ndarray:
+        h1, h2 = _hashes(terms)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + rows * h2[None, :]) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, terms: Sequence[str], weights: np.ndarray) -> np.ndarray:
+        """Add weights for terms and return their updated estimates"""
+        columns = self._columns(terms)
+        for row in range(self.depth):
+            np.add.at(self.table[row], columns[row], weights)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def estimate(self, terms: Sequence[str]) -> np.ndarray:
+        return self.table[np.arange(self.depth)[:, None], self._columns(terms)].min(axis=0)
+
+    def scale(self, factor: float):
+        self.table *= factor
+
+class TopicTrends:
+    """Heavy hitters for one topic: Space-Saving counters admitted through a Count-Min sketch.
+
+    Counts use forward decay: an occurrence at time ``t`` adds
+    ``exp((t - landmark) / tau)``, so older counts never need touching and
+    dividing by the current factor gives exponentially decayed counts. A term
+    outside the ``capacity`` monitored counters replaces the smallest one only
+    when its sketch estimate exceeds it, and enters with that estimate.
+    """
+
+    def __init__(self, capacity: int = CAPACITY, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH,
+                 half_life_hours: float = HALF_LIFE_HOURS, now: Optional[float] = None):
+        self.capacity = capacity
+        self.tau = half_life_hours * 3600 / math.log(2)
+        self.landmark = time.time() if now is None else now
+        self.sketch = CountMinSketch(width, depth)
+        self.counts: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._ranking: Optional[List[Tuple[str, float]]] = None
+
+    def _weight(self, now: float) -> float:
+        weight = math.exp((now - self.landmark) / self.tau)
+        if weight > _RESCALE_AT:
+            # Move the landmark to now; relative counts are unchanged
+            self.sketch.scale(1 / weight)
+            self.counts = {term: count / weight for term, count in self.counts.items()}
+            self._heap = [(count, term) for term, count in self.counts.items()]
+            heapq.heapify(self._heap)
+            self.landmark = now
+            weight = 1.0
+        return weight
+
+    def _min_count(self) -> Tuple[float, Optional[str]]:
+        """Smallest monitored counter, dropping stale heap entries"""
+        while self._heap:
+            count, term = self._heap[0]
+            if self.counts.get(term) == count:
+                return count, term
+            heapq.heappop(self._heap)
+        return 0.0, None
+
+    def add(self, terms: Sequence[str], now: Optional[float] = None):
+        """Count one batch of term occurrences at time ``now``"""
+        if not terms:
+            return
+        now = time.time() if now is None else now
+        weight = self._weight(now)
+        batch = Counter(terms)
+        unique = list(batch)
+        estimates = self.sketch.add(unique, np.fromiter(batch.values(), dtype=np.float64, count=len(unique)) * weight)
+        for term, estimate in zip(unique, estimates):
+            if term in self.counts:
+                self.counts[term] += batch[term] * weight
+            elif len(self.counts) < self.capacity:
+                self.counts[term] = float(estimate)
+            else:
+                smallest, evicted = self._min_count()
+                if estimate <= smallest:
+                    continue
+                del self.counts[evicted]
+                heapq.heappop(self._heap)
+                self.counts[term] = float(estimate)
+            heapq.heappush(self._heap, (self.counts[term], term))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, term) for term, count in self.counts.items()]
+            heapq.heapify(self._heap)
+        self._ranking = None
+
+    def top_k(self, k: int, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """The ``k`` heaviest terms with their decayed counts at ``now``.
+
+        The ranking is rebuilt once after each update (over at most
+        ``capacity`` counters); reads in between slice it in O(k).
+        """
+        now = time.time() if now is None else now
+        if self._ranking is None:
+            self._ranking = sorted(self.counts.items(), key=lambda item: -item[1])
+        decay = math.exp(-(now - self.landmark) / self.tau)
+        return [(term, count * decay) for term, count in self._ranking[:k]]
+
+class TrendingTerms:
+    """Per-topic streaming trending terms with a bounded number of topics (least recently updated dropped)"""
+
+    def __init__(self, capacity: int = CAPACITY, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH,
+                 half_life_hours: float = HALF_LIFE_HOURS, max_topics: int = MAX_TOPICS):
+        self.capacity = capacity
+        self.width = width
+        self.depth = depth
+        self.half_life_hours = half_life_hours
+        self.max_topics = max_topics
+        self._topics: "OrderedDict[str, TopicTrends]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, topic: str, texts: Sequence[str], now: Optional[float] = None):
+        """Tokenize new posts for a topic and add them to its sketches"""
+        terms = [term for text in texts for term in tokenize(text)]
+        with self._lock:
+            trends = self._topics.get(topic)
+            if trends is None:
+                trends = TopicTrends(self.capacity, self.width, self.depth, self.half_life_hours, now)
+                self._topics[topic] = trends
+                while len(self._topics) > self.max_topics:
+                    self._topics.popitem(last=False)
+            self._topics.move_to_end(topic)
+            trends.add(terms, now)
+
+    def top_k(self, topic: str, k: int = 5, now: Optional[float] = None) -> List[str]:
+        with self._lock:
+            trends = self._topics.get(topic)
+            return [term for term, _ in trends.top_k(k, now)] if trends is not None else []
@@ -8,6 +8,7 @@ import numpy as np
 from datetime import datetime, timedelta
 import os
 import sys
+import asyncio
 from dotenv import load_dotenv
 
 # Add parent directory to path
@@ -15,8 +16,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import custom modules
 from advanced.meta_model import MetaModel
-from advanced.player_embeddings import PlayerEmbeddings
-from advanced.social_sentiment import SocialSentimentAnalyzer
+from advanced.embedding_store import EmbeddingStore
+from advanced.social_sentiment import get_aggregator, poll_sentiment, read_sentiment_async
 from advanced.train_predict import ModelTrainer
 
 # Load environment variables
@@ -40,16 +41,28 @@ app.add_middleware(
 
 # Initialize models
 model_trainer = ModelTrainer(model_dir=os.getenv('MODEL_DIR'))
-player_embeddings = PlayerEmbeddings(embedding_dim=int(os.getenv('EMBEDDING_DIM')))
-sentiment_analyzer = SocialSentimentAnalyzer()
+# Precomputed embeddings are memory-mapped; serving similarity needs no torch model
+embedding_store = EmbeddingStore(os.path.join(os.getenv('MODEL_DIR'), 'player_embeddings', 'index'))
+# The sentiment models and API clients load on the poller's first call to get_analyzer()
 
 # Load models
 try:
     model_trainer.load_models()
-    player_embeddings.load_model(os.path.join(os.getenv('MODEL_DIR'), 'player_embeddings'))
+    embedding_store.refresh()
 except Exception as e:
     print(f"Warning: Error loading models: {e}")
 
+@app.on_event("startup")
+async def startup_event():
+    """Start the background sentiment poller"""
+    app.state.sentiment_poller = asyncio.create_task(poll_sentiment())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop polling and write any queued sentiment snapshots"""
+    app.state.sentiment_poller.cancel()
+    await asyncio.to_thread(get_aggregator().flush)
+
 # Pydantic models for request/response validation
 class MatchPrediction(BaseModel):
     home_team: str
@@ -93,7 +106,7 @@ async def predict_match(prediction: MatchPrediction):
         predictions, probabilities = model_trainer.predict(features)
         
         # Get sentiment scores
-        sentiment_scores = sentiment_analyzer.aggregate_sentiment(prediction.home_team)
+        sentiment_scores = (await read_sentiment_async([prediction.home_team]))[prediction.home_team]
         
         return {
             "prediction": int(predictions[0]),
@@ -107,17 +120,15 @@ async def predict_match(prediction: MatchPrediction):
 @app.post("/similar-players")
 async def get_similar_players(request: PlayerSimilarity):
     """Get similar players based on embeddings"""
+    # Picks up embeddings materialized by a newer training run
+    index = embedding_store.index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Player embeddings have not been materialized")
+    if request.player_id not in index:
+        raise HTTPException(status_code=404, detail=f"Player {request.player_id} not found in embeddings")
+    
     try:
-        # Load player embeddings
-        player_embeddings.load_model(os.path.join(os.getenv('MODEL_DIR'), 'player_embeddings'))
-        
-        # Get similar players
-        similar_players = player_embeddings.get_similar_players(
-            request.player_id,
-            player_embeddings.get_embeddings(pd.DataFrame()),  # Load from saved embeddings
-            request.top_k
-        )
-        
+        similar_players = index.similar(request.player_id, request.top_k)
         return {"similar_players": similar_players}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -126,8 +137,8 @@ async def get_similar_players(request: PlayerSimilarity):
 async def get_team_sentiment(request: TeamSentiment):
     """Get team sentiment analysis"""
     try:
-        # Get sentiment scores
-        sentiment_scores = sentiment_analyzer.aggregate_sentiment(request.team)
+        # Read the precomputed score; the background poller keeps it current
+        sentiment_scores = (await read_sentiment_async([request.team]))[request.team]
         
         return {
             "team": request.team,
@@ -5,6 +5,7 @@ import numpy as np
 import pandas as pd
 import os
 import json
+import asyncio
 import numbers
 
 from core.auto_logger import logger
@@ -63,6 +64,25 @@ class PredictionResponse(BaseModel):
     modelUsed: Optional[str]
     # ... other prediction details
 
+class BatchPredictionRequest(BaseModel):
+    # Many props scored in one model invocation
+    items: List[PredictionRequest] = Field(..., description="Prediction requests to score together in a single batch.")
+    explain: bool = Field(False, description="Include per-row feature contributions in insights (roughly doubles scoring cost).")
+
+class BatchPredictionItem(PredictionResponse):
+    insights: Optional[Dict[str, Any]] = None
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[BatchPredictionItem]
+
+def _native_outcome(predicted_outcome: Any) -> Any:
+    """Convert numpy outcome types to JSON-friendly Python values"""
+    if isinstance(predicted_outcome, np.generic):
+        predicted_outcome = predicted_outcome.item()
+    if isinstance(predicted_outcome, numbers.Number):
+        return float(predicted_outcome) if isinstance(predicted_outcome, float) else int(predicted_outcome)
+    return str(predicted_outcome)
+
 @router.post("/predict", response_model=PredictionResponse)
 async def predict_outcome(
     request_body: PredictionRequest,
@@ -80,18 +100,14 @@ async def predict_outcome(
             raise HTTPException(status_code=503, detail="Model features not loaded. Please train the model first.")
         
         # Make prediction using ML service
-        predicted_outcome, confidence = ml_service.predict(
+        # Coalesced with concurrent /predict calls into one model invocation
+        predicted_outcome, confidence, _ = await ml_service.predict_async(
             request_body.prediction_input.features,
             feature_order
         )
         
         # Convert numpy types to Python native types
-        if isinstance(predicted_outcome, np.generic):
-            predicted_outcome = predicted_outcome.item()
-        if isinstance(predicted_outcome, numbers.Number):
-            predicted_outcome = float(predicted_outcome) if isinstance(predicted_outcome, float) else int(predicted_outcome)
-        else:
-            predicted_outcome = str(predicted_outcome)
+        predicted_outcome = _native_outcome(predicted_outcome)
 
         logger.logger.info(f"Prediction for {request_body.propId}: Outcome={predicted_outcome}, Confidence={confidence}")
 
@@ -111,6 +127,53 @@ async def predict_outcome(
         print(f"[DEBUG] Exception in predict_outcome: {e}")
         raise HTTPException(status_code=500, detail=f"An error occurred during prediction: {str(e)}")
 
+@router.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_outcomes_batch(request_body: BatchPredictionRequest):
+    ml_service = get_ml_service()
+    
+    try:
+        logger.logger.info(f"Received batch prediction request with {len(request_body.items)} items")
+        
+        feature_order = list(ml_service.feature_importance.get('rf', {}).keys())
+        if not feature_order:
+            raise HTTPException(status_code=503, detail="Model features not loaded. Please train the model first.")
+        
+        # One scale + predict_proba pass for the whole slate, off the event loop
+        results = await asyncio.to_thread(
+            ml_service.predict_batch,
+            [item.prediction_input.features for item in request_body.items],
+            feature_order,
+            explain=request_body.explain
+        )
+        
+        predictions = [
+            BatchPredictionItem(
+                propId=item.propId,
+                predictedOutcome=_native_outcome(predicted_outcome),
+                confidence=confidence,
+                modelUsed=item.modelId or "default_v1",
+                insights=insights
+            )
+            for item, (predicted_outcome, confidence, insights) in zip(request_body.items, results)
+        ]
+        return BatchPredictionResponse(predictions=predictions)
+
+    except HTTPException as he:
+        raise he
+    except KeyError as ke:
+        raise HTTPException(status_code=422, detail=f"Missing feature in batch input: {ke}")
+    except Exception as e:
+        logger.logger.error(f"Exception in predict_outcomes_batch: {e}")
+        raise HTTPException(status_code=500, detail=f"An error occurred during batch prediction: {str(e)}")
+
+@router.get("/predict/batcher-stats", summary="Request coalescing settings and batch metrics")
+async def get_batcher_stats() -> Dict[str, Any]:
+    return get_ml_service().batcher.get_stats()
+
+@router.get("/predict/cache-stats", summary="Prediction cache size and hit ratio")
+async def get_cache_stats() -> Dict[str, Any]:
+    return get_ml_service().prediction_cache.get_stats()
+
 class GeneralInsightResponse(BaseModel):
     id: str
     text: str
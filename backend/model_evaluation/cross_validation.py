@@ -0,0 +1,281 @@
+import os
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import joblib
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.isotonic import IsotonicRegression
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import KFold, StratifiedKFold
+
+from .metrics import ModelMetrics
+
+# Out-of-fold predictions stay in memory unless a cache directory is configured or passed in
+DEFAULT_CACHE_DIR = os.getenv("OOF_CACHE_DIR") or None
+DEFAULT_N_JOBS = int(os.getenv("CV_N_JOBS", "-1"))
+
+def data_hash(X: Union[pd.DataFrame, np.ndarray], y: Union[pd.Series, np.ndarray]) -> str:
+    """Content hash of a training set"""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(pd.DataFrame(X), index=False).values.tobytes())
+    digest.update(pd.util.hash_array(np.asarray(y)).tobytes())
+    return digest.hexdigest()
+
+def _estimator_key(estimator: Any) -> str:
+    params = sorted(estimator.get_params(deep=False).items(), key=lambda item: item[0])
+    return f"{type(estimator).__module__}.{type(estimator).__name__}{params!r}"
+
+def _rows(X: Union[pd.DataFrame, np.ndarray], index: np.ndarray):
+    return X.iloc[index] if isinstance(X, pd.DataFrame) else X[index]
+
+def _fit_fold(estimator: Any, X, y: np.ndarray, train: np.ndarray, test: np.ndarray,
+              classes: np.ndarray) -> Tuple[np.ndarray, Any]:
+    """Fit on one fold's training rows; held-out probabilities are aligned to all classes"""
+    model = clone(estimator).fit(_rows(X, train), y[train])
+    proba = np.zeros((len(test), len(classes)))
+    proba[:, np.searchsorted(classes, model.classes_)] = model.predict_proba(_rows(X, test))
+    return proba, model
+
+def _splits(folds: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    return [(np.flatnonzero(folds != fold), np.flatnonzero(folds == fold)) for fold in range(folds.max() + 1)]
+
+def _logit(p: np.ndarray) -> np.ndarray:
+    p = np.clip(p, 1e-6, 1 - 1e-6)
+    return np.log(p / (1 - p)).reshape(-1, 1)
+
+def _meta_features(proba: np.ndarray) -> np.ndarray:
+    # Binary probabilities are redundant, keep the positive column like StackingClassifier
+    return proba[:, 1:] if proba.shape[1] == 2 else proba
+
+class OOFCalibratedClassifier(BaseEstimator, ClassifierMixin):
+    """A model fit on all rows with a calibration map fit on its out-of-fold probabilities.
+
+    Equivalent to ``CalibratedClassifierCV(ensemble=False)``, but the
+    out-of-fold predictions come from ``CrossValidator`` instead of a
+    fresh round of fold fits.
+    """
+
+    def __init__(self, estimator: Any, method: str = 'sigmoid'):
+        self.estimator = estimator
+        self.method = method
+
+    def fit_calibration(self, oof_proba: np.ndarray, y: Union[pd.Series, np.ndarray]) -> 'OOFCalibratedClassifier':
+        y = np.asarray(y)
+        self.classes_ = np.unique(y)
+        if len(self.classes_) != 2:
+            raise ValueError("Out-of-fold calibration supports binary targets only")
+        positive = y == self.classes_[1]
+        if self.method == 'isotonic':
+            self.calibrator_ = IsotonicRegression(y_min=0, y_max=1, out_of_bounds='clip').fit(oof_proba[:, 1], positive)
+        elif self.method == 'sigmoid':
+            self.calibrator_ = LogisticRegression(C=1e6).fit(_logit(oof_proba[:, 1]), positive)
+        else:
+            raise ValueError(f"Unknown calibration method: {self.method}")
+        return self
+
+    def predict_proba(self, X) -> np.ndarray:
+        score = self.estimator.predict_proba(X)[:, 1]
+        if self.method == 'isotonic':
+            p = self.calibrator_.predict(score)
+        else:
+            p = self.calibrator_.predict_proba(_logit(score))[:, 1]
+        return np.column_stack([1 - p, p])
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[(self.predict_proba(X)[:, 1] >= 0.5).astype(int)]
+
+class OOFStackingClassifier(BaseEstimator, ClassifierMixin):
+    """Base models fit on all rows and a final estimator fit on their out-of-fold probabilities"""
+
+    def __init__(self, estimators: List[Tuple[str, Any]], final_estimator: Any):
+        self.estimators = estimators
+        self.final_estimator = final_estimator
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return self.final_estimator.classes_
+
+    def transform(self, X) -> np.ndarray:
+        return np.hstack([_meta_features(model.predict_proba(X)) for _, model in self.estimators])
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self.final_estimator.predict_proba(self.transform(X))
+
+    def predict(self, X) -> np.ndarray:
+        return self.final_estimator.predict(self.transform(X))
+
+class CrossValidator:
+    """K-fold evaluation on one shared fold assignment with cached out-of-fold predictions.
+
+    Every estimator evaluated on the same data gets the same folds, all
+    (estimator, fold) fits run in one parallel batch, and out-of-fold
+    probabilities are stored on disk keyed by data, folds and estimator
+    parameters. Metrics, calibration and stacking all read those
+    predictions, so each model is fit once per fold in total rather than
+    once per fold per stage.
+    """
+
+    def __init__(self, n_splits: int = 5, estimator: Any = None, shuffle: bool = True,
+                 n_jobs: int = DEFAULT_N_JOBS, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 random_state: int = 42):
+        self.n_splits = n_splits
+        self.estimator = estimator if estimator is not None else RandomForestClassifier(n_estimators=100, random_state=random_state)
+        self.shuffle = shuffle
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
+        self.random_state = random_state
+        self.metrics = ModelMetrics()
+        self._folds: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._fold_models: Dict[str, List[Any]] = {}
+        self._oof: Dict[str, np.ndarray] = {}
+
+    def _resolve(self, estimator: Any) -> Any:
+        return self.estimator if estimator is None else estimator
+
+    def fold_assignment(self, X, y, stratified: bool = True) -> np.ndarray:
+        """Fold id per row; computed once per dataset and reused by every estimator"""
+        return self._assign(data_hash(X, y), np.asarray(y), stratified)
+
+    def _assign(self, data_key: str, y: np.ndarray, stratified: bool) -> np.ndarray:
+        key = (data_key, stratified)
+        if key not in self._folds:
+            n_splits = min(self.n_splits, len(y))
+            random_state = self.random_state if self.shuffle else None
+            # StratifiedKFold needs at least n_splits rows in the largest class
+            if stratified and np.unique(y, return_counts=True)[1].max() >= n_splits:
+                splitter = StratifiedKFold(n_splits, shuffle=self.shuffle, random_state=random_state)
+            else:
+                splitter = KFold(n_splits, shuffle=self.shuffle, random_state=random_state)
+            folds = np.empty(len(y), dtype=np.int32)
+            for fold, (_, test) in enumerate(splitter.split(np.zeros(len(y)), y)):
+                folds[test] = fold
+            self._folds[key] = folds
+        return self._folds[key]
+
+    def split(self, X, y, stratified: bool = True) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """(train, test) row indices of the shared folds"""
+        return _splits(self.fold_assignment(X, y, stratified))
+
+    def _cache_key(self, data_key: str, folds: np.ndarray, estimator: Any) -> str:
+        digest = hashlib.sha256()
+        digest.update(data_key.encode())
+        digest.update(folds.tobytes())
+        digest.update(_estimator_key(estimator).encode())
+        return digest.hexdigest()
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.joblib")
+
+    def _load(self, key: str) -> Optional[np.ndarray]:
+        if key not in self._oof and self.cache_dir and os.path.exists(self._cache_path(key)):
+            self._oof[key] = joblib.load(self._cache_path(key))['proba']
+        return self._oof.get(key)
+
+    def oof_predict_many(self, estimators: Dict[str, Any], X, y, stratified: bool = True,
+                         keep_models: bool = False) -> Dict[str, np.ndarray]:
+        """Out-of-fold probabilities (n_rows, n_classes) per estimator.
+
+        Cached predictions are read from disk; every missing (estimator,
+        fold) pair is fit in a single parallel batch. ``keep_models`` also
+        requires the fitted fold models to be in memory.
+        """
+        y = np.asarray(y)
+        classes = np.unique(y)
+        data_key = data_hash(X, y)
+        folds = self._assign(data_key, y, stratified)
+        splits = _splits(folds)
+
+        results: Dict[str, np.ndarray] = {}
+        pending: Dict[str, str] = {}
+        for name, estimator in estimators.items():
+            key = self._cache_key(data_key, folds, estimator)
+            oof = self._load(key)
+            if oof is None or (keep_models and key not in self._fold_models):
+                pending[name] = key
+            else:
+                results[name] = oof
+
+        if pending:
+            jobs = [(name, fold) for name in pending for fold in range(len(splits))]
+            fitted = Parallel(n_jobs=self.n_jobs)(
+                delayed(_fit_fold)(estimators[name], X, y, *splits[fold], classes) for name, fold in jobs
+            )
+            for name, key in pending.items():
+                oof = np.zeros((len(y), len(classes)))
+                models = []
+                for (job_name, fold), (proba, model) in zip(jobs, fitted):
+                    if job_name == name:
+                        oof[splits[fold][1]] = proba
+                        models.append(model)
+                self._fold_models[key] = models
+                self._oof[key] = oof
+                if self.cache_dir:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    joblib.dump({'proba': oof, 'classes': classes, 'folds': folds}, self._cache_path(key))
+                results[name] = oof
+        return results
+
+    def oof_predict(self, X, y, estimator: Any = None, stratified: bool = True) -> np.ndarray:
+        """Out-of-fold probabilities for one estimator (the validator's default if omitted)"""
+        return self.oof_predict_many({'model': self._resolve(estimator)}, X, y, stratified)['model']
+
+    def fold_models(self, X, y, estimator: Any = None, stratified: bool = True) -> List[Tuple[Any, np.ndarray]]:
+        """Fitted fold models paired with the rows each one held out"""
+        estimator = self._resolve(estimator)
+        self.oof_predict_many({'model': estimator}, X, y, stratified, keep_models=True)
+        data_key = data_hash(X, y)
+        folds = self._assign(data_key, np.asarray(y), stratified)
+        models = self._fold_models[self._cache_key(data_key, folds, estimator)]
+        return [(model, test) for model, (_, test) in zip(models, _splits(folds))]
+
+    def _fold_scores(self, X, y, estimator: Any, stratified: bool) -> Dict[str, List[float]]:
+        y = np.asarray(y)
+        oof = self.oof_predict(X, y, estimator, stratified)
+        y_pred = np.unique(y)[np.argmax(oof, axis=1)]
+        scores: Dict[str, List[float]] = {'accuracy': [], 'precision': [], 'recall': [], 'f1': []}
+        for _, test in self.split(X, y, stratified):
+            for name, value in self.metrics.calculate_classification_metrics(y[test], y_pred[test]).items():
+                scores[name].append(value)
+        return scores
+
+    def cross_validate(self, X, y, estimator: Any = None) -> Dict[str, List[float]]:
+        """Per-fold accuracy/precision/recall/f1 on plain K folds"""
+        return self._fold_scores(X, y, self._resolve(estimator), stratified=False)
+
+    def stratified_cross_validate(self, X, y, estimator: Any = None) -> Dict[str, List[float]]:
+        """Per-fold accuracy/precision/recall/f1 on stratified K folds"""
+        return self._fold_scores(X, y, self._resolve(estimator), stratified=True)
+
+    def compare(self, estimators: Dict[str, Any], X, y, stratified: bool = True) -> Dict[str, Dict[str, float]]:
+        """Out-of-fold metrics for several candidates on the same folds"""
+        y = np.asarray(y)
+        classes = np.unique(y)
+        oofs = self.oof_predict_many(estimators, X, y, stratified)
+        return {
+            name: self.metrics.calculate_all_metrics(y, classes[np.argmax(oof, axis=1)], oof)
+            for name, oof in oofs.items()
+        }
+
+    def calibrate(self, estimator: Any, X, y, method: str = 'sigmoid', fitted: Any = None,
+                  stratified: bool = True) -> OOFCalibratedClassifier:
+        """Calibrate on cached out-of-fold predictions; ``fitted`` reuses an existing full-data fit"""
+        oof = self.oof_predict(X, y, estimator, stratified)
+        model = fitted if fitted is not None else clone(estimator).fit(X, y)
+        return OOFCalibratedClassifier(model, method).fit_calibration(oof, y)
+
+    def stack(self, estimators: Dict[str, Any], X, y, final_estimator: Any = None,
+              fitted: Optional[Dict[str, Any]] = None, stratified: bool = True) -> OOFStackingClassifier:
+        """Fit a stacking head on cached out-of-fold predictions of the base estimators"""
+        oofs = self.oof_predict_many(estimators, X, y, stratified)
+        head = clone(final_estimator if final_estimator is not None else LogisticRegression())
+        head.fit(np.hstack([_meta_features(oofs[name]) for name in estimators]), np.asarray(y))
+
+        fitted = dict(fitted or {})
+        missing = [name for name in estimators if name not in fitted]
+        full_fits = Parallel(n_jobs=self.n_jobs)(delayed(clone(estimators[name]).fit)(X, y) for name in missing)
+        fitted.update(zip(missing, full_fits))
+        return OOFStackingClassifier([(name, fitted[name]) for name in estimators], head)
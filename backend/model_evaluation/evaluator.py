@@ -0,0 +1,35 @@
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .metrics import ModelMetrics, positive_proba, ArrayLike
+
+class ModelEvaluator:
+    """Evaluates predictions, optionally re-thresholding the positive-class probability"""
+
+    def __init__(self, metrics: Optional[ModelMetrics] = None):
+        self.metrics = metrics or ModelMetrics()
+
+    def evaluate(self, y_true: ArrayLike, y_pred: ArrayLike, y_pred_proba: Optional[ArrayLike] = None,
+                 threshold: Optional[float] = None) -> Dict[str, float]:
+        """Metrics for a set of predictions; ``threshold`` re-derives binary labels from the probabilities"""
+        if threshold is not None:
+            if y_pred_proba is None:
+                raise ValueError("A threshold needs predicted probabilities")
+            proba = positive_proba(y_true, y_pred_proba)
+            if proba.ndim != 1:
+                raise ValueError("Thresholds only apply to binary targets")
+            y_pred = (proba >= threshold).astype(int)
+        if y_pred_proba is None:
+            return self.metrics.calculate_classification_metrics(y_true, y_pred)
+        return self.metrics.calculate_all_metrics(y_true, y_pred, y_pred_proba)
+
+    def evaluate_oof(self, y_true: ArrayLike, oof_proba: np.ndarray, classes: np.ndarray) -> Dict[str, float]:
+        """Metrics from out-of-fold probabilities, as returned by ``CrossValidator.oof_predict``"""
+        y_pred = np.asarray(classes)[np.argmax(oof_proba, axis=1)]
+        return self.evaluate(y_true, y_pred, oof_proba)
+
+    def evaluate_model(self, model: Any, X: ArrayLike, y_true: ArrayLike,
+                       threshold: Optional[float] = None) -> Dict[str, float]:
+        """Metrics for a fitted classifier on held-out data"""
+        return self.evaluate(y_true, model.predict(X), model.predict_proba(X), threshold=threshold)
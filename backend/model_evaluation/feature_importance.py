@@ -0,0 +1,52 @@
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.inspection import permutation_importance
+
+from .cross_validation import CrossValidator, data_hash, DEFAULT_N_JOBS
+
+class FeatureImportanceAnalyzer:
+    """Permutation importance on each fold's held-out rows, reusing the validator's fold models"""
+
+    def __init__(self, estimator: Any = None, validator: Optional[CrossValidator] = None,
+                 n_repeats: int = 5, n_jobs: int = DEFAULT_N_JOBS, random_state: int = 42):
+        self.validator = validator or CrossValidator(estimator=estimator, n_jobs=n_jobs, random_state=random_state)
+        self.estimator = self.validator.estimator if estimator is None else estimator
+        self.n_repeats = n_repeats
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self._importance: Dict[str, Dict[str, float]] = {}
+
+    def calculate_importance(self, X: Union[pd.DataFrame, np.ndarray], y: Union[pd.Series, np.ndarray]) -> Dict[str, float]:
+        """Importance per feature, clipped at 0 and normalised to sum to 1 (all 0 if nothing matters)"""
+        X = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X, columns=[f"feature_{i}" for i in range(np.shape(X)[1])])
+        y = np.asarray(y)
+        key = data_hash(X, y)
+        if key not in self._importance:
+            fold_models = self.validator.fold_models(X, y, self.estimator)
+            results = Parallel(n_jobs=self.n_jobs)(
+                delayed(permutation_importance)(model, X.iloc[test], y[test], n_repeats=self.n_repeats,
+                                                random_state=self.random_state)
+                for model, test in fold_models
+            )
+            # Weight each fold by the rows it held out
+            total = sum(result.importances_mean * len(test) for result, (_, test) in zip(results, fold_models))
+            scores = np.clip(total / len(y), 0, None)
+            if scores.sum() > 0:
+                scores = scores / scores.sum()
+            self._importance[key] = dict(zip(X.columns, map(float, scores)))
+        return dict(self._importance[key])
+
+    def rank_features(self, X: Union[pd.DataFrame, np.ndarray], y: Union[pd.Series, np.ndarray]) -> List[str]:
+        """Features from most to least important"""
+        importance = self.calculate_importance(X, y)
+        return sorted(importance, key=lambda name: -importance[name])
+
+    def select_features(self, X: Union[pd.DataFrame, np.ndarray], y: Union[pd.Series, np.ndarray],
+                        threshold: Optional[float] = None) -> List[str]:
+        """Features whose importance is at least ``threshold`` (default: the mean importance)"""
+        importance = self.calculate_importance(X, y)
+        cutoff = np.mean(list(importance.values())) if threshold is None else threshold
+        return [name for name, value in importance.items() if value >= cutoff]
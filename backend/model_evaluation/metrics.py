@@ -0,0 +1,79 @@
+from typing import Dict, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, log_loss, roc_auc_score
+
+ArrayLike = Union[pd.Series, pd.DataFrame, np.ndarray, list]
+
+def positive_proba(y_true: ArrayLike, y_pred_proba: ArrayLike) -> np.ndarray:
+    """Probability of the positive class for binary targets, or the full matrix otherwise.
+
+    Accepts a 1-D array of positive-class probabilities, an (n, 2)
+    ``predict_proba`` matrix, or an outcome frame with a ``home_win`` column
+    (the positive class of the match target).
+    """
+    if isinstance(y_pred_proba, pd.DataFrame) and 'home_win' in y_pred_proba.columns:
+        return y_pred_proba['home_win'].to_numpy(dtype=float)
+    proba = np.asarray(y_pred_proba, dtype=float)
+    if proba.ndim == 1:
+        return proba
+    if len(np.unique(y_true)) <= 2 and proba.shape[1] == 2:
+        return proba[:, 1]
+    return proba
+
+class ModelMetrics:
+    """Classification metrics with the averaging and edge-case handling used across evaluation"""
+
+    def __init__(self, average: str = 'binary', zero_division: int = 0):
+        self.average = average
+        self.zero_division = zero_division
+
+    def _average(self, y_true: ArrayLike, y_pred: ArrayLike) -> str:
+        if self.average == 'binary' and len(np.union1d(np.unique(y_true), np.unique(y_pred))) > 2:
+            return 'weighted'
+        return self.average
+
+    def calculate_accuracy(self, y_true: ArrayLike, y_pred: ArrayLike) -> float:
+        return float(accuracy_score(y_true, y_pred))
+
+    def calculate_precision(self, y_true: ArrayLike, y_pred: ArrayLike) -> float:
+        return float(precision_score(y_true, y_pred, average=self._average(y_true, y_pred),
+                                     zero_division=self.zero_division))
+
+    def calculate_recall(self, y_true: ArrayLike, y_pred: ArrayLike) -> float:
+        return float(recall_score(y_true, y_pred, average=self._average(y_true, y_pred),
+                                  zero_division=self.zero_division))
+
+    def calculate_f1(self, y_true: ArrayLike, y_pred: ArrayLike) -> float:
+        return float(f1_score(y_true, y_pred, average=self._average(y_true, y_pred),
+                              zero_division=self.zero_division))
+
+    def calculate_log_loss(self, y_true: ArrayLike, y_pred_proba: ArrayLike) -> float:
+        proba = positive_proba(y_true, y_pred_proba)
+        # Name the labels for 0/1 targets so a single-class sample still scores
+        labels = [0, 1] if proba.ndim == 1 and set(np.unique(y_true)) <= {0, 1} else None
+        return float(log_loss(y_true, np.clip(proba, 1e-15, 1 - 1e-15), labels=labels))
+
+    def calculate_roc_auc(self, y_true: ArrayLike, y_pred_proba: ArrayLike) -> float:
+        """ROC AUC; NaN when only one class is present"""
+        if len(np.unique(y_true)) < 2:
+            return float('nan')
+        proba = positive_proba(y_true, y_pred_proba)
+        if proba.ndim == 2:
+            return float(roc_auc_score(y_true, proba, multi_class='ovr', average='weighted'))
+        return float(roc_auc_score(y_true, proba))
+
+    def calculate_classification_metrics(self, y_true: ArrayLike, y_pred: ArrayLike) -> Dict[str, float]:
+        return {
+            'accuracy': self.calculate_accuracy(y_true, y_pred),
+            'precision': self.calculate_precision(y_true, y_pred),
+            'recall': self.calculate_recall(y_true, y_pred),
+            'f1': self.calculate_f1(y_true, y_pred)
+        }
+
+    def calculate_all_metrics(self, y_true: ArrayLike, y_pred: ArrayLike, y_pred_proba: ArrayLike) -> Dict[str, float]:
+        metrics = self.calculate_classification_metrics(y_true, y_pred)
+        metrics['log_loss'] = self.calculate_log_loss(y_true, y_pred_proba)
+        metrics['roc_auc'] = self.calculate_roc_auc(y_true, y_pred_proba)
+        return metrics
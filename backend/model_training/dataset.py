@@ -0,0 +1,195 @@
+import os
+import shutil
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+DATA_DIR = os.getenv(
+    "TRAINING_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+)
+PARQUET_DIR = os.getenv("TRAINING_PARQUET_DIR", os.path.join(DATA_DIR, "parquet"))
+CSV_CHUNK_ROWS = int(os.getenv("TRAINING_CSV_CHUNK_ROWS", "500000"))
+CATEGORY_MAX_UNIQUE = int(os.getenv("TRAINING_CATEGORY_MAX_UNIQUE", "1000"))
+
+SOURCES = {
+    'matches': 'matches.csv',
+    'player_stats': 'player_stats.csv',
+    'teams': 'teams.csv',
+    'predictions_latest': 'predictions_latest.csv',
+}
+PARTITION_COLUMNS = ('sport', 'season')
+DATE_COLUMN = 'match_date'
+
+_INT_TYPES = [(np.int8, pa.int8()), (np.int16, pa.int16()), (np.int32, pa.int32()), (np.int64, pa.int64())]
+
+def _csv_path(source: str) -> str:
+    return os.path.join(DATA_DIR, SOURCES[source]) if source in SOURCES else source
+
+def _parquet_path(csv_path: str) -> str:
+    return os.path.join(PARQUET_DIR, os.path.splitext(os.path.basename(csv_path))[0])
+
+def _is_date_column(name: str) -> bool:
+    return name == DATE_COLUMN or name.endswith('_date') or name.endswith('_at')
+
+def _column_type(stats: Dict, partition: bool) -> pa.DataType:
+    """Narrowest Arrow type that holds every value seen in the column"""
+    if stats['kind'] == 'int':
+        for np_type, pa_type in _INT_TYPES:
+            info = np.iinfo(np_type)
+            if info.min <= stats['min'] and stats['max'] <= info.max:
+                return pa_type
+    if stats['kind'] == 'float':
+        # Integer columns with gaps (ids, join keys) read as float; float32 would round values above 2**24
+        return pa.float64() if stats['integral'] else pa.float32()
+    if stats['kind'] == 'bool':
+        return pa.bool_()
+    if stats['kind'] == 'date':
+        return pa.timestamp('ns')
+    if not partition and stats['uniques'] is not None:
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+def _chunk_kind(name: str, series: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(series):
+        return 'bool'
+    if pd.api.types.is_integer_dtype(series):
+        return 'int'
+    if pd.api.types.is_float_dtype(series):
+        return 'float'
+    if _is_date_column(name) and not pd.to_datetime(series, errors='coerce').isna().all():
+        return 'date'
+    return 'str'
+
+def infer_schema(csv_path: str, chunksize: int = CSV_CHUNK_ROWS) -> pa.Schema:
+    """Downcast schema from one streaming pass over the CSV, without holding it in memory"""
+    stats: Dict[str, Dict] = {}
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        for name in chunk.columns:
+            kind = _chunk_kind(name, chunk[name])
+            column = stats.setdefault(name, {'kind': kind, 'min': 0, 'max': 0, 'uniques': set(), 'integral': True})
+            if kind == 'float' and column['integral']:
+                values = chunk[name].dropna().to_numpy()
+                column['integral'] = bool(np.all(values == np.floor(values)))
+            if column['kind'] != kind:
+                numeric = {column['kind'], kind} <= {'int', 'float'}
+                column['kind'] = 'float' if numeric else 'str'
+            if kind == 'int' and len(chunk):
+                column['min'] = min(column['min'], int(chunk[name].min()))
+                column['max'] = max(column['max'], int(chunk[name].max()))
+            if column['uniques'] is not None:
+                column['uniques'].update(chunk[name].dropna().astype(str).unique())
+                if len(column['uniques']) > CATEGORY_MAX_UNIQUE:
+                    column['uniques'] = None
+    return pa.schema([(name, _column_type(column, name in PARTITION_COLUMNS)) for name, column in stats.items()])
+
+def convert_csv(source: str, out_dir: Optional[str] = None, chunksize: int = CSV_CHUNK_ROWS) -> str:
+    """Convert a CSV to a hive-partitioned Parquet dataset with downcast dtypes.
+
+    The CSV is read twice in chunks, once to infer the schema and once to
+    write, so it never has to fit in memory. Partitions by ``sport`` and
+    ``season`` when those columns exist; rows are date-sorted within each
+    chunk so row-group statistics can skip date ranges.
+    """
+    csv_path = _csv_path(source)
+    out_dir = out_dir or _parquet_path(csv_path)
+    schema = infer_schema(csv_path, chunksize)
+    partition_cols = [name for name in PARTITION_COLUMNS if name in schema.names]
+    date_cols = [field.name for field in schema if pa.types.is_timestamp(field.type)]
+
+    def batches() -> Iterator[pa.RecordBatch]:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            for name in date_cols:
+                chunk[name] = pd.to_datetime(chunk[name], errors='coerce')
+            if DATE_COLUMN in date_cols:
+                chunk = chunk.sort_values(DATE_COLUMN, kind='mergesort')
+            for name in chunk.columns:
+                if pa.types.is_string(schema.field(name).type) or pa.types.is_dictionary(schema.field(name).type):
+                    chunk[name] = chunk[name].where(chunk[name].isna(), chunk[name].astype(str))
+            yield from pa.Table.from_pandas(chunk, schema=schema, preserve_index=False).to_batches()
+
+    tmp_dir = f"{out_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    ds.write_dataset(
+        pa.RecordBatchReader.from_batches(schema, batches()), tmp_dir, format='parquet',
+        partitioning=partition_cols or None, partitioning_flavor='hive' if partition_cols else None,
+        max_rows_per_group=max(chunksize, 1024), min_rows_per_group=min(chunksize, 65536)
+    )
+    # Swap the finished dataset in so readers never see a half-written directory
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return out_dir
+
+def ensure_parquet(source: str) -> str:
+    """Parquet dataset for a source name or CSV path, (re)converted when the CSV is newer"""
+    csv_path = _csv_path(source)
+    out_dir = _parquet_path(csv_path)
+    if not os.path.isdir(out_dir) or (os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(out_dir)):
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(f"No CSV or Parquet data for {source}")
+        convert_csv(csv_path, out_dir)
+    return out_dir
+
+def _as_list(value: Union[None, str, int, Sequence]) -> Optional[List]:
+    if value is None or isinstance(value, list):
+        return value
+    if isinstance(value, (str, int)):
+        return [value]
+    return list(value)
+
+def _filter(dataset: ds.Dataset, seasons=None, sports=None, start_date=None, end_date=None) -> Optional[ds.Expression]:
+    """Pushdown expression; partition filters prune files, date bounds prune row groups"""
+    conditions = []
+    for name, values in (('season', _as_list(seasons)), ('sport', _as_list(sports))):
+        if values is None:
+            continue
+        if name not in dataset.schema.names:
+            raise ValueError(f"Cannot filter on {name}: column not in dataset")
+        field_type = dataset.schema.field(name).type
+        if pa.types.is_dictionary(field_type):
+            field_type = field_type.value_type
+        conditions.append(ds.field(name).isin(pa.array(values).cast(field_type)))
+    if start_date is not None or end_date is not None:
+        if DATE_COLUMN not in dataset.schema.names:
+            raise ValueError(f"Cannot filter on dates: {DATE_COLUMN} not in dataset")
+        date_type = dataset.schema.field(DATE_COLUMN).type
+        if start_date is not None:
+            conditions.append(ds.field(DATE_COLUMN) >= pa.scalar(pd.Timestamp(start_date), type=date_type))
+        if end_date is not None:
+            conditions.append(ds.field(DATE_COLUMN) <= pa.scalar(pd.Timestamp(end_date), type=date_type))
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+def open_dataset(source: str) -> ds.Dataset:
+    """Arrow dataset over the Parquet copy of a source"""
+    return ds.dataset(ensure_parquet(source), format='parquet', partitioning='hive')
+
+def _to_frame(data: Union[pa.Table, pa.RecordBatch]) -> pd.DataFrame:
+    df = data.to_pandas()
+    # Partition keys come back as plain strings; keep them categorical like the stored columns
+    for name in PARTITION_COLUMNS:
+        if name in df.columns and pd.api.types.is_string_dtype(df[name]) and not isinstance(df[name].dtype, pd.CategoricalDtype):
+            df[name] = df[name].astype('category')
+    return df
+
+def scan(source: str, columns: Optional[List[str]] = None, seasons=None, sports=None,
+         start_date=None, end_date=None, batch_size: int = 131072) -> Iterator[pd.DataFrame]:
+    """Stream matching rows as DataFrames of at most ``batch_size`` rows, reading only ``columns``"""
+    dataset = open_dataset(source)
+    scanner = dataset.scanner(columns=columns, filter=_filter(dataset, seasons, sports, start_date, end_date),
+                              batch_size=batch_size)
+    for batch in scanner.to_batches():
+        if batch.num_rows:
+            yield _to_frame(batch)
+
+def load(source: str, columns: Optional[List[str]] = None, seasons=None, sports=None,
+         start_date=None, end_date=None) -> pd.DataFrame:
+    """Matching rows of a source as one DataFrame with compact dtypes"""
+    dataset = open_dataset(source)
+    table = dataset.to_table(columns=columns, filter=_filter(dataset, seasons, sports, start_date, end_date))
+    return _to_frame(table)
@@ -0,0 +1,194 @@
+import os
+import json
+import math
+import hashlib
+from typing import Dict, List, Any, Optional, Union
+
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.inspection import permutation_importance
+from sklearn.model_selection import train_test_split
+
+# Importances stay in memory unless a cache directory is configured or passed in
+DEFAULT_CACHE_DIR = os.getenv("FEATURE_IMPORTANCE_CACHE_DIR") or None
+SELECTED_FEATURES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "advanced", "models_store", "selected_features.json"
+)
+
+def _default_estimator(random_state: int) -> RandomForestClassifier:
+    return RandomForestClassifier(n_estimators=100, n_jobs=-1, random_state=random_state)
+
+def _as_frame(X: Union[pd.DataFrame, np.ndarray]) -> pd.DataFrame:
+    if isinstance(X, pd.DataFrame):
+        return X
+    return pd.DataFrame(X, columns=[f"feature_{i}" for i in range(np.shape(X)[1])])
+
+def geometric_schedule(n_features: int, n_features_to_select: int, step: float) -> List[int]:
+    """Feature counts visited by RFE when each round drops a fraction ``step`` of what remains"""
+    counts = [n_features]
+    while counts[-1] > n_features_to_select:
+        drop = max(1, int(math.ceil(counts[-1] * step)))
+        counts.append(max(n_features_to_select, counts[-1] - drop))
+    return counts
+
+def save_selected_features(selected: List[str], feature_order: List[str],
+                           path: str = SELECTED_FEATURES_PATH) -> str:
+    """Write selected_features.json in the layout the serving routes read"""
+    index = {name: i for i, name in enumerate(feature_order)}
+    payload = {
+        'selected_feature_indices': [index[name] for name in selected],
+        'feature_order': list(feature_order)
+    }
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+    return path
+
+class FeatureSelector:
+    """Feature selection by held-out permutation importance or geometric RFE.
+
+    Permutation importance is computed once on a held-out split, with the
+    shuffles spread over ``n_jobs`` processes; RFE drops a fixed fraction of
+    the remaining features per round, so it needs O(log n) fits instead of
+    one per feature. Importances are cached on disk keyed by a hash of the
+    data and settings, so repeated selection on unchanged data is free.
+    """
+
+    def __init__(self, method: str = 'permutation', estimator: Any = None,
+                 n_features_to_select: Optional[int] = None, step: float = 0.3,
+                 n_repeats: int = 5, holdout_size: float = 0.25, n_jobs: int = -1,
+                 cache_dir: Optional[str] = DEFAULT_CACHE_DIR, random_state: int = 42):
+        if method not in ('permutation', 'rfe'):
+            raise ValueError(f"Unknown feature selection method: {method}")
+        if not 0 < step < 1:
+            raise ValueError("step must be a fraction between 0 and 1")
+        self.method = method
+        self.estimator = estimator if estimator is not None else _default_estimator(random_state)
+        self.n_features_to_select = n_features_to_select
+        self.step = step
+        self.n_repeats = n_repeats
+        self.holdout_size = holdout_size
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
+        self.random_state = random_state
+        self._memory: Dict[str, Dict[str, float]] = {}
+        self.selected_features_: Optional[List[str]] = None
+        self.feature_order_: Optional[List[str]] = None
+        self.ranking_: Optional[Dict[str, int]] = None
+
+    def _cache_key(self, X: pd.DataFrame, y: np.ndarray, kind: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+        digest.update(np.ascontiguousarray(y).tobytes())
+        settings = (kind, list(X.columns), type(self.estimator).__name__, self.estimator.get_params(),
+                    self.n_repeats, self.holdout_size, self.step, self.n_features_to_select, self.random_state)
+        digest.update(repr(settings).encode())
+        return digest.hexdigest()
+
+    def _cached(self, key: str) -> Optional[Any]:
+        if key in self._memory:
+            return self._memory[key]
+        if self.cache_dir and os.path.exists(os.path.join(self.cache_dir, f"{key}.joblib")):
+            self._memory[key] = joblib.load(os.path.join(self.cache_dir, f"{key}.joblib"))
+            return self._memory[key]
+        return None
+
+    def _store(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            joblib.dump(value, os.path.join(self.cache_dir, f"{key}.joblib"))
+
+    def _split(self, X: pd.DataFrame, y: np.ndarray):
+        stratify = y if np.bincount(pd.factorize(y)[0]).min() >= 2 else None
+        return train_test_split(X, y, test_size=self.holdout_size, random_state=self.random_state,
+                                stratify=stratify)
+
+    def get_feature_importance(self, X: Union[pd.DataFrame, np.ndarray],
+                               y: Union[pd.Series, np.ndarray]) -> Dict[str, float]:
+        """Held-out permutation importance per feature, clipped at 0 and normalised to sum to 1"""
+        X = _as_frame(X)
+        y = np.asarray(y)
+        key = self._cache_key(X, y, 'permutation')
+        cached = self._cached(key)
+        if cached is not None:
+            return dict(cached)
+
+        X_train, X_holdout, y_train, y_holdout = self._split(X, y)
+        model = clone(self.estimator).fit(X_train, y_train)
+        result = permutation_importance(model, X_holdout, y_holdout, n_repeats=self.n_repeats,
+                                        n_jobs=self.n_jobs, random_state=self.random_state)
+        scores = np.clip(result.importances_mean, 0, None)
+        total = scores.sum()
+        if total > 0:
+            scores = scores / total
+        importance = dict(zip(X.columns, map(float, scores)))
+        self._store(key, importance)
+        return dict(importance)
+
+    def _rfe_ranking(self, X: pd.DataFrame, y: np.ndarray, n_features_to_select: int) -> Dict[str, int]:
+        """RFE with geometric steps; rank 1 is kept, larger ranks were eliminated earlier"""
+        key = self._cache_key(X, y, f'rfe-{n_features_to_select}')
+        cached = self._cached(key)
+        if cached is not None:
+            return dict(cached)
+
+        remaining = list(X.columns)
+        schedule = geometric_schedule(len(remaining), n_features_to_select, self.step)
+        ranking: Dict[str, int] = {}
+        for rank, target in zip(range(len(schedule), 1, -1), schedule[1:]):
+            model = clone(self.estimator).fit(X[remaining], y)
+            order = np.argsort(model.feature_importances_)
+            dropped = [remaining[i] for i in order[:len(remaining) - target]]
+            for name in dropped:
+                ranking[name] = rank
+            remaining = [name for name in remaining if name not in dropped]
+        ranking.update({name: 1 for name in remaining})
+        self._store(key, ranking)
+        return dict(ranking)
+
+    def select_features(self, X: Union[pd.DataFrame, np.ndarray], y: Union[pd.Series, np.ndarray],
+                        threshold: Optional[float] = None) -> List[str]:
+        """Selected feature names, in their original column order.
+
+        Permutation: keep features whose normalised importance is at least
+        ``threshold`` (default: the mean importance), or the top
+        ``n_features_to_select``. RFE: keep ``n_features_to_select``
+        (default: half the features).
+        """
+        X = _as_frame(X)
+        y = np.asarray(y)
+        columns = list(X.columns)
+        if self.method == 'rfe':
+            n_keep = self.n_features_to_select or max(1, len(columns) // 2)
+            self.ranking_ = self._rfe_ranking(X, y, n_keep)
+            selected = [name for name in columns if self.ranking_[name] == 1]
+        else:
+            importance = self.get_feature_importance(X, y)
+            scores = np.array([importance[name] for name in columns])
+            if not scores.any():
+                # No feature moved the held-out score, so there is nothing to rank by
+                selected = columns
+            elif self.n_features_to_select and threshold is None:
+                keep = set(np.argsort(-scores, kind='stable')[:self.n_features_to_select])
+                selected = [name for i, name in enumerate(columns) if i in keep]
+            else:
+                cutoff = scores.mean() if threshold is None else threshold
+                selected = [name for name, score in zip(columns, scores) if score >= cutoff - 1e-12]
+            self.ranking_ = {name: int(rank) + 1 for rank, name in
+                             zip(np.argsort(np.argsort(-scores, kind='stable')), columns)}
+        self.selected_features_ = selected
+        self.feature_order_ = columns
+        return list(selected)
+
+    def save(self, path: str = SELECTED_FEATURES_PATH) -> str:
+        """Write the last selection to selected_features.json"""
+        if self.selected_features_ is None:
+            raise ValueError("Call select_features() before save()")
+        return save_selected_features(self.selected_features_, self.feature_order_, path)
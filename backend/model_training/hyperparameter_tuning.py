@@ -0,0 +1,263 @@
+import os
+import json
+import math
+import sqlite3
+import hashlib
+import itertools
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Tuple, Any, Optional, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import StratifiedKFold
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from xgboost import XGBClassifier
+import lightgbm as lgb
+from threadpoolctl import threadpool_limits
+
+# Trials are only journaled when a path is configured or passed in
+DEFAULT_JOURNAL_PATH = os.getenv("TUNING_JOURNAL_PATH")
+DEFAULT_N_JOBS = int(os.getenv("TUNING_N_JOBS", "0")) or (os.cpu_count() or 1)
+
+# Search spaces: lists are categorical, (low, high) tuples are int/float ranges,
+# (low, high, 'log-uniform') samples on a log scale
+DEFAULT_SPACES: Dict[str, Dict[str, Any]] = {
+    'xgb': {'max_depth': (3, 10), 'learning_rate': (0.01, 0.3, 'log-uniform'),
+            'subsample': (0.6, 1.0), 'colsample_bytree': (0.6, 1.0)},
+    'lgb': {'num_leaves': (15, 127), 'learning_rate': (0.01, 0.3, 'log-uniform'),
+            'subsample': (0.6, 1.0), 'colsample_bytree': (0.6, 1.0)},
+    'gb': {'max_depth': (2, 6), 'learning_rate': (0.01, 0.3, 'log-uniform'), 'subsample': (0.6, 1.0)},
+    'rf': {'max_depth': [None, 5, 10, 20], 'min_samples_leaf': (1, 10), 'max_features': ['sqrt', 'log2', None]},
+}
+
+def _make_estimator(name: str, random_state: int) -> Any:
+    """Single-threaded base estimator; parallelism comes from the process pool"""
+    if name == 'xgb':
+        return XGBClassifier(eval_metric='logloss', n_jobs=1, random_state=random_state)
+    if name == 'lgb':
+        return lgb.LGBMClassifier(n_jobs=1, random_state=random_state, verbose=-1)
+    if name == 'gb':
+        return GradientBoostingClassifier(random_state=random_state)
+    if name == 'rf':
+        return RandomForestClassifier(n_jobs=1, random_state=random_state)
+    raise ValueError(f"Unknown estimator: {name}")
+
+def _sample_value(space: Any, rng: np.random.RandomState) -> Any:
+    if isinstance(space, list):
+        return space[rng.randint(len(space))]
+    low, high = space[0], space[1]
+    if len(space) > 2 and space[2] == 'log-uniform':
+        return float(np.exp(rng.uniform(np.log(low), np.log(high))))
+    if isinstance(low, int) and isinstance(high, int):
+        return int(rng.randint(low, high + 1))
+    return float(rng.uniform(low, high))
+
+def _params_key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+def _data_hash(X: np.ndarray, y: np.ndarray) -> str:
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    digest.update(str(X.shape).encode())
+    return digest.hexdigest()
+
+# Worker-process state, set once per worker by the pool initializer
+_worker_data: Dict[str, Any] = {}
+
+def _init_worker(X: np.ndarray, y: np.ndarray, folds: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+    _worker_data.update(X=X, y=y, folds=folds)
+
+def _evaluate(estimator: Any, params: Dict[str, Any], n_estimators: int, scoring: str) -> float:
+    """Mean CV score of one configuration at a given number of boosting rounds/trees"""
+    X, y, folds = _worker_data['X'], _worker_data['y'], _worker_data['folds']
+    scorer = get_scorer(scoring)
+    scores = []
+    with threadpool_limits(limits=1):
+        for train_idx, test_idx in folds:
+            model = clone(estimator).set_params(**{**params, 'n_estimators': n_estimators})
+            model.fit(X[train_idx], y[train_idx])
+            scores.append(scorer(model, X[test_idx], y[test_idx]))
+    return float(np.mean(scores))
+
+class TrialJournal:
+    """SQLite log of evaluated configurations so searches can resume or warm-start"""
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS trials ("
+                " study TEXT NOT NULL, data_hash TEXT NOT NULL, params TEXT NOT NULL,"
+                " n_estimators INTEGER NOT NULL, score REAL NOT NULL, created_at TEXT NOT NULL,"
+                " PRIMARY KEY (study, data_hash, params, n_estimators))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def lookup(self, study: str, data_hash: str) -> Dict[Tuple[str, int], float]:
+        """Scores already recorded for this study on this exact data"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT params, n_estimators, score FROM trials WHERE study = ? AND data_hash = ?",
+                (study, data_hash)
+            ).fetchall()
+        return {(params, n_estimators): score for params, n_estimators, score in rows}
+
+    def record(self, study: str, data_hash: str, params: Dict[str, Any], n_estimators: int, score: float) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?)",
+                (study, data_hash, _params_key(params), n_estimators, score, datetime.now().isoformat())
+            )
+
+    def best_params(self, study: str, limit: int) -> List[Dict[str, Any]]:
+        """Top configurations from earlier searches of a study, at their largest budget"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT params, MAX(score) FROM trials t WHERE study = ? AND n_estimators ="
+                " (SELECT MAX(n_estimators) FROM trials WHERE study = t.study AND data_hash = t.data_hash)"
+                " GROUP BY params ORDER BY MAX(score) DESC LIMIT ?",
+                (study, limit)
+            ).fetchall()
+        return [json.loads(params) for params, _ in rows]
+
+class HyperparameterTuner:
+    """Successive-halving hyperparameter search over a process pool.
+
+    Every candidate is first scored with a small fraction of its boosting
+    rounds (or trees); only the best ``1/eta`` advance to a ``eta`` times
+    larger budget, until the survivors run at full size. Each (candidate,
+    budget) score is written to a SQLite journal when ``journal_path`` is set
+    (or ``TUNING_JOURNAL_PATH``), so an interrupted search
+    resumes where it stopped and the next search on new data starts from the
+    previous best configurations.
+    """
+
+    def __init__(self, estimator: str = 'xgb', n_candidates: int = 27, n_estimators: int = 100,
+                 min_n_estimators: int = 10, eta: int = 3, cv: int = 3, scoring: str = 'accuracy',
+                 n_jobs: Optional[int] = None, journal_path: Optional[str] = DEFAULT_JOURNAL_PATH,
+                 study: Optional[str] = None, warm_start_candidates: int = 3, random_state: int = 42):
+        self.estimator = estimator
+        self.n_candidates = n_candidates
+        self.n_estimators = n_estimators
+        self.min_n_estimators = min_n_estimators
+        self.eta = eta
+        self.cv = cv
+        self.scoring = scoring
+        self.n_jobs = n_jobs or DEFAULT_N_JOBS
+        self.journal = TrialJournal(journal_path) if journal_path else None
+        self.study = study or estimator
+        self.warm_start_candidates = warm_start_candidates
+        self.random_state = random_state
+        self.best_params_: Optional[Dict[str, Any]] = None
+        self.best_score_: Optional[float] = None
+        self.results_: List[Dict[str, Any]] = []
+
+    def _candidates(self, param_grid: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Full grid when it is small enough, otherwise a random sample; warm starts go first"""
+        rng = np.random.RandomState(self.random_state)
+        candidates: List[Dict[str, Any]] = []
+        if self.journal is not None and self.warm_start_candidates:
+            for params in self.journal.best_params(self.study, self.warm_start_candidates):
+                # Only reuse past winners that fit the current search space
+                if set(params) == set(param_grid) and all(
+                        not isinstance(space, list) or params[k] in space for k, space in param_grid.items()):
+                    candidates.append(params)
+
+        if all(isinstance(space, list) for space in param_grid.values()):
+            grid = [dict(zip(param_grid, values)) for values in itertools.product(*param_grid.values())]
+            if len(grid) > self.n_candidates:
+                grid = [grid[i] for i in rng.choice(len(grid), self.n_candidates, replace=False)]
+        else:
+            grid = [{k: _sample_value(space, rng) for k, space in param_grid.items()}
+                    for _ in range(self.n_candidates)]
+
+        seen = {_params_key(params) for params in candidates}
+        for params in grid:
+            if _params_key(params) not in seen:
+                seen.add(_params_key(params))
+                candidates.append(params)
+        return candidates[:self.n_candidates]
+
+    def _budgets(self, params: Dict[str, Any]) -> List[int]:
+        """Increasing n_estimators per rung, ending at the candidate's full size"""
+        full = int(params.get('n_estimators', self.n_estimators))
+        n_rungs = max(1, int(math.floor(math.log(max(full / self.min_n_estimators, 1), self.eta))) + 1)
+        return [max(1, int(round(full / self.eta ** (n_rungs - 1 - rung)))) for rung in range(n_rungs)]
+
+    def tune(self, X: Union[pd.DataFrame, np.ndarray], y: Union[pd.Series, np.ndarray],
+             param_grid: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Search param_grid (default: the estimator's space) and return the best parameters"""
+        param_grid = dict(param_grid or DEFAULT_SPACES[self.estimator])
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        y = np.asarray(y)
+        # Fold assignment is fixed for the whole search so scores are comparable across rungs
+        n_splits = max(2, min(self.cv, int(np.bincount(pd.factorize(y)[0]).min())))
+        folds = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=self.random_state).split(X, y))
+        data_hash = _data_hash(X, y)
+        recorded = self.journal.lookup(self.study, data_hash) if self.journal else {}
+        base = _make_estimator(self.estimator, self.random_state)
+
+        survivors = self._candidates(param_grid)
+        n_rungs = max(len(self._budgets(params)) for params in survivors)
+        n_workers = min(self.n_jobs, len(survivors))
+        pool = None
+        if n_workers > 1:
+            # spawn avoids forking a parent whose OpenMP runtimes may already be initialised
+            pool = ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context("spawn"),
+                                       initializer=_init_worker, initargs=(X, y, folds))
+        else:
+            _init_worker(X, y, folds)
+
+        self.results_ = []
+        scores: Dict[str, float] = {}
+        try:
+            for rung in range(n_rungs):
+                pending = []
+                for params in survivors:
+                    budgets = self._budgets(params)
+                    n_estimators = budgets[max(0, len(budgets) - n_rungs + rung)]
+                    key = (_params_key(params), n_estimators)
+                    if key in recorded:
+                        scores[key[0]] = recorded[key]
+                    elif pool is not None:
+                        pending.append((key, params, pool.submit(_evaluate, base, params, n_estimators, self.scoring)))
+                    else:
+                        pending.append((key, params, None))
+
+                # Journal each result as it lands so a crash loses only in-flight work
+                for key, params, future in pending:
+                    score = future.result() if future is not None else _evaluate(base, params, key[1], self.scoring)
+                    scores[key[0]] = recorded[key] = score
+                    if self.journal is not None:
+                        self.journal.record(self.study, data_hash, params, key[1], score)
+                for params in survivors:
+                    self.results_.append({'rung': rung, 'params': params, 'score': scores[_params_key(params)]})
+
+                # Keep the top 1/eta for the next, larger budget
+                survivors = sorted(survivors, key=lambda p: scores[_params_key(p)], reverse=True)
+                if rung < n_rungs - 1:
+                    survivors = survivors[:max(1, len(survivors) // self.eta)]
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        best = survivors[0]
+        self.best_score_ = scores[_params_key(best)]
+        self.best_params_ = {**best, 'n_estimators': int(best.get('n_estimators', self.n_estimators))}
+        return dict(self.best_params_)
+
+    def best_estimator(self, X: Union[pd.DataFrame, np.ndarray], y: Union[pd.Series, np.ndarray]) -> Any:
+        """Fit the best configuration found by tune() on the full data"""
+        if self.best_params_ is None:
+            raise ValueError("Call tune() before best_estimator()")
+        model = _make_estimator(self.estimator, self.random_state).set_params(**self.best_params_)
+        return model.fit(X, y)
@@ -0,0 +1,112 @@
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+DEFAULT_WINDOWS = (3, 5, 10, 20)
+DEFAULT_EWM_SPANS = (5, 10)
+
+def _group_starts(codes: np.ndarray) -> np.ndarray:
+    """Position of the first row of each row's group, for rows sorted by group"""
+    n = len(codes)
+    boundary = np.ones(n, dtype=bool)
+    boundary[1:] = codes[1:] != codes[:-1]
+    return np.maximum.accumulate(np.where(boundary, np.arange(n), 0))
+
+def _rolling(csum: np.ndarray, ccount: np.ndarray, starts: np.ndarray, window: int):
+    """Windowed sums and non-null counts from prefix sums; the window never crosses a group start"""
+    end = np.arange(1, len(starts) + 1)
+    begin = np.maximum(starts, end - window)
+    return csum[end] - csum[begin], ccount[end] - ccount[begin]
+
+def _ewm(values: np.ndarray, valid: np.ndarray, starts: np.ndarray, span: float) -> np.ndarray:
+    """Grouped ``ewm(span, adjust=True).mean()`` as one linear filter over the whole column.
+
+    The filter runs across group boundaries; the part carried over from the
+    previous group is the state just before the group start decayed by
+    ``(1 - alpha) ** k``, so it is subtracted back out.
+    """
+    decay = 1.0 - 2.0 / (span + 1.0)
+    numerator = lfilter([1.0], [1.0, -decay], values)
+    weights = lfilter([1.0], [1.0, -decay], valid.astype(np.float64))
+    offset = np.arange(len(starts)) - starts + 1
+    carried = decay ** offset
+    previous = starts - 1
+    has_previous = previous >= 0
+    numerator[has_previous] -= carried[has_previous] * numerator[previous[has_previous]]
+    weights[has_previous] -= carried[has_previous] * weights[previous[has_previous]]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(weights > 1e-12, numerator / weights, np.nan)
+
+def _streaks(codes: np.ndarray, outcome: np.ndarray):
+    """Run-length encode outcomes per group: length of the current win and loss runs"""
+    n = len(codes)
+    boundary = np.ones(n, dtype=bool)
+    boundary[1:] = (codes[1:] != codes[:-1]) | (outcome[1:] != outcome[:-1])
+    run_start = np.maximum.accumulate(np.where(boundary, np.arange(n), 0))
+    length = np.arange(n) - run_start + 1
+    return np.where(outcome == 1, length, 0), np.where(outcome == -1, length, 0)
+
+def rolling_features(df: pd.DataFrame, group_col: str, date_col: str, value_cols: Sequence[str],
+                     windows: Sequence[int] = DEFAULT_WINDOWS, ewm_spans: Sequence[float] = DEFAULT_EWM_SPANS,
+                     result_col: Optional[str] = None, sums: bool = False, rest_days: bool = False) -> pd.DataFrame:
+    """Rolling, exponentially weighted, streak and rest-day features per group in one pass.
+
+    Rows are sorted once by (group, date); every window comes from the same
+    grouped prefix sums, so the cost is O(rows) per feature regardless of the
+    number of groups. Windows include the current row and use
+    ``min_periods=1``, like ``groupby().rolling(w, min_periods=1)``.
+
+    Columns: ``{col}_mean_{w}`` (and ``{col}_sum_{w}`` when ``sums``),
+    ``{col}_ewm_{span}``, ``rest_days`` when ``rest_days``, and
+    ``win_streak``/``loss_streak`` when ``result_col`` is given (positive =
+    win, negative = loss, 0 = draw). Dates may be numeric, datetimes or
+    strings (parsed with ``pd.to_datetime``). The result is aligned to
+    ``df.index``.
+    """
+    dates = df[date_col]
+    if not pd.api.types.is_numeric_dtype(dates):
+        # CSV-loaded frames carry dates as strings; sorting and gaps need real datetimes
+        dates = pd.to_datetime(dates)
+    dates = dates.values
+    group_codes = pd.factorize(df[group_col])[0]
+    order = np.lexsort((dates, group_codes))
+    codes = group_codes[order]
+    starts = _group_starts(codes)
+    features: Dict[str, np.ndarray] = {}
+
+    for col in value_cols:
+        values = df[col].to_numpy(dtype=np.float64)[order]
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0.0)
+        csum = np.concatenate(([0.0], np.cumsum(filled)))
+        ccount = np.concatenate(([0], np.cumsum(valid)))
+        for window in windows:
+            total, count = _rolling(csum, ccount, starts, window)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                features[f"{col}_mean_{window}"] = np.where(count > 0, total / count, np.nan)
+            if sums:
+                features[f"{col}_sum_{window}"] = np.where(count > 0, total, np.nan)
+        for span in ewm_spans:
+            features[f"{col}_ewm_{span}"] = _ewm(filled, valid, starts, span)
+
+    if rest_days:
+        dates = dates[order]
+        if np.issubdtype(dates.dtype, np.datetime64):
+            gaps = (dates[1:] - dates[:-1]) / np.timedelta64(1, 'D')
+        else:
+            gaps = (dates[1:] - dates[:-1]).astype(np.float64)
+        days = np.full(len(order), np.nan)
+        days[1:] = gaps
+        days[starts == np.arange(len(order))] = np.nan
+        features['rest_days'] = days
+
+    if result_col is not None:
+        outcome = np.sign(df[result_col].to_numpy(dtype=np.float64)[order])
+        features['win_streak'], features['loss_streak'] = _streaks(codes, np.nan_to_num(outcome))
+
+    # Scatter back from sorted order to the caller's row order
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    return pd.DataFrame({name: values[inverse] for name, values in features.items()}, index=df.index)
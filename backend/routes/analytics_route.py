@@ -2,16 +2,25 @@ from fastapi import APIRouter, HTTPException
 from typing import Dict, Any
 import os
 
+from advanced.meta_model import explanation_cache, get_meta_model, ensure_explanations, META_MODEL_PATH
+
 router = APIRouter()
 
 @router.get("/api/shap")
 def get_shap_summary() -> Dict[str, Any]:
-    model_path = os.getenv("MODELS_STORE_PATH", "advanced/models_store/")
-    model_file = os.path.join(model_path, "ensemble_model.pkl")
-    if not os.path.exists(model_file):
-        raise HTTPException(status_code=501, detail="SHAP summary not available: real model not found. Please train and save the ensemble model.")
-    raise HTTPException(status_code=501, detail="SHAP summary endpoint not yet implemented. Integrate with real model and data.")
+    """Precomputed SHAP summary for the current meta model version"""
+    # Never train from a request: without saved artifacts there is nothing to explain
+    if not os.path.exists(META_MODEL_PATH):
+        raise HTTPException(status_code=404, detail="SHAP summary not available: no trained meta model found.")
+    meta_model = get_meta_model()
+    version = meta_model.version
+    summary = explanation_cache.get_summary(version)
+    if summary is None:
+        if ensure_explanations(meta_model):
+            raise HTTPException(status_code=503, detail=f"SHAP summary for model {version} is still being computed.")
+        raise HTTPException(status_code=404, detail=f"SHAP summary for model {version} has not been computed: no training data.")
+    return summary
 
 @router.get("/api/analytics")
 async def get_analytics() -> Dict[str, Any]:
-    raise HTTPException(status_code=501, detail="Analytics endpoint not yet implemented. Connect to real analytics data sources.")
\ No newline at end of file
+    raise HTTPException(status_code=501, detail="Analytics endpoint not yet implemented. Connect to real analytics data sources.")
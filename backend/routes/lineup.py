@@ -77,7 +77,7 @@ def update_espn_stats():
 async def get_prizepicks_projections_route(league_id: Optional[str] = Query("7", description="PrizePicks League ID")):
     try:
         # Use the new service function
-        data = prizepicks_service.fetch_projections_from_api(league_id=league_id)
+        data = await prizepicks_service.fetch_projections_from_api(league_id=league_id)
         return data # FastAPI will serialize according to response_model
     except HTTPException as e:
         # Logged in service, re-raise for FastAPI to handle client response
@@ -92,7 +92,7 @@ async def get_prizepicks_projections_route(league_id: Optional[str] = Query("7",
             description="Fetches a specific player by their ID from PrizePicks API.")
 async def get_prizepicks_player_route(player_id: str):
     try:
-        player_data = prizepicks_service.fetch_player_from_api(player_id=player_id)
+        player_data = await prizepicks_service.fetch_player_from_api(player_id=player_id)
         return player_data
     except HTTPException as e:
         raise e
@@ -106,7 +106,7 @@ async def get_prizepicks_player_route(player_id: str):
             description="Fetches details for a single projection (prop) by its ID from PrizePicks API.")
 async def get_prizepicks_single_prop_route(prop_id: str):
     try:
-        projection_data = prizepicks_service.fetch_single_projection_from_api(projection_id=prop_id)
+        projection_data = await prizepicks_service.fetch_single_projection_from_api(projection_id=prop_id)
         return projection_data
     except HTTPException as e:
         raise e
@@ -114,6 +114,17 @@ async def get_prizepicks_single_prop_route(prop_id: str):
         logger.logger.error(f"Unhandled error in prizepicks/prop/{prop_id} route: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error fetching prop {prop_id}.")
 
+@router.get("/prizepicks/client-stats",
+            response_model=Dict[str, Any],
+            summary="PrizePicks Client Metrics",
+            description="Upstream request counts, errors and latency percentiles of the pooled PrizePicks client.")
+async def get_prizepicks_client_stats_route():
+    return prizepicks_service.get_client_stats()
+
+@router.on_event("shutdown")
+async def close_prizepicks_client():
+    await prizepicks_service.close_client()
+
 # --- Lineup Data Loading and Endpoint (reading from predictions_latest.csv for now) ---
 def load_lineup_data_from_csv():
     # This path should be relative to the backend directory, or use absolute paths
@@ -1,7 +1,8 @@
 # backend/routes/predictions.py
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
+import numpy as np
 import pandas as pd
 import os
 import joblib
@@ -9,6 +10,9 @@ import json
 import logging
 import sys
 
+from services.prediction_batcher import PredictionBatcher
+from services.prediction_cache import PredictionCache
+
 router = APIRouter()
 logger = logging.getLogger("ml_predict")
 
@@ -39,23 +43,52 @@ if os.path.exists(MODEL_PATH) and os.path.exists(SCALER_PATH) and os.path.exists
 else:
     logger.warning("ML model, scaler, or features not found. /ml/predict will not work.")
 
+def _feature_order() -> List[str]:
+    # selected_features.json stores {"feature_order": [...], ...}; older files are a bare list
+    if isinstance(selected_features, dict):
+        return list(selected_features.get("feature_order", []))
+    return list(selected_features)
+
+def _score_batch(feature_dicts: List[Dict[str, Any]]) -> List[Tuple[str, float]]:
+    """Scale and score many requests with one predict_proba call"""
+    order = _feature_order()
+    X = pd.DataFrame([{k: f.get(k, 0) for k in order} for f in feature_dicts], columns=order)
+    X_scaled = scaler.transform(X)
+    if hasattr(model, "predict_proba"):
+        proba = model.predict_proba(X_scaled)
+        best = np.argmax(proba, axis=1)
+        preds = model.classes_[best]
+        confidences = proba[np.arange(len(best)), best]
+    else:
+        preds = model.predict(X_scaled)
+        confidences = np.full(len(preds), 0.5)
+    return [(str(pred), float(conf)) for pred, conf in zip(preds, confidences)]
+
+def _model_version() -> Tuple[float, int]:
+    # The joblib file's mtime/size identifies the model that was loaded at startup
+    stat = os.stat(MODEL_PATH)
+    return (stat.st_mtime, stat.st_size)
+
+# Concurrent /ml/predict calls are coalesced into one vectorized model call
+batcher = PredictionBatcher(_score_batch)
+# Repeated feature vectors are answered without touching the model
+cache = PredictionCache()
+model_version = _model_version() if model is not None else None
+
 @router.post("/ml/predict", response_model=PredictionResponse, summary="Run ML prediction on input features")
 async def ml_predict(request: PredictionRequest):
     if not (model and scaler and selected_features):
         logger.error("ML model, scaler, or features not loaded.")
         raise HTTPException(status_code=500, detail="ML model not available.")
     try:
-        # Select and order features
-        input_data = {k: request.features.get(k, 0) for k in selected_features}
-        X = pd.DataFrame([input_data])
-        X_scaled = scaler.transform(X)
-        pred = model.predict(X_scaled)[0]
-        if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(X_scaled)[0]
-            confidence = float(max(proba))
-        else:
-            confidence = 0.5
-        predicted_outcome = str(pred)
+        order = _feature_order()
+        row = np.array([[float(request.features.get(k, 0)) for k in order]])
+        key = cache.make_keys(row, order, model_version)[0]
+        cached = cache.get(key)
+        if cached is None:
+            cached = await batcher.submit(request.features)
+            cache.put(key, cached)
+        predicted_outcome, confidence = cached
         prop_id = request.features.get("propId", "unknown")
         return PredictionResponse(
             propId=prop_id,
@@ -66,3 +99,11 @@ async def ml_predict(request: PredictionRequest):
     except Exception as e:
         logger.error(f"Error running ML prediction: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Prediction failed.")
+
+@router.get("/ml/predict/stats", summary="Request coalescing settings and batch metrics")
+async def ml_predict_stats() -> Dict[str, Any]:
+    return batcher.get_stats()
+
+@router.get("/ml/predict/cache-stats", summary="Prediction cache size and hit ratio")
+async def ml_predict_cache_stats() -> Dict[str, Any]:
+    return cache.get_stats()
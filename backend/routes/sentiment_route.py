@@ -2,14 +2,34 @@ from fastapi import APIRouter, HTTPException, Path
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 import os
+import asyncio
 import logging
 import time
+from functools import lru_cache
 from dotenv import load_dotenv
+from advanced.text_dedup import DuplicateFilter
+from advanced.trending_terms import TrendingTerms
+from services.sentiment_cache import StaleWhileRevalidateCache
 
 router = APIRouter()
 logger = logging.getLogger("sentiment_route")
 load_dotenv()
 
+# Per-topic near-duplicate index shared across requests; cross-posts reuse earlier scores
+duplicate_filter = DuplicateFilter()
+
+# Per-topic heavy-hitter sketches; memory per topic is bounded regardless of traffic
+trending_terms = TrendingTerms()
+
+# Topic results served fresh, then stale while a background refresh runs
+topic_cache = StaleWhileRevalidateCache()
+
+REDDIT_CONCURRENCY = int(os.getenv("SENTIMENT_REDDIT_CONCURRENCY", "4"))
+BATCH_MAX_TOPICS = int(os.getenv("SENTIMENT_BATCH_MAX_TOPICS", "50"))
+_reddit_limit = asyncio.Semaphore(REDDIT_CONCURRENCY)
+_reddit_client = None
+_reddit_lock = asyncio.Lock()
+
 class SentimentRequest(BaseModel):
     text: Optional[str] = None # If providing text directly
     topic: Optional[str] = None # If service should find relevant text for a topic
@@ -23,62 +43,121 @@ class SentimentResponse(BaseModel):
     trending_terms: Optional[List[str]] = None
     raw_output: Optional[Dict[str, Any]] = None
 
-async def fetch_reddit_posts(topic: str, limit: int = 20) -> List[str]:
-    import asyncpraw
+class SentimentBatchRequest(BaseModel):
+    topics: List[str]
+
+class SentimentBatchResponse(BaseModel):
+    results: List[SentimentResponse]
+    errors: Dict[str, str] = {}
+
+@lru_cache(maxsize=1)
+def get_vader_analyzer():
+    """Process-wide VADER analyzer; the lexicon is checked (and downloaded) once"""
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    import nltk
+    try:
+        nltk.data.find('sentiment/vader_lexicon.zip')
+    except LookupError:
+        nltk.download('vader_lexicon')
+    return SentimentIntensityAnalyzer()
+
+async def get_reddit_client():
+    """Shared asyncpraw client (one HTTP session) created on first use; None without credentials"""
+    global _reddit_client
     REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
     REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
     REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT", "betbot-sentiment/0.1")
     if not (REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET):
+        return None
+    async with _reddit_lock:
+        if _reddit_client is None:
+            import asyncpraw
+            _reddit_client = asyncpraw.Reddit(
+                client_id=REDDIT_CLIENT_ID,
+                client_secret=REDDIT_CLIENT_SECRET,
+                user_agent=REDDIT_USER_AGENT
+            )
+        return _reddit_client
+
+async def close_reddit_client():
+    """Close the shared Reddit client, e.g. on application shutdown"""
+    global _reddit_client
+    async with _reddit_lock:
+        if _reddit_client is not None:
+            await _reddit_client.close()
+            _reddit_client = None
+
+async def fetch_reddit_posts(topic: str, limit: int = 20) -> List[str]:
+    """Recent post texts for a topic; API errors propagate so a failed fetch is never cached as neutral"""
+    reddit = await get_reddit_client()
+    if reddit is None:
         logger.warning("Reddit API keys not set in .env. Skipping Reddit sentiment.")
         return []
     try:
-        reddit = asyncpraw.Reddit(
-            client_id=REDDIT_CLIENT_ID,
-            client_secret=REDDIT_CLIENT_SECRET,
-            user_agent=REDDIT_USER_AGENT
-        )
         posts = []
-        subreddit = await reddit.subreddit("sportsbook")
-        async for post in subreddit.search(topic, sort="new", limit=limit):
-            if post.selftext:
-                posts.append(post.selftext)
-            else:
-                posts.append(post.title)
-        await reddit.close()
+        async with _reddit_limit:
+            subreddit = await reddit.subreddit("sportsbook")
+            async for post in subreddit.search(topic, sort="new", limit=limit):
+                if post.selftext:
+                    posts.append(post.selftext)
+                else:
+                    posts.append(post.title)
         return posts
     except Exception as e:
         logger.error(f"Error fetching Reddit posts: {e}", exc_info=True)
-        return []
+        raise
 
-async def analyze_sentiment_vader(texts: List[str]) -> Dict[str, Any]:
-    from nltk.sentiment import SentimentIntensityAnalyzer
-    import nltk
-    try:
-        nltk.data.find('sentiment/vader_lexicon.zip')
-    except LookupError:
-        nltk.download('vader_lexicon')
-    sia = SentimentIntensityAnalyzer()
-    scores = []
-    all_words = []
-    for text in texts:
-        score = sia.polarity_scores(text)
-        scores.append(score)
-        all_words.extend([w.lower() for w in text.split() if len(w) > 3])
-    if not scores:
-        return {"compound": 0.0, "label": "neutral", "confidence": 0.5, "trending_terms": []}
-    avg_compound = sum(s["compound"] for s in scores) / len(scores)
+async def analyze_sentiment_vader(texts: List[str], topic: str = "") -> Dict[str, Any]:
+    sia = get_vader_analyzer()
+    if not texts:
+        return {"compound": 0.0, "label": "neutral", "confidence": 0.5, "trending_terms": trending_terms.top_k(topic, 5)}
+    filtered = duplicate_filter.score(topic, texts, lambda unique: [sia.polarity_scores(t)["compound"] for t in unique])
+    logger.info(f"Scored {filtered['scored']} of {filtered['texts']} posts for '{topic}' ({filtered['saved']} near duplicates)")
+    avg_compound = float(filtered["scores"].mean())
     label = "positive" if avg_compound > 0.2 else "negative" if avg_compound < -0.2 else "neutral"
     confidence = abs(avg_compound)
-    # Trending terms: top 5 most common words
-    from collections import Counter
-    trending_terms = [w for w, _ in Counter(all_words).most_common(5)]
+    # Trending terms: only posts not seen on earlier polls feed the decayed sketches
+    trending_terms.update(topic, [text for text, is_new in zip(texts, filtered["new"]) if is_new])
     return {
         "compound": avg_compound,
         "label": label,
         "confidence": confidence,
-        "trending_terms": trending_terms
+        "trending_terms": trending_terms.top_k(topic, 5)
     }
 
+async def compute_topic_sentiment(topic: str) -> SentimentResponse:
+    """Fetch and score posts for a topic, bypassing the cache"""
+    posts = await fetch_reddit_posts(topic, limit=20)
+    if not posts:
+        logger.warning(f"No Reddit posts found for topic '{topic}'. Returning neutral sentiment.")
+        return SentimentResponse(
+            topic=topic,
+            sentiment_score=0.0,
+            sentiment_label="neutral",
+            confidence=0.5,
+            related_articles_count=0,
+            trending_terms=[],
+            raw_output={}
+        )
+    sentiment = await analyze_sentiment_vader(posts, topic)
+    return SentimentResponse(
+        topic=topic,
+        sentiment_score=sentiment["compound"],
+        sentiment_label=sentiment["label"],
+        confidence=sentiment["confidence"],
+        related_articles_count=len(posts),
+        trending_terms=sentiment["trending_terms"],
+        raw_output=sentiment
+    )
+
+def _cache_key(topic: str) -> str:
+    return " ".join(topic.lower().split())
+
+async def get_topic_sentiment(topic: str) -> SentimentResponse:
+    """Cached topic sentiment: fresh hit, stale hit with background refresh, or one shared load"""
+    result = await topic_cache.get(_cache_key(topic), lambda: compute_topic_sentiment(topic))
+    return result if result.topic == topic else result.model_copy(update={"topic": topic})
+
 @router.get("/sentiment/{topic}", response_model=SentimentResponse, summary="Get Sentiment Analysis for a Topic")
 async def get_sentiment_for_topic(
     topic: str = Path(..., description="The topic phrase to analyze sentiment for (e.g., 'Bitcoin price', 'Lakers next game')")
@@ -87,32 +166,36 @@ async def get_sentiment_for_topic(
     if not topic or topic.isspace():
         raise HTTPException(status_code=400, detail="Topic cannot be empty.")
     try:
-        posts = await fetch_reddit_posts(topic, limit=20)
-        if not posts:
-            logger.warning(f"No Reddit posts found for topic '{topic}'. Returning neutral sentiment.")
-            return SentimentResponse(
-                topic=topic,
-                sentiment_score=0.0,
-                sentiment_label="neutral",
-                confidence=0.5,
-                related_articles_count=0,
-                trending_terms=[],
-                raw_output={}
-            )
-        sentiment = await analyze_sentiment_vader(posts)
-        return SentimentResponse(
-            topic=topic,
-            sentiment_score=sentiment["compound"],
-            sentiment_label=sentiment["label"],
-            confidence=sentiment["confidence"],
-            related_articles_count=len(posts),
-            trending_terms=sentiment["trending_terms"],
-            raw_output=sentiment
-        )
+        return await get_topic_sentiment(topic)
     except Exception as e:
         logger.error(f"Error performing sentiment analysis for topic '{topic}': {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error performing sentiment analysis.")
 
+@router.post("/sentiment/batch", response_model=SentimentBatchResponse, summary="Get Sentiment Analysis for Many Topics")
+async def get_sentiment_batch(request: SentimentBatchRequest):
+    topics = list(dict.fromkeys(topic for topic in request.topics if topic and not topic.isspace()))
+    if not topics:
+        raise HTTPException(status_code=400, detail="At least one non-empty topic is required.")
+    if len(topics) > BATCH_MAX_TOPICS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_TOPICS} topics per request.")
+    start = time.perf_counter()
+    # Cache hits return at once; misses share the bounded Reddit fetch pool
+    outcomes = await asyncio.gather(*[get_topic_sentiment(topic) for topic in topics], return_exceptions=True)
+    results, errors = [], {}
+    for topic, outcome in zip(topics, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Error performing sentiment analysis for topic '{topic}': {outcome}")
+            errors[topic] = "Error performing sentiment analysis."
+        else:
+            results.append(outcome)
+    logger.info(f"Batch sentiment for {len(topics)} topics in {time.perf_counter() - start:.2f}s "
+                f"(cache: {topic_cache.stats()})")
+    return SentimentBatchResponse(results=results, errors=errors)
+
+@router.on_event("shutdown")
+async def close_sentiment_clients():
+    await close_reddit_client()
+
 # Removed commented-out mock sentiment POST endpoint. All logic is real or scaffolded for real data.
 # @router.post("/sentiment/analyze-text", response_model=SentimentResponse)
 # async def analyze_text_sentiment(request: SentimentRequest):
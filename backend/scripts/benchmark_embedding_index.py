@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced.embedding_index import EmbeddingIndex, IVFIndex
+
+def make_embeddings(n_players, dim, n_clusters, rng):
+    """Clustered synthetic embeddings, like players grouped by position and style"""
+    centers = rng.normal(size=(n_clusters, dim))
+    labels = rng.randint(0, n_clusters, n_players)
+    return (centers[labels] + rng.normal(scale=0.6, size=(n_players, dim))).astype(np.float32)
+
+def loop_similar(ids, embeddings, player_id, top_k):
+    """The previous per-pair Python loop"""
+    target = embeddings[player_id]
+    similarities = []
+    for pid, embedding in embeddings.items():
+        if pid != player_id:
+            similarities.append((pid, np.dot(target, embedding) / (np.linalg.norm(target) * np.linalg.norm(embedding))))
+    similarities.sort(key=lambda x: x[1], reverse=True)
+    return similarities[:top_k]
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main(n_players=100_000, dim=32, n_queries=1000, top_k=10):
+    rng = np.random.RandomState(42)
+    vectors = make_embeddings(n_players, dim, 200, rng)
+    ids = [f"player{i}" for i in range(n_players)]
+    query_ids = [ids[i] for i in rng.choice(n_players, n_queries, replace=False)]
+    print(f"{n_players} players, dim={dim}, {n_queries} queries, top_k={top_k}")
+
+    loop_queries = 5
+    as_dict = dict(zip(ids, vectors))
+    _, loop_s = timed(lambda: [loop_similar(ids, as_dict, q, top_k) for q in query_ids[:loop_queries]])
+    print(f"{'python loop':<28} {1000 * loop_s / loop_queries:>9.2f} ms/query  recall=1.000")
+
+    exact, build_s = timed(lambda: EmbeddingIndex(ids, vectors))
+    truth, single_s = timed(lambda: [exact.similar(q, top_k) for q in query_ids])
+    _, batch_s = timed(lambda: exact.similar_batch(query_ids, top_k))
+    print(f"{'exact matvec':<28} {1000 * single_s / n_queries:>9.2f} ms/query  recall=1.000  (build {build_s:.2f}s)")
+    print(f"{'exact batched':<28} {1000 * batch_s / n_queries:>9.2f} ms/query  recall=1.000")
+
+    truth_sets = [set(player for player, _ in result) for result in truth]
+    ivf, build_s = timed(lambda: IVFIndex(ids, vectors))
+    print(f"IVF build: {ivf.n_lists} lists in {build_s:.2f}s")
+    for n_probe in (1, 4, 8, 16, 32):
+        ivf.n_probe = n_probe
+        results, ivf_s = timed(lambda: ivf.similar_batch(query_ids, top_k))
+        recall = np.mean([len(truth_sets[i] & set(player for player, _ in results[q])) / top_k
+                          for i, q in enumerate(query_ids)])
+        print(f"{'IVF n_probe=' + str(n_probe):<28} {1000 * ivf_s / n_queries:>9.2f} ms/query  recall={recall:.3f}")
+
+if __name__ == "__main__":
+    main()
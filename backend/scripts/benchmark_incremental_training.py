@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, roc_auc_score, log_loss
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced.train_predict import ModelTrainer
+
+def make_matches(n_rows, n_features, drift, rng):
+    """Synthetic match features whose decision boundary drifts over time"""
+    X = rng.normal(size=(n_rows, n_features))
+    logits = X[:, 0] + (1 - drift) * X[:, 1] * X[:, 2] + drift * X[:, 3] + rng.normal(scale=0.5, size=n_rows)
+    data = pd.DataFrame(X, columns=[f"f{i}" for i in range(n_features)])
+    data['target'] = (logits > 0).astype(int)
+    return data
+
+def evaluate(trainer, data):
+    """Calibrated-model metrics on rows the trainer has not seen"""
+    _, proba = trainer.predict(data.drop(columns=['target']))
+    y = data['target'].values
+    return {
+        'accuracy': accuracy_score(y, proba.argmax(axis=1)),
+        'roc_auc': roc_auc_score(y, proba[:, 1]),
+        'log_loss': log_loss(y, proba)
+    }
+
+def main(n_history=20000, n_days=5, rows_per_day=1000, n_features=20, n_new_estimators=20):
+    rng = np.random.RandomState(42)
+    history = make_matches(n_history, n_features, 0.0, rng)
+    days = [make_matches(rows_per_day, n_features, (day + 1) / (2 * n_days), rng) for day in range(n_days + 1)]
+
+    with tempfile.TemporaryDirectory() as inc_dir, tempfile.TemporaryDirectory() as full_dir:
+        incremental = ModelTrainer(model_dir=inc_dir)
+        start = time.perf_counter()
+        incremental.train_models(history, 'target')
+        print(f"initial full train on {n_history} rows: {time.perf_counter() - start:.2f}s")
+
+        seen = history
+        print(f"{'day':>3} {'rows':>6} {'inc_s':>7} {'full_s':>7} {'speedup':>7} "
+              f"{'acc_inc':>7} {'acc_full':>8} {'auc_inc':>7} {'auc_full':>8} {'ll_inc':>7} {'ll_full':>7}")
+        for day in range(n_days):
+            new_rows, future = days[day], days[day + 1]
+            seen = pd.concat([seen, new_rows], ignore_index=True)
+
+            start = time.perf_counter()
+            incremental.update_models(new_rows, 'target', n_new_estimators=n_new_estimators)
+            inc_s = time.perf_counter() - start
+
+            full = ModelTrainer(model_dir=full_dir)
+            start = time.perf_counter()
+            full.train_models(seen, 'target')
+            full_s = time.perf_counter() - start
+
+            inc_m, full_m = evaluate(incremental, future), evaluate(full, future)
+            print(f"{day + 1:>3} {len(seen):>6} {inc_s:>7.2f} {full_s:>7.2f} {full_s / inc_s:>6.1f}x "
+                  f"{inc_m['accuracy']:>7.4f} {full_m['accuracy']:>8.4f} {inc_m['roc_auc']:>7.4f} "
+                  f"{full_m['roc_auc']:>8.4f} {inc_m['log_loss']:>7.4f} {full_m['log_loss']:>7.4f}")
+
+if __name__ == "__main__":
+    main()
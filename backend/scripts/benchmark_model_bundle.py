@@ -0,0 +1,111 @@
+import os
+import sys
+import time
+import tempfile
+import multiprocessing as mp
+import joblib
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ml_service import MLService
+
+def _memory_kb():
+    """Rss, Pss and private memory of this process from /proc"""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:", "Private_Clean:", "Private_Dirty:"):
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    fields['Private'] = fields.pop('Private_Clean', 0) + fields.pop('Private_Dirty', 0)
+    return fields
+
+def _legacy_worker(model_dir, feature_order, rows, barrier, results):
+    before = _memory_kb()
+    start = time.perf_counter()
+    models = {name: joblib.load(os.path.join(model_dir, f"{name}_model.joblib"))
+              for name in ['rf', 'gb', 'xgb', 'lgb', 'calibrated']}
+    scaler = joblib.load(os.path.join(model_dir, "scaler.joblib"))
+    models['calibrated'].predict_proba(scaler.transform(pd.DataFrame(rows, columns=feature_order)))
+    load_s = time.perf_counter() - start
+    barrier.wait()  # every worker is resident before memory is sampled
+    after = _memory_kb()
+    results.put(('legacy', load_s, {k: after[k] - before[k] for k in after}))
+    barrier.wait()
+
+def _bundle_worker(model_dir, feature_order, rows, barrier, results):
+    before = _memory_kb()
+    start = time.perf_counter()
+    service = MLService(model_dir=model_dir)
+    service.load_models()
+    service.predict_batch(rows, feature_order)
+    load_s = time.perf_counter() - start
+    barrier.wait()
+    after = _memory_kb()
+    results.put(('bundle', load_s, {k: after[k] - before[k] for k in after}))
+    barrier.wait()
+
+def _run(worker, n_workers, model_dir, feature_order, rows):
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(n_workers)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(model_dir, feature_order, rows, barrier, results))
+             for _ in range(n_workers)]
+    for p in procs:
+        p.start()
+    rows_out = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return rows_out
+
+def _latency_ms(model, X, repeats=5):
+    model.predict_proba(X)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        model.predict_proba(X)
+    return (time.perf_counter() - start) / repeats * 1000
+
+def _crossover(model_dir, data, feature_order, batch_sizes):
+    """Compiled vs native predict_proba latency per batch size, to place COMPILED_PREDICT_MAX_ROWS"""
+    service = MLService(model_dir=model_dir)
+    service.load_models()
+    compiled = service.bundle.load_compiled('calibrated')
+    native = service.bundle.load_estimator('calibrated')
+    for size in batch_sizes:
+        X = service.scaler.transform(data[feature_order].head(size))
+        compiled_ms, native_ms = _latency_ms(compiled, X), _latency_ms(native, X)
+        faster = "compiled" if compiled_ms < native_ms else "native"
+        print(f"rows={size:<6} compiled={compiled_ms:8.2f}ms native={native_ms:8.2f}ms faster={faster}")
+
+def main(n_workers=4, n_rows=20000, n_features=30, batch_sizes=(1, 16, 64, 256, 1000, 5000)):
+    rng = np.random.RandomState(42)
+    feature_order = [f"f{i}" for i in range(n_features)]
+    data = pd.DataFrame(rng.normal(size=(n_rows, n_features)), columns=feature_order)
+    data['target'] = (data['f0'] + data['f1'] * data['f2'] + rng.normal(scale=0.5, size=n_rows) > 0).astype(int)
+    rows = data[feature_order].head(16).to_dict(orient='records')
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        service = MLService(model_dir=model_dir)
+        service.train_models(data, 'target')
+
+        # Previous on-disk layout: one pickle per model plus the scaler
+        for name in ['rf', 'gb', 'xgb', 'lgb', 'calibrated']:
+            joblib.dump(service.models[name], os.path.join(model_dir, f"{name}_model.joblib"))
+        joblib.dump(service.scaler, os.path.join(model_dir, "scaler.joblib"))
+
+        for label, worker in (("legacy joblib", _legacy_worker), ("bundle + mmap", _bundle_worker)):
+            out = _run(worker, n_workers, model_dir, feature_order, rows)
+            load = np.mean([r[1] for r in out]) * 1000
+            rss = np.mean([r[2]['Rss'] for r in out]) / 1024
+            pss = np.mean([r[2]['Pss'] for r in out]) / 1024
+            private = np.mean([r[2]['Private'] for r in out]) / 1024
+            print(f"{label:<14} workers={n_workers} load={load:8.1f}ms "
+                  f"rss/worker={rss:7.1f}MB pss/worker={pss:7.1f}MB private/worker={private:7.1f}MB")
+
+        _crossover(model_dir, data, feature_order, batch_sizes)
+
+if __name__ == "__main__":
+    main()
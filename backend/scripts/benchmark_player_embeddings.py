@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced.player_embeddings import PlayerEmbeddings, PlayerEmbeddingModel
+
+def make_players(n_players, n_features, rng):
+    """Synthetic player stat table with correlated columns"""
+    latent = rng.normal(size=(n_players, 8))
+    stats = latent @ rng.normal(size=(8, n_features)) + rng.normal(scale=0.3, size=(n_players, n_features))
+    return pd.DataFrame(stats, columns=[f"stat_{i}" for i in range(n_features)])
+
+def dataloader_samples_per_sec(features, embedding_dim, batch_size, epochs):
+    """The previous loop: DataLoader over a per-item Dataset"""
+    model = PlayerEmbeddingModel(features.shape[1], embedding_dim)
+    optimizer = torch.optim.Adam(model.parameters())
+    criterion = nn.MSELoss()
+    loader = DataLoader(torch.FloatTensor(features), batch_size=batch_size, shuffle=True)
+    start = time.perf_counter()
+    for _ in range(epochs):
+        for batch in loader:
+            optimizer.zero_grad()
+            loss = criterion(model(batch), batch)
+            loss.backward()
+            optimizer.step()
+    return len(features) * epochs / (time.perf_counter() - start)
+
+def main(n_players=100_000, n_features=40, embedding_dim=32, epochs=3):
+    rng = np.random.RandomState(42)
+    players = make_players(n_players, n_features, rng)
+    print(f"{n_players} players x {n_features} features, {epochs} epochs, {torch.get_num_threads()} threads available")
+
+    features = PlayerEmbeddings(embedding_dim).prepare_features(players)
+    for batch_size in (32, 256):
+        rate = dataloader_samples_per_sec(features, embedding_dim, batch_size, epochs)
+        print(f"DataLoader loop        batch={batch_size:<4}           {rate:>10,.0f} samples/s")
+
+    for batch_size in (32, 256, 1024):
+        for num_threads in (1, 4, None):
+            embeddings = PlayerEmbeddings(embedding_dim)
+            history = embeddings.train_model(players, epochs=epochs, batch_size=batch_size, patience=epochs,
+                                             num_threads=num_threads, verbose=False)
+            threads = num_threads or torch.get_num_threads()
+            print(f"tensor batching        batch={batch_size:<4} threads={threads:<3} "
+                  f"{history['samples_per_sec']:>10,.0f} samples/s  val_loss={history['val_loss'][-1]:.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+import numpy as np
+from transformers import pipeline
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced.sentiment_scoring import score_texts
+
+WORDS = ("great win terrible loss injury comeback coach defense brilliant awful "
+         "transfer rumor lineup fans season title relegation form striker keeper").split()
+
+def make_posts(n_posts, rng):
+    """Synthetic posts of mixed length with some reposted duplicates"""
+    posts = [" ".join(rng.choice(WORDS, rng.randint(5, 120))) for _ in range(n_posts)]
+    for i in rng.choice(n_posts, n_posts // 10, replace=False):
+        posts[i] = posts[rng.randint(n_posts)]
+    return posts
+
+def per_post_posts_per_sec(texts, transformer, vader):
+    """The previous loop: one VADER call and one forward pass per post"""
+    start = time.perf_counter()
+    for text in texts:
+        vader.polarity_scores(text)
+        transformer(text, truncation=True)
+    return len(texts) / (time.perf_counter() - start)
+
+def main(n_posts=1000):
+    rng = np.random.RandomState(42)
+    texts = make_posts(n_posts, rng)
+    transformer = pipeline('sentiment-analysis')
+    vader = SentimentIntensityAnalyzer()
+    print(f"{n_posts} posts")
+
+    print(f"per-post loop                  {per_post_posts_per_sec(texts, transformer, vader):>10,.1f} posts/s")
+    for batch_size in (8, 32, 64):
+        stats = score_texts(texts, transformer, vader, batch_size=batch_size)
+        passes = int(np.ceil(stats['unique'] / batch_size))
+        print(f"batched        batch={batch_size:<4} passes={passes:<4} {stats['posts_per_sec']:>10,.1f} posts/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced.text_dedup import DuplicateFilter
+
+WORDS = ("lakers celtics warriors win loss tonight injury report starting lineup spread over under "
+         "points rebounds assists lock hammer fade value play parlay bet odds line moved sharp money "
+         "coach rotation minutes bench defense offense shooting slump streak home road").split()
+SUFFIXES = ["", " #nba", " 🔥🔥", " https://t.co/abc123", " (via @picks)", "!!"]
+
+def make_corpus(n_polls, posts_per_poll, topics, rng):
+    """Polls of posts where retweets, cross-posts and copied picks reuse earlier texts"""
+    originals = {topic: [] for topic in topics}
+    polls = []
+    for _ in range(n_polls):
+        poll = []
+        for _ in range(posts_per_poll):
+            topic = topics[rng.randint(len(topics))]
+            seen = originals[topic]
+            kind = rng.rand()
+            if seen and kind < 0.25:
+                text = f"RT @user{rng.randint(1000)}: {seen[rng.randint(len(seen))]}"
+            elif seen and kind < 0.40:
+                text = seen[rng.randint(len(seen))] + SUFFIXES[rng.randint(len(SUFFIXES))]
+            elif seen and kind < 0.50:
+                # Copy-pasted pick with one word changed
+                words = seen[rng.randint(len(seen))].split()
+                words[rng.randint(len(words))] = WORDS[rng.randint(len(WORDS))]
+                text = " ".join(words)
+            else:
+                text = " ".join(rng.choice(WORDS, rng.randint(12, 40)))
+                seen.append(text)
+            poll.append({'topic': topic, 'text': text})
+        polls.append(poll)
+    return polls
+
+def load_corpus(path, poll_size):
+    """Recorded posts as JSON lines with ``topic`` and ``text``, replayed in polls of ``poll_size``"""
+    with open(path) as f:
+        posts = [json.loads(line) for line in f if line.strip()]
+    return [posts[start:start + poll_size] for start in range(0, len(posts), poll_size)]
+
+def main():
+    parser = argparse.ArgumentParser(description='Inference saved by near-duplicate filtering')
+    parser.add_argument('--corpus', help='JSONL of recorded posts with topic and text fields')
+    parser.add_argument('--poll-size', type=int, default=500)
+    args = parser.parse_args()
+
+    if args.corpus:
+        polls = load_corpus(args.corpus, args.poll_size)
+    else:
+        polls = make_corpus(20, args.poll_size, ['lakers', 'celtics', 'warriors', 'nuggets'], np.random.RandomState(42))
+
+    dedup = DuplicateFilter()
+    n_texts = exact_scored = near_scored = 0
+    seen_exact = set()
+    start = time.perf_counter()
+    for poll in polls:
+        texts = [post['text'] for post in poll]
+        topics = [post['topic'] for post in poll]
+        # Exact-match cache across polls: the best a plain dict could do
+        keys = set(zip(topics, texts)) - seen_exact
+        seen_exact |= keys
+        exact_scored += len(keys)
+        near_scored += dedup.score(topics, texts, lambda unique: np.zeros(len(unique)))['scored']
+        n_texts += len(texts)
+    seconds = time.perf_counter() - start
+
+    print(f"{n_texts} posts in {len(polls)} polls")
+    print(f"no dedup               {n_texts:>8} inferences")
+    print(f"exact-match cache      {exact_scored:>8} inferences  saved {1 - exact_scored / n_texts:>6.1%}")
+    print(f"MinHash LSH            {near_scored:>8} inferences  saved {1 - near_scored / n_texts:>6.1%}")
+    print(f"fingerprint + lookup   {seconds / n_texts * 1e6:>8.1f} us/post")
+
+if __name__ == "__main__":
+    main()
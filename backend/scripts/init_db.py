@@ -117,6 +117,7 @@ def init_database():
         cur.execute("CREATE INDEX IF NOT EXISTS idx_predictions_match ON predictions(match_id)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_player_stats_player ON player_stats(player_id)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_social_sentiment_team ON social_sentiment(team_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_social_sentiment_team_created ON social_sentiment(team_id, created_at DESC)")
         
         # Commit changes
         conn.commit()
@@ -1,5 +1,6 @@
 import os
 import sys
+import argparse
 import pandas as pd
 import numpy as np
 from dotenv import load_dotenv
@@ -11,35 +12,40 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import custom modules
 from advanced.meta_model import MetaModel
 from advanced.player_embeddings import PlayerEmbeddings
-from advanced.social_sentiment import SocialSentimentAnalyzer
+from advanced.social_sentiment import get_analyzer
 from advanced.train_predict import ModelTrainer
+from model_training.rolling_features import rolling_features
+from model_training import dataset
 
 # Load environment variables
 load_dotenv()
 
-def load_training_data():
-    """Load and prepare training data"""
+MATCH_COLUMNS = ['id', 'home_team_id', 'away_team_id', 'home_score', 'away_score', 'match_date']
+
+def load_training_data(seasons=None, sports=None, start_date=None, end_date=None):
+    """Load training data from the partitioned Parquet copies of the CSVs"""
     try:
-        # Load match data
-        matches_df = pd.read_csv('backend/data/matches.csv')
-        matches_df['match_date'] = pd.to_datetime(matches_df['match_date'])
+        # Read only the match columns the features use; season/sport/date filters are pushed down.
+        # The filtered matches are held in memory: rolling features need each team's full history
+        matches_df = dataset.load('matches', columns=MATCH_COLUMNS, seasons=seasons, sports=sports,
+                                  start_date=start_date, end_date=end_date)
         
         # Load player stats
-        player_stats_df = pd.read_csv('backend/data/player_stats.csv')
+        player_stats_df = dataset.load('player_stats')
         
         # Load team data
-        teams_df = pd.read_csv('backend/data/teams.csv')
+        teams_df = dataset.load('teams')
         
         return matches_df, player_stats_df, teams_df
     except Exception as e:
         print(f"Error loading training data: {e}")
         sys.exit(1)
 
-def prepare_features(matches_df, player_stats_df, teams_df):
+def prepare_features(matches_df, player_stats_df, teams_df, keep_dates=False):
     """Prepare features for model training"""
-    # Merge data
+    # Merge data; only the join keys are needed, which keeps the merges narrow
     df = matches_df.merge(
-        player_stats_df,
+        player_stats_df[['match_id']],
         left_on='id',
         right_on='match_id',
         how='left'
@@ -47,7 +53,7 @@ def prepare_features(matches_df, player_stats_df, teams_df):
     
     # Add team features
     df = df.merge(
-        teams_df,
+        teams_df[['id']],
         left_on='home_team_id',
         right_on='id',
         how='left',
@@ -55,23 +61,21 @@ def prepare_features(matches_df, player_stats_df, teams_df):
     )
     
     df = df.merge(
-        teams_df,
+        teams_df[['id']],
         left_on='away_team_id',
         right_on='id',
         how='left',
         suffixes=('', '_away')
     )
     
-    # Calculate rolling averages
-    for team_id in df['home_team_id'].unique():
-        team_matches = df[df['home_team_id'] == team_id].sort_values('match_date')
-        df.loc[df['home_team_id'] == team_id, 'home_goals_avg'] = team_matches['home_score'].rolling(5, min_periods=1).mean()
-        df.loc[df['home_team_id'] == team_id, 'home_goals_against_avg'] = team_matches['away_score'].rolling(5, min_periods=1).mean()
+    # Calculate rolling averages: one sorted, vectorized pass per side instead of a loop per team
+    home = rolling_features(df, 'home_team_id', 'match_date', ['home_score', 'away_score'], windows=[5], ewm_spans=[])
+    df['home_goals_avg'] = home['home_score_mean_5']
+    df['home_goals_against_avg'] = home['away_score_mean_5']
     
-    for team_id in df['away_team_id'].unique():
-        team_matches = df[df['away_team_id'] == team_id].sort_values('match_date')
-        df.loc[df['away_team_id'] == team_id, 'away_goals_avg'] = team_matches['away_score'].rolling(5, min_periods=1).mean()
-        df.loc[df['away_team_id'] == team_id, 'away_goals_against_avg'] = team_matches['home_score'].rolling(5, min_periods=1).mean()
+    away = rolling_features(df, 'away_team_id', 'match_date', ['away_score', 'home_score'], windows=[5], ewm_spans=[])
+    df['away_goals_avg'] = away['away_score_mean_5']
+    df['away_goals_against_avg'] = away['home_score_mean_5']
     
     # Add time-based features
     df['day_of_week'] = df['match_date'].dt.dayofweek
@@ -88,35 +92,68 @@ def prepare_features(matches_df, player_stats_df, teams_df):
         'day_of_week', 'month', 'year'
     ]
     
+    if keep_dates:
+        return df[feature_cols + ['target', 'match_date']]
     return df[feature_cols + ['target']]
 
-def train_models():
-    """Train all models"""
+def read_training_watermark(model_dir):
+    """Latest match_date the saved models were trained on, if any"""
+    path = os.path.join(model_dir, 'training_watermark.txt')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return pd.Timestamp(f.read().strip())
+
+def write_training_watermark(model_dir, watermark):
+    with open(os.path.join(model_dir, 'training_watermark.txt'), 'w') as f:
+        f.write(pd.Timestamp(watermark).isoformat())
+
+def train_models(incremental=False, seasons=None, sports=None, start_date=None):
+    """Train all models; incremental mode continues the saved ensembles on matches newer than the watermark"""
     try:
         # Load data
-        matches_df, player_stats_df, teams_df = load_training_data()
+        matches_df, player_stats_df, teams_df = load_training_data(seasons=seasons, sports=sports, start_date=start_date)
         
-        # Prepare features
-        training_data = prepare_features(matches_df, player_stats_df, teams_df)
+        # Prepare features on the full history so rolling windows see past matches
+        training_data = prepare_features(matches_df, player_stats_df, teams_df, keep_dates=True)
+        training_data = training_data.sort_values('match_date')
         
-        # Train prediction model
         model_trainer = ModelTrainer(model_dir=os.getenv('MODEL_DIR'))
-        best_model, accuracy = model_trainer.train_models(training_data, 'target')
-        print(f"Best model: {best_model}, Accuracy: {accuracy:.4f}")
+        # The watermark is the newest match the models have seen, not the wall-clock time of the
+        # last run, so matches ingested after that run but dated before it are still picked up
+        watermark = read_training_watermark(os.getenv('MODEL_DIR')) if incremental else None
+        if incremental and watermark is not None:
+            # Continue the saved ensembles on matches newer than the watermark
+            model_trainer.load_models()
+            new_data = training_data[training_data['match_date'] > watermark]
+            if new_data.empty:
+                print(f"No matches after {watermark}; models unchanged")
+            else:
+                best_model, accuracy = model_trainer.update_models(new_data.drop(columns=['match_date']), 'target')
+                print(f"Incremental update on {len(new_data)} rows. Best model: {best_model}, Holdout accuracy: {accuracy:.4f}")
+                watermark = new_data['match_date'].max()
+        else:
+            if incremental:
+                print("No training watermark found; running a full retrain")
+            best_model, accuracy = model_trainer.train_models(training_data.drop(columns=['match_date']), 'target')
+            print(f"Best model: {best_model}, Accuracy: {accuracy:.4f}")
+            watermark = training_data['match_date'].max()
         
         # Train player embeddings
         player_embeddings = PlayerEmbeddings(embedding_dim=int(os.getenv('EMBEDDING_DIM')))
         player_embeddings.train_model(player_stats_df)
-        player_embeddings.save_model(os.path.join(os.getenv('MODEL_DIR'), 'player_embeddings'))
+        player_embeddings.save_model(os.path.join(os.getenv('MODEL_DIR'), 'player_embeddings'), player_stats_df)
         print("Player embeddings model trained and saved")
         
         # Initialize social sentiment analyzer
-        sentiment_analyzer = SocialSentimentAnalyzer()
+        sentiment_analyzer = get_analyzer()
         print("Social sentiment analyzer initialized")
         
-        # Save latest training date
+        # Save latest training date and the newest match trained on
         with open(os.path.join(os.getenv('MODEL_DIR'), 'last_training.txt'), 'w') as f:
             f.write(datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        if pd.notna(watermark):
+            write_training_watermark(os.getenv('MODEL_DIR'), watermark)
         
         print("All models trained successfully")
         
@@ -125,4 +162,11 @@ def train_models():
         sys.exit(1)
 
 if __name__ == "__main__":
-    train_models() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train prediction models")
+    parser.add_argument('--incremental', action='store_true',
+                        help="continue the saved models on matches newer than the last trained match instead of a full retrain")
+    parser.add_argument('--seasons', type=int, nargs='+', help="train only on these seasons")
+    parser.add_argument('--sports', nargs='+', help="train only on these sports")
+    parser.add_argument('--start-date', help="train only on matches on or after this date")
+    args = parser.parse_args()
+    train_models(incremental=args.incremental, seasons=args.seasons, sports=args.sports, start_date=args.start_date) 
\ No newline at end of file
@@ -10,17 +10,40 @@ from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_sc
 from xgboost import XGBClassifier
 import lightgbm as lgb
 from sklearn.calibration import CalibratedClassifierCV
-from typing import Dict, List, Tuple, Any, Union
+from typing import Dict, List, Tuple, Any, Union, Optional
 from datetime import datetime
+from .prediction_batcher import PredictionBatcher, DEFAULT_WINDOW_MS, DEFAULT_MAX_BATCH_SIZE
+from .model_bundle import ModelBundle, LazyModels, write_bundle
+from .training_scheduler import fit_models
+from .prediction_cache import PredictionCache
+
+try:
+    from ..advanced.tree_ensemble import compile_ensemble
+except ImportError:  # imported as top-level ``services`` with backend/ on sys.path
+    from advanced.tree_ensemble import compile_ensemble
+
+# Compiled models win on per-call overhead; above this many rows the native estimators are faster
+COMPILED_MAX_ROWS = int(os.getenv("COMPILED_PREDICT_MAX_ROWS", "64"))
 
 class MLService:
-    def __init__(self, model_dir: str = "advanced/models_store"):
+    def __init__(self, model_dir: str = "advanced/models_store", mmap_mode: Optional[str] = 'r',
+                 cpu_budget: Optional[int] = None, compiled_max_rows: int = COMPILED_MAX_ROWS):
         self.model_dir = model_dir
+        self.cpu_budget = cpu_budget
+        self.compiled_max_rows = compiled_max_rows
+        self.bundle_dir = os.path.join(model_dir, "bundles")
+        self.mmap_mode = mmap_mode
+        self.bundle: Optional[ModelBundle] = None
+        self.model_version: Optional[str] = None
+        self._model_generation = 0
+        self._explainers: Dict[str, Any] = {}
+        self.prediction_cache = PredictionCache()
         self.scaler = StandardScaler()
         self.models: Dict[str, Any] = {}
         self.feature_importance: Dict[str, Dict[str, float]] = {}
         self.model_metrics: Dict[str, Dict[str, Union[float, List[List[float]]]]] = {}
         self.training_history: List[Dict[str, Any]] = []
+        self.batcher = PredictionBatcher(self._predict_coalesced, DEFAULT_WINDOW_MS, DEFAULT_MAX_BATCH_SIZE)
         os.makedirs(model_dir, exist_ok=True)
         
     def prepare_features(self, data: pd.DataFrame, target_col: str) -> Tuple[np.ndarray, np.ndarray]:
@@ -64,9 +87,12 @@ class MLService:
         best_score = 0.0
         best_model_name = ''
         
-        for name, model in base_models.items():
-            # Train model
-            model.fit(X_train, y_train)
+        # Fit candidates concurrently in worker processes sharing X_train/y_train
+        fitted = fit_models(base_models, X_train, y_train, cpu_budget=self.cpu_budget)
+        model_timings: Dict[str, float] = {}
+        
+        for name, (model, fit_seconds) in fitted.items():
+            model_timings[name] = fit_seconds
             
             # Evaluate model
             metrics = self.evaluate_model(model, X_test, y_test)
@@ -75,7 +101,7 @@ class MLService:
             # Store model and feature importance
             self.models[name] = model
             self.feature_importance[name] = dict(zip(data.drop(columns=[target_col]).columns,
-                                                   model.feature_importances_))
+                                                   map(float, model.feature_importances_)))
             
             # Update best model
             if isinstance(metrics['roc_auc'], float) and metrics['roc_auc'] > best_score:
@@ -85,52 +111,195 @@ class MLService:
         # Train calibrated model
         best_model = self.models[best_model_name]
         calibrated_model = CalibratedClassifierCV(best_model, cv=5)
-        calibrated_model.fit(X_train, y_train)
+        calibrated_model, model_timings['calibrated'] = fit_models(
+            {'calibrated': calibrated_model}, X_train, y_train, cpu_budget=self.cpu_budget
+        )['calibrated']
         self.models['calibrated'] = calibrated_model
+        self._models_changed()
         
         # Record training history
         training_record = {
             'timestamp': datetime.now().isoformat(),
             'best_model': best_model_name,
             'best_score': best_score,
-            'metrics': self.model_metrics
+            'metrics': self.model_metrics,
+            'model_timings': model_timings
         }
         self.training_history.append(training_record)
         
         self.save_models()
         return best_model_name, best_score
     
-    def predict(self, features: Dict[str, Any], feature_order: List[str]) -> Tuple[Any, float, Dict[str, Any]]:
+    def predict(self, features: Dict[str, Any], feature_order: List[str],
+                explain: bool = False) -> Tuple[Any, float, Dict[str, Any]]:
         """Make predictions using the calibrated model with additional insights"""
+        return self.predict_batch([features], feature_order, explain)[0]
+    
+    def predict_batch(self, features_list: List[Dict[str, Any]], feature_order: List[str],
+                      explain: bool = False) -> List[Tuple[Any, float, Dict[str, Any]]]:
+        """Score many feature dicts with a single scale + predict_proba pass.
+        
+        With ``explain`` the compiled tree model also decomposes each row into
+        per-feature contributions; that roughly doubles the cost of the batch,
+        so by default insights carry only the global importances.
+        """
         if 'calibrated' not in self.models:
             raise ValueError("No calibrated model available. Train models first.")
+        if not features_list:
+            return []
         
-        # Create DataFrame with correct feature order
-        input_values = [features[feature] for feature in feature_order]
-        features_df = pd.DataFrame([input_values], columns=feature_order)
-        
-        # Scale features
-        X_scaled = self.scaler.transform(features_df)
+        # Build one contiguous matrix in feature order
+        X = self._build_feature_matrix(features_list, feature_order)
+        explainer = self._explaining_model('calibrated') if explain else None
         
-        # Get predictions and probabilities
-        predictions = self.models['calibrated'].predict(X_scaled)
-        probabilities = self.models['calibrated'].predict_proba(X_scaled)
+        # Serve repeated feature vectors from the cache; score only the misses
+        # (and, when explaining, hits that were cached without contributions)
+        keys = self.prediction_cache.make_keys(X, feature_order, (self.model_version, self._model_generation))
+        scored = [self.prediction_cache.get(key) for key in keys]
+        misses = [row for row, hit in enumerate(scored)
+                  if hit is None or (explainer is not None and hit[3] is None)]
+        if misses:
+            X_scaled = self._scale_features(X[misses], feature_order)
+            
+            # One traversal yields probabilities and per-row path contributions for tree models
+            if explainer is not None:
+                probabilities, bias, contribs = explainer.explain(X_scaled)
+                classes = explainer.classes_
+            else:
+                model = self._serving_model('calibrated', len(misses))
+                probabilities = model.predict_proba(X_scaled)
+                classes = model.classes_
+            
+            # Outcomes are the argmax class, as in predict()
+            best = np.argmax(probabilities, axis=1)
+            outcomes = classes[best]
+            confidences = probabilities[np.arange(len(best)), best]
+            if explainer is not None:
+                base_values, row_contribs = self._select_contributions(bias, contribs, best)
+            else:
+                base_values, row_contribs = [None] * len(best), [None] * len(best)
+            for row, outcome, confidence, base_value, contrib in zip(misses, outcomes, confidences, base_values, row_contribs):
+                scored[row] = (outcome, float(confidence), base_value, contrib)
+                self.prediction_cache.put(keys[row], scored[row])
         
-        predicted_outcome = predictions[0]
-        confidence = float(np.max(probabilities[0]))
+        # Shared per-batch insight fields
+        global_contributions = None
+        model_metrics = self.model_metrics.get('calibrated', {})
+        timestamp = datetime.now().isoformat()
         
-        # Generate prediction insights
-        insights = {
-            'confidence': confidence,
-            'feature_contributions': self._get_feature_contributions(features_df, feature_order),
-            'model_metrics': self.model_metrics.get('calibrated', {}),
-            'prediction_timestamp': datetime.now().isoformat()
-        }
+        results: List[Tuple[Any, float, Dict[str, Any]]] = []
+        for outcome, confidence, base_value, contrib in scored:
+            insights = {
+                'confidence': confidence,
+                'model_metrics': model_metrics,
+                'prediction_timestamp': timestamp
+            }
+            if explain and contrib is not None:
+                insights['feature_contributions'] = dict(zip(feature_order, map(float, contrib)))
+                insights['contribution_base_value'] = float(base_value)
+            else:
+                # Models that cannot be decomposed fall back to global importances
+                if global_contributions is None:
+                    global_contributions = self._get_feature_contributions(X, feature_order)
+                insights['feature_contributions'] = dict(global_contributions)
+            results.append((outcome, confidence, insights))
+        return results
+    
+    async def predict_async(self, features: Dict[str, Any], feature_order: List[str],
+                            explain: bool = False) -> Tuple[Any, float, Dict[str, Any]]:
+        """Single-row predict that is coalesced with concurrent callers into one batch"""
+        return await self.batcher.submit((features, tuple(feature_order), explain))
+    
+    def configure_batcher(self, window_ms: float = None, max_batch_size: int = None) -> None:
+        """Tune the request coalescing window and batch size"""
+        if window_ms is not None:
+            self.batcher.window_ms = window_ms
+        if max_batch_size is not None:
+            if max_batch_size < 1:
+                raise ValueError("max_batch_size must be at least 1")
+            self.batcher.max_batch_size = max_batch_size
+    
+    def _predict_coalesced(self, items: List[Tuple[Dict[str, Any], Tuple[str, ...], bool]]) -> List[Any]:
+        """Batch function for the coalescer; groups rows by feature order and explain flag"""
+        groups: Dict[Tuple[Tuple[str, ...], bool], List[int]] = {}
+        for idx, (_, feature_order, explain) in enumerate(items):
+            groups.setdefault((feature_order, explain), []).append(idx)
         
-        return predicted_outcome, confidence, insights
+        results: List[Any] = [None] * len(items)
+        for (feature_order, explain), indices in groups.items():
+            rows = [items[idx][0] for idx in indices]
+            try:
+                batch_results = self.predict_batch(rows, list(feature_order), explain)
+            except Exception:
+                # Isolate the bad row(s) so one request cannot fail the whole batch
+                batch_results = []
+                for row in rows:
+                    try:
+                        batch_results.append(self.predict_batch([row], list(feature_order), explain)[0])
+                    except Exception as e:
+                        batch_results.append(e)
+            for idx, result in zip(indices, batch_results):
+                results[idx] = result
+        return results
+    
+    def _models_changed(self) -> None:
+        """Invalidate cached predictions after the serving models are swapped"""
+        self._model_generation += 1
+        self._explainers = {}
+        self.prediction_cache.clear()
     
-    def _get_feature_contributions(self, features_df: pd.DataFrame, feature_order: List[str]) -> Dict[str, float]:
-        """Calculate feature contributions to the prediction"""
+    def _compiled_model(self, name: str) -> Optional[Any]:
+        """The bundle's compiled, memory-mapped copy of a model, if it has one"""
+        if isinstance(self.models, LazyModels) and name not in self.models._overrides:
+            return self.bundle.load_compiled(name)
+        return None
+    
+    def _serving_model(self, name: str, n_rows: int) -> Any:
+        """Compiled model for small batches, the native estimator above ``compiled_max_rows``"""
+        if n_rows <= self.compiled_max_rows:
+            compiled = self._compiled_model(name)
+            if compiled is not None:
+                return compiled
+        return self.models[name]
+    
+    def _explaining_model(self, name: str) -> Optional[Any]:
+        """Compiled tree model exposing explain(), or None if it cannot be compiled"""
+        model = self._compiled_model(name)
+        if model is None:
+            model = self.models[name]
+        if hasattr(model, 'explain'):
+            return model
+        if name not in self._explainers:
+            try:
+                self._explainers[name] = compile_ensemble(model)
+            except ValueError:
+                self._explainers[name] = None
+        return self._explainers[name]
+    
+    def _select_contributions(self, bias: np.ndarray, contribs: np.ndarray,
+                              best: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-row bias and contributions for the positive (binary) or predicted class"""
+        n_outputs = contribs.shape[2]
+        if n_outputs <= 2:
+            column = n_outputs - 1
+            return np.full(len(best), bias[column]), contribs[:, :, column]
+        return bias[best], contribs[np.arange(len(best)), :, best]
+    
+    def _build_feature_matrix(self, features_list: List[Dict[str, Any]], feature_order: List[str]) -> np.ndarray:
+        """Stack feature dicts into a C-contiguous float matrix ordered by feature_order"""
+        X = np.empty((len(features_list), len(feature_order)), dtype=np.float64)
+        for row, features in enumerate(features_list):
+            X[row] = [features[feature] for feature in feature_order]
+        return X
+    
+    def _scale_features(self, X: np.ndarray, feature_order: List[str]) -> np.ndarray:
+        """Apply the fitted scaler, keeping column names when the scaler was fit on a DataFrame"""
+        if hasattr(self.scaler, 'feature_names_in_'):
+            return self.scaler.transform(pd.DataFrame(X, columns=feature_order, copy=False))
+        return self.scaler.transform(X)
+    
+    def _get_feature_contributions(self, features: Union[pd.DataFrame, np.ndarray], feature_order: List[str]) -> Dict[str, float]:
+        """Global feature importances, used when a model has no per-row decomposition"""
         contributions: Dict[str, float] = {}
         for feature in feature_order:
             if feature in self.feature_importance.get('rf', {}):
@@ -138,28 +307,44 @@ class MLService:
         return contributions
     
     def save_models(self) -> None:
-        """Save trained models and artifacts"""
-        # Save models
-        for name, model in self.models.items():
-            joblib.dump(model, f"{self.model_dir}/{name}_model.joblib")
-        
-        # Save scaler
-        joblib.dump(self.scaler, f"{self.model_dir}/scaler.joblib")
-        
-        # Save feature importance
-        with open(f"{self.model_dir}/feature_importance.json", 'w') as f:
-            json.dump(self.feature_importance, f)
-        
-        # Save model metrics
-        with open(f"{self.model_dir}/model_metrics.json", 'w') as f:
-            json.dump(self.model_metrics, f)
-        
-        # Save training history
-        with open(f"{self.model_dir}/training_history.json", 'w') as f:
-            json.dump(self.training_history, f)
+        """Save trained models and artifacts as a new versioned bundle"""
+        self.model_version = write_bundle(
+            self.bundle_dir,
+            dict(self.models.items()),
+            self.scaler,
+            metadata={
+                'feature_importance': self.feature_importance,
+                'model_metrics': self.model_metrics,
+                'training_history': self.training_history
+            }
+        )
+        # Serve from the bundle just written so compiled models are used
+        self._open_bundle()
     
     def load_models(self) -> None:
-        """Load trained models and artifacts"""
+        """Load the current model bundle, falling back to per-model joblib files"""
+        if self._open_bundle():
+            return
+        self._load_legacy_models()
+    
+    def _open_bundle(self) -> bool:
+        bundle = ModelBundle.open_current(self.bundle_dir, mmap_mode=self.mmap_mode)
+        if bundle is None:
+            return False
+        self.bundle = bundle
+        self.models = LazyModels(bundle)
+        self.scaler = bundle.load_scaler()
+        self.feature_importance = bundle.manifest.get('feature_importance', {})
+        self.model_metrics = bundle.manifest.get('model_metrics', {})
+        self.training_history = bundle.manifest.get('training_history', [])
+        self.model_version = bundle.version
+        self._models_changed()
+        return True
+    
+    def _load_legacy_models(self) -> None:
+        """Load models saved before the bundle format existed"""
+        self.model_version = None
+        self._models_changed()
         # Load models
         for name in ['rf', 'gb', 'xgb', 'lgb', 'calibrated']:
             model_path = f"{self.model_dir}/{name}_model.joblib"
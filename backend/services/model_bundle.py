@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections.abc import MutableMapping
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+import joblib
+import numpy as np
+
+try:
+    from ..advanced.tree_ensemble import compile_ensemble, restore_compiled
+except ImportError:  # imported as top-level ``services`` with backend/ on sys.path
+    from advanced.tree_ensemble import compile_ensemble, restore_compiled
+
+BUNDLE_FORMAT_VERSION = 1
+CURRENT_POINTER = "CURRENT"
+MANIFEST_NAME = "manifest.json"
+KEEP_VERSIONS = 3
+LEASE_NAME = ".last_used"
+# Versions opened or loaded from this recently are never pruned: another worker
+# may still load estimators from them lazily
+PRUNE_GRACE_SECONDS = float(os.getenv("BUNDLE_PRUNE_GRACE_SECONDS", str(24 * 3600)))
+
+# Bundle layout (one directory per version, CURRENT names the live one):
+#
+#   bundles/CURRENT
+#   bundles/<version>/manifest.json
+#   bundles/<version>/.last_used                      lease, touched whenever the version is read
+#   bundles/<version>/scaler.joblib
+#   bundles/<version>/models/<name>.joblib            full estimator, loaded lazily
+#   bundles/<version>/compiled/<name>/state.joblib    small compiled-model state
+#   bundles/<version>/compiled/<name>/<array>.npy     node arrays, memory-mapped
+
+
+def write_bundle(root: str, models: Dict[str, Any], scaler: Any,
+                 metadata: Optional[Dict[str, Any]] = None) -> str:
+    """Write a new bundle version under ``root`` and point CURRENT at it"""
+    os.makedirs(root, exist_ok=True)
+    created_at = datetime.now()
+    tmp_dir = os.path.join(root, f".tmp-{os.getpid()}-{created_at.strftime('%Y%m%d%H%M%S%f')}")
+    os.makedirs(os.path.join(tmp_dir, "models"))
+    digest = hashlib.sha256()
+
+    manifest: Dict[str, Any] = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'created_at': created_at.isoformat(),
+        'scaler': 'scaler.joblib',
+        'models': {},
+    }
+    manifest.update(metadata or {})
+    joblib.dump(scaler, os.path.join(tmp_dir, 'scaler.joblib'))
+    with open(os.path.join(tmp_dir, 'scaler.joblib'), 'rb') as f:
+        digest.update(f.read())
+
+    for name, model in models.items():
+        # Uncompressed so numpy payloads stay memory-mappable by joblib.load
+        estimator_path = os.path.join("models", f"{name}.joblib")
+        joblib.dump(model, os.path.join(tmp_dir, estimator_path))
+        entry: Dict[str, Any] = {'type': type(model).__name__, 'estimator': estimator_path, 'compiled': None}
+
+        try:
+            state, arrays = compile_ensemble(model).export()
+        except ValueError:
+            state, arrays = None, {}
+        if state is not None:
+            compiled_dir = os.path.join("compiled", name)
+            os.makedirs(os.path.join(tmp_dir, compiled_dir))
+            joblib.dump(state, os.path.join(tmp_dir, compiled_dir, "state.joblib"))
+            array_files = {}
+            for key, array in arrays.items():
+                array_path = os.path.join(compiled_dir, f"{key}.npy")
+                np.save(os.path.join(tmp_dir, array_path), np.ascontiguousarray(array))
+                array_files[key] = array_path
+                digest.update(np.ascontiguousarray(array).tobytes())
+            entry['compiled'] = {'state': os.path.join(compiled_dir, "state.joblib"), 'arrays': array_files}
+        else:
+            with open(os.path.join(tmp_dir, estimator_path), 'rb') as f:
+                digest.update(f.read())
+        manifest['models'][name] = entry
+
+    version = f"{created_at.strftime('%Y%m%dT%H%M%S')}-{digest.hexdigest()[:8]}"
+    manifest['version'] = version
+    with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f)
+
+    # Publish atomically: rename the directory, then swap the pointer
+    final_dir = os.path.join(root, version)
+    if os.path.exists(final_dir):
+        shutil.rmtree(tmp_dir)
+    else:
+        os.rename(tmp_dir, final_dir)
+    pointer_tmp = os.path.join(root, f"{CURRENT_POINTER}.tmp")
+    with open(pointer_tmp, 'w') as f:
+        f.write(version)
+    os.replace(pointer_tmp, os.path.join(root, CURRENT_POINTER))
+
+    _prune_versions(root, keep=version)
+    return version
+
+
+def _prune_versions(root: str, keep: str) -> None:
+    versions = sorted(
+        d for d in os.listdir(root)
+        if os.path.isdir(os.path.join(root, d)) and not d.startswith('.')
+    )
+    now = time.time()
+    for old in versions[:-KEEP_VERSIONS]:
+        if old != keep and not _recently_used(os.path.join(root, old), now):
+            shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+
+
+def _recently_used(version_dir: str, now: float) -> bool:
+    try:
+        return now - os.path.getmtime(os.path.join(version_dir, LEASE_NAME)) < PRUNE_GRACE_SECONDS
+    except OSError:
+        return False
+
+
+def _touch_lease(version_dir: str) -> None:
+    lease = os.path.join(version_dir, LEASE_NAME)
+    try:
+        with open(lease, 'a'):
+            pass
+        os.utime(lease, None)
+    except OSError:
+        pass  # read-only bundle: nothing prunes it either
+
+
+def current_version(root: str) -> Optional[str]:
+    pointer = os.path.join(root, CURRENT_POINTER)
+    if not os.path.exists(pointer):
+        return None
+    with open(pointer) as f:
+        return f.read().strip() or None
+
+
+class ModelBundle:
+    """Read side of a bundle version; every model is loaded on first use"""
+
+    def __init__(self, path: str, mmap_mode: Optional[str] = 'r'):
+        self.path = path
+        self.mmap_mode = mmap_mode
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+        if self.manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported model bundle format: {self.manifest.get('format_version')}")
+        self._estimators: Dict[str, Any] = {}
+        self._compiled: Dict[str, Any] = {}
+        _touch_lease(path)
+
+    @classmethod
+    def open_current(cls, root: str, mmap_mode: Optional[str] = 'r') -> Optional["ModelBundle"]:
+        version = current_version(root)
+        if version is None:
+            return None
+        return cls(os.path.join(root, version), mmap_mode=mmap_mode)
+
+    @property
+    def version(self) -> str:
+        return self.manifest['version']
+
+    @property
+    def model_names(self):
+        return list(self.manifest['models'])
+
+    def load_scaler(self) -> Any:
+        return joblib.load(os.path.join(self.path, self.manifest['scaler']))
+
+    def load_estimator(self, name: str) -> Any:
+        """Full estimator, for retraining or models that cannot be compiled"""
+        if name not in self._estimators:
+            _touch_lease(self.path)
+            entry = self.manifest['models'][name]
+            self._estimators[name] = joblib.load(os.path.join(self.path, entry['estimator']),
+                                                 mmap_mode=self.mmap_mode)
+        return self._estimators[name]
+
+    def load_compiled(self, name: str) -> Optional[Any]:
+        """Compiled model backed by memory-mapped node arrays, if one was stored"""
+        if name not in self._compiled:
+            compiled = self.manifest['models'][name].get('compiled')
+            if compiled is None:
+                self._compiled[name] = None
+            else:
+                _touch_lease(self.path)
+                state = joblib.load(os.path.join(self.path, compiled['state']))
+                arrays = {
+                    key: np.load(os.path.join(self.path, array_path), mmap_mode=self.mmap_mode)
+                    for key, array_path in compiled['arrays'].items()
+                }
+                self._compiled[name] = restore_compiled(state, arrays)
+        return self._compiled[name]
+
+
+class LazyModels(MutableMapping):
+    """Name -> estimator mapping that defers loading to the bundle.
+
+    Membership is answered from the manifest, so ``'calibrated' in models``
+    never touches disk; assigning a freshly trained model overrides the
+    bundle copy.
+    """
+
+    def __init__(self, bundle: ModelBundle):
+        self.bundle = bundle
+        self._overrides: Dict[str, Any] = {}
+        self._deleted = set()
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._overrides:
+            return self._overrides[name]
+        if name in self._deleted or name not in self.bundle.manifest['models']:
+            raise KeyError(name)
+        return self.bundle.load_estimator(name)
+
+    def __setitem__(self, name: str, model: Any) -> None:
+        self._overrides[name] = model
+        self._deleted.discard(name)
+
+    def __delitem__(self, name: str) -> None:
+        if name not in self:
+            raise KeyError(name)
+        self._overrides.pop(name, None)
+        self._deleted.add(name)
+
+    def __iter__(self) -> Iterator[str]:
+        names = [n for n in self.bundle.model_names if n not in self._deleted]
+        names += [n for n in self._overrides if n not in names]
+        return iter(names)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._overrides or (
+            name in self.bundle.manifest['models'] and name not in self._deleted
+        )
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+DEFAULT_WINDOW_MS = float(os.getenv("PREDICT_BATCH_WINDOW_MS", "5"))
+DEFAULT_MAX_BATCH_SIZE = int(os.getenv("PREDICT_MAX_BATCH_SIZE", "256"))
+
+
+class PredictionBatcher:
+    """Coalesces concurrent single-row requests into one vectorized call.
+
+    Callers ``await submit(item)``. Items are buffered until either
+    ``max_batch_size`` are waiting or ``window_ms`` has elapsed since the
+    first one arrived, then ``batch_fn(items)`` runs once in a worker thread
+    and each caller receives its own element of the returned list. An
+    element that is an ``Exception`` is raised in that caller only.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]],
+                 window_ms: float = DEFAULT_WINDOW_MS,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 history_size: int = 1000):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.batch_fn = batch_fn
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._batch_sizes: Deque[int] = deque(maxlen=history_size)
+        self._batch_latencies_ms: Deque[float] = deque(maxlen=history_size)
+        self._total_batches = 0
+        self._total_items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result from the next batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_ms / 1000.0, self._flush, loop)
+
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Hand the buffered items to a worker thread as one batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = loop.create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        start = time.perf_counter()
+        try:
+            results = await asyncio.to_thread(self.batch_fn, items)
+            if len(results) != len(items):
+                raise RuntimeError(f"Batch function returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._record(len(items), (time.perf_counter() - start) * 1000.0)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _record(self, size: int, latency_ms: float) -> None:
+        self._total_batches += 1
+        self._total_items += size
+        self._batch_sizes.append(size)
+        self._batch_latencies_ms.append(latency_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batch settings plus size/latency statistics over recent batches"""
+        stats: Dict[str, Any] = {
+            'window_ms': self.window_ms,
+            'max_batch_size': self.max_batch_size,
+            'total_batches': self._total_batches,
+            'total_items': self._total_items,
+            'pending': len(self._pending),
+        }
+        if self._batch_sizes:
+            sizes = np.fromiter(self._batch_sizes, dtype=np.float64)
+            latencies = np.fromiter(self._batch_latencies_ms, dtype=np.float64)
+            stats.update({
+                'avg_batch_size': float(sizes.mean()),
+                'max_batch_size_seen': int(sizes.max()),
+                'latency_ms_p50': float(np.percentile(latencies, 50)),
+                'latency_ms_p99': float(np.percentile(latencies, 99)),
+            })
+        return stats
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "50000"))
+DEFAULT_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "300"))
+# Decimal places feature values are rounded to before hashing; unset means exact match
+DEFAULT_CACHE_QUANTIZE = int(os.environ["PREDICTION_CACHE_QUANTIZE"]) if os.getenv("PREDICTION_CACHE_QUANTIZE") else None
+
+
+class PredictionCache:
+    """Thread-safe LRU + TTL cache for per-row prediction results.
+
+    Keys are a hash of the ordered (optionally quantized) feature vector,
+    the feature order and the model version, so results from a previous
+    model can never be served after a swap; ``clear()`` additionally frees
+    them eagerly.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, ttl_seconds: float = DEFAULT_CACHE_TTL,
+                 quantize_decimals: Optional[int] = DEFAULT_CACHE_QUANTIZE):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.quantize_decimals = quantize_decimals
+        self._entries: "OrderedDict[bytes, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def make_keys(self, X: np.ndarray, feature_order: Sequence[str], model_version: Any) -> list:
+        """One key per row of a feature matrix laid out in feature_order"""
+        X = np.asarray(X, dtype=np.float64)
+        if self.quantize_decimals is not None:
+            X = np.round(X, self.quantize_decimals)
+        # -0.0 and 0.0 must hash alike
+        X = np.ascontiguousarray(X + 0.0)
+        prefix = hashlib.blake2b(
+            repr((model_version, tuple(feature_order))).encode(), digest_size=16
+        ).digest()
+        return [hashlib.blake2b(row.tobytes(), digest_size=16, key=prefix).digest() for row in X]
+
+    def get(self, key: bytes) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. when the serving model is swapped"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'quantize_decimals': self.quantize_decimals,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
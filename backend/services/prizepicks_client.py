@@ -0,0 +1,151 @@
+import asyncio
+import os
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+import numpy as np
+
+try:
+    from ..core.auto_logger import logger
+except ImportError:  # imported as top-level ``services`` with backend/ on sys.path
+    from core.auto_logger import logger
+
+PRIZEPICKS_APP_URL = "https://app.prizepicks.com/projections"
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.93 Safari/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "Referer": PRIZEPICKS_APP_URL,
+    "Origin": "https://app.prizepicks.com",
+}
+DEFAULT_MAX_CONNECTIONS = int(os.getenv("PRIZEPICKS_MAX_CONNECTIONS", "20"))
+DEFAULT_MAX_KEEPALIVE = int(os.getenv("PRIZEPICKS_MAX_KEEPALIVE", "10"))
+DEFAULT_KEEPALIVE_EXPIRY = float(os.getenv("PRIZEPICKS_KEEPALIVE_EXPIRY", "30"))
+DEFAULT_TIMEOUT = float(os.getenv("PRIZEPICKS_TIMEOUT", "15"))
+# Session cookies are re-warmed after this long even if the server set no expiry
+DEFAULT_COOKIE_TTL = float(os.getenv("PRIZEPICKS_COOKIE_TTL", "1800"))
+
+
+class PrizePicksClient:
+    """Shared async HTTP client for the PrizePicks API.
+
+    One ``httpx.AsyncClient`` keeps pooled keep-alive connections for the
+    process. Session cookies are warmed with a single GET of the app URL the
+    first time they are needed and again only when a cookie has expired, the
+    warm-up is older than ``cookie_ttl`` or the API answers 401/403. Every
+    upstream request is timed per endpoint for ``get_stats``.
+    """
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE,
+                 keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+                 timeout: float = DEFAULT_TIMEOUT, cookie_ttl: float = DEFAULT_COOKIE_TTL,
+                 transport: Optional[httpx.AsyncBaseTransport] = None, history_size: int = 1000):
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive_connections,
+                                   keepalive_expiry=keepalive_expiry)
+        self.timeout = timeout
+        self.cookie_ttl = cookie_ttl
+        self.transport = transport
+        self.history_size = history_size
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._warm_lock: Optional[asyncio.Lock] = None
+        self._warmed_at: Optional[float] = None
+        self._latencies_ms: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.history_size))
+        self._requests: Dict[str, int] = defaultdict(int)
+        self._errors: Dict[str, int] = defaultdict(int)
+        self.warmups = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """The pooled client, recreated if the running event loop changed"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            if self._client is not None:
+                self._release(self._client, self._loop)
+            self._client = httpx.AsyncClient(headers=DEFAULT_HEADERS, limits=self.limits,
+                                             timeout=self.timeout, transport=self.transport)
+            self._loop = loop
+            self._warm_lock = asyncio.Lock()
+            self._warmed_at = None
+        return self._client
+
+    @staticmethod
+    def _release(client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Close a client left behind on another event loop, or log that its pool is dropped"""
+        if loop is not None and loop.is_running():
+            # Its connections belong to that loop, so close it there
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        else:
+            logger.logger.info("PrizePicks client: event loop changed; dropping the previous connection pool")
+
+    def _cookies_stale(self, client: httpx.AsyncClient) -> bool:
+        if self._warmed_at is None or time.monotonic() - self._warmed_at > self.cookie_ttl:
+            return True
+        return any(cookie.is_expired() for cookie in client.cookies.jar)
+
+    async def _warm(self, force: bool = False) -> None:
+        client = self._get_client()
+        if not force and not self._cookies_stale(client):
+            return
+        async with self._warm_lock:
+            # Another request may have refreshed while this one waited
+            if not force and not self._cookies_stale(client):
+                return
+            try:
+                await self._timed(client, "warmup", PRIZEPICKS_APP_URL, timeout=10)
+            except httpx.HTTPError as e:
+                logger.logger.warning(f"PrizePicks client: Failed to establish session with app URL: {e}")
+            self._warmed_at = time.monotonic()
+            self.warmups += 1
+
+    async def _timed(self, client: httpx.AsyncClient, endpoint: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        self._requests[endpoint] += 1
+        try:
+            return await client.get(url, **kwargs)
+        except httpx.HTTPError:
+            self._errors[endpoint] += 1
+            raise
+        finally:
+            self._latencies_ms[endpoint].append((time.perf_counter() - start) * 1000)
+
+    async def get(self, url: str, endpoint: str, params: Optional[Dict[str, Any]] = None,
+                  timeout: Optional[float] = None) -> httpx.Response:
+        """GET on the pooled client with warm cookies; re-warms once on 401/403"""
+        await self._warm()
+        client = self._get_client()
+        kwargs = {"params": params, "timeout": timeout or self.timeout}
+        response = await self._timed(client, endpoint, url, **kwargs)
+        if response.status_code in (401, 403):
+            await self._warm(force=True)
+            response = await self._timed(client, endpoint, url, **kwargs)
+        if response.is_error:
+            self._errors[endpoint] += 1
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Request counts, errors and latency percentiles per endpoint"""
+        stats: Dict[str, Any] = {
+            'warmups': self.warmups,
+            'max_connections': self.limits.max_connections,
+            'max_keepalive_connections': self.limits.max_keepalive_connections,
+            'endpoints': {},
+        }
+        for endpoint, samples in self._latencies_ms.items():
+            latencies = np.fromiter(samples, dtype=np.float64)
+            stats['endpoints'][endpoint] = {
+                'requests': self._requests[endpoint],
+                'errors': self._errors[endpoint],
+                'latency_ms_p50': float(np.percentile(latencies, 50)),
+                'latency_ms_p95': float(np.percentile(latencies, 95)),
+                'latency_ms_max': float(latencies.max()),
+            }
+        return stats
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+DEFAULT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", "1000"))
+DEFAULT_FRESH_SECONDS = float(os.getenv("SENTIMENT_CACHE_FRESH_SECONDS", "120"))
+DEFAULT_STALE_SECONDS = float(os.getenv("SENTIMENT_CACHE_STALE_SECONDS", "900"))
+
+
+class StaleWhileRevalidateCache:
+    """Async LRU cache that serves stale values while one background task refreshes them.
+
+    Entries younger than ``fresh_seconds`` are returned as is. Older entries,
+    up to ``fresh_seconds + stale_seconds``, are still returned immediately
+    while a single refresh per key runs in the background. Missing or fully
+    expired keys are loaded once, with concurrent callers awaiting the same
+    load. Failed loads are not cached.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, fresh_seconds: float = DEFAULT_FRESH_SECONDS,
+                 stale_seconds: float = DEFAULT_STALE_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Any, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def _store(self, key: Any, value: Any) -> None:
+        self._entries[key] = (self.clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: Any, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Start (or join) the single in-flight load for a key"""
+        task = self._inflight.get(key)
+        if task is None:
+            async def run():
+                try:
+                    value = await loader()
+                    self._store(key, value)
+                    return value
+                finally:
+                    self._inflight.pop(key, None)
+
+            task = asyncio.ensure_future(run())
+            self._inflight[key] = task
+        return task
+
+    def _log_refresh_failure(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.refresh_failures += 1
+
+    async def get(self, key: Any, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = self.clock() - entry[0]
+            if age < self.fresh_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if age < self.fresh_seconds + self.stale_seconds:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self.refreshes += 1
+                    self._load(key, loader).add_done_callback(self._log_refresh_failure)
+                return entry[1]
+            del self._entries[key]
+        self.misses += 1
+        # Shield so one cancelled caller does not cancel the load others are awaiting
+        return await asyncio.shield(self._load(key, loader))
+
+    def peek(self, key: Any) -> Optional[Any]:
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+        }
@@ -0,0 +1,109 @@
+import os
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from threadpoolctl import threadpool_limits
+
+DEFAULT_CPU_BUDGET = int(os.getenv("TRAINING_CPU_BUDGET", "0")) or (os.cpu_count() or 1)
+
+# (shared memory name, shape, dtype) describing an array placed in shared memory
+SharedArraySpec = Tuple[str, Tuple[int, ...], str]
+
+
+class SharedArrays:
+    """Copies arrays into POSIX shared memory once so workers can map them"""
+
+    def __init__(self, **arrays: np.ndarray):
+        self._blocks = []
+        self.specs: Dict[str, SharedArraySpec] = {}
+        try:
+            for key, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                self.specs[key] = (block.name, array.shape, array.dtype.str)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _attach(spec: SharedArraySpec) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    name, shape, dtype = spec
+    # Workers share the parent's resource tracker, so attaching needs no unregister;
+    # the parent unlinks the block once every fit has finished
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+def _fit_worker(name: str, model: Any, x_spec: SharedArraySpec, y_spec: SharedArraySpec,
+                n_threads: int) -> Tuple[str, Any, float]:
+    """Fit one model against the shared training arrays"""
+    x_block, X = _attach(x_spec)
+    y_block, y = _attach(y_spec)
+    try:
+        with threadpool_limits(limits=n_threads):
+            start = time.perf_counter()
+            model.fit(X, y)
+            elapsed = time.perf_counter() - start
+    finally:
+        del X, y
+        x_block.close()
+        y_block.close()
+    return name, model, elapsed
+
+
+def _limit_threads(model: Any, n_threads: int) -> Any:
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=n_threads)
+    return model
+
+
+def fit_models(models: Dict[str, Any], X: np.ndarray, y: np.ndarray,
+               cpu_budget: Optional[int] = None) -> Dict[str, Tuple[Any, float]]:
+    """Fit candidate models concurrently within a CPU budget.
+
+    Models run in separate processes, at most ``cpu_budget`` at a time, and
+    the budget left over is split between them as intra-model threads.
+    Training data is shared with the workers instead of pickled to each.
+    Returns ``{name: (fitted_model, fit_seconds)}``.
+    """
+    cpu_budget = max(1, cpu_budget or DEFAULT_CPU_BUDGET)
+    n_workers = min(len(models), cpu_budget)
+    n_threads = max(1, cpu_budget // max(n_workers, 1))
+
+    if n_workers <= 1:
+        fitted = {}
+        for name, model in models.items():
+            start = time.perf_counter()
+            with threadpool_limits(limits=cpu_budget):
+                _limit_threads(model, cpu_budget).fit(X, y)
+            fitted[name] = (model, time.perf_counter() - start)
+        return fitted
+
+    with SharedArrays(X=X, y=y) as shared:
+        # spawn avoids forking a parent whose OpenMP runtimes may already be initialised
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context("spawn")) as pool:
+            futures = [
+                pool.submit(_fit_worker, name, _limit_threads(model, n_threads),
+                            shared.specs['X'], shared.specs['y'], n_threads)
+                for name, model in models.items()
+            ]
+            results = [future.result() for future in futures]
+    return {name: (model, elapsed) for name, model, elapsed in results}
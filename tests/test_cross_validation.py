@@ -0,0 +1,78 @@
+import pytest
+import numpy as np
+import os
+import sys
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+import backend.model_evaluation.cross_validation as cross_validation
+from backend.model_evaluation.cross_validation import CrossValidator
+
+@pytest.fixture
+def classification_data():
+    """Noisy binary target driven by two of four features"""
+    rng = np.random.RandomState(0)
+    X = rng.normal(size=(300, 4))
+    y = (X[:, 0] + X[:, 1] + rng.normal(scale=0.5, size=300) > 0).astype(int)
+    return X, y
+
+@pytest.fixture
+def counted_fits(monkeypatch):
+    """Count fold fits; validators in these tests run in-process with n_jobs=1"""
+    calls = []
+    original = cross_validation._fit_fold
+    monkeypatch.setattr(cross_validation, '_fit_fold', lambda *args: calls.append(1) or original(*args))
+    return calls
+
+def make_estimators():
+    return {
+        'rf': RandomForestClassifier(n_estimators=20, random_state=0),
+        'lr': LogisticRegression(),
+    }
+
+def test_shared_folds_and_disk_cache(classification_data, tmp_path, counted_fits):
+    """Each (estimator, fold) pair is fit once; a new validator reads the cached predictions"""
+    X, y = classification_data
+    validator = CrossValidator(n_splits=5, n_jobs=1, cache_dir=str(tmp_path))
+    folds = validator.fold_assignment(X, y)
+    assert sorted(np.bincount(folds)) == [60] * 5
+
+    results = validator.compare(make_estimators(), X, y)
+    assert set(results) == {'rf', 'lr'}
+    assert results['lr']['accuracy'] > 0.8
+    assert len(counted_fits) == 10
+
+    reloaded = CrossValidator(n_splits=5, n_jobs=1, cache_dir=str(tmp_path))
+    assert reloaded.compare(make_estimators(), X, y) == results
+    scores = reloaded.stratified_cross_validate(X, y, LogisticRegression())
+    assert len(scores['accuracy']) == 5
+    assert len(counted_fits) == 10
+
+def test_calibrate_and_stack_reuse_oof(classification_data, tmp_path, counted_fits):
+    """Calibration and stacking read the same out-of-fold predictions"""
+    X, y = classification_data
+    validator = CrossValidator(n_splits=5, n_jobs=1, cache_dir=str(tmp_path))
+    estimators = make_estimators()
+    fitted = {name: estimator.fit(X, y) for name, estimator in make_estimators().items()}
+
+    calibrated = validator.calibrate(estimators['rf'], X, y, fitted=fitted['rf'])
+    proba = calibrated.predict_proba(X)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+    assert ((proba >= 0) & (proba <= 1)).all()
+    assert len(counted_fits) == 5
+
+    stacked = validator.stack(estimators, X, y, fitted=fitted)
+    assert len(counted_fits) == 10
+    assert (stacked.predict(X) == y).mean() > 0.8
+    assert stacked.transform(X).shape == (len(y), 2)
+
+def test_small_samples_fall_back_to_kfold():
+    """Too few rows per class for stratification still yields the requested folds"""
+    X = np.arange(10).reshape(5, 2).astype(float)
+    y = np.array([1, 0, 1, 0, 1])
+    validator = CrossValidator(n_splits=5, n_jobs=1, cache_dir=None)
+    assert sorted(validator.fold_assignment(X, y)) == [0, 1, 2, 3, 4]
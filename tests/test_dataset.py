@@ -0,0 +1,88 @@
+import pytest
+import numpy as np
+import pandas as pd
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.model_training import dataset
+
+@pytest.fixture
+def matches_csv(tmp_path, monkeypatch):
+    """Multi-season matches CSV with the Parquet cache redirected to a temp dir"""
+    monkeypatch.setattr(dataset, 'PARQUET_DIR', str(tmp_path / 'parquet'))
+    rng = np.random.RandomState(0)
+    n = 3000
+    df = pd.DataFrame({
+        'id': np.arange(n),
+        'home_team_id': rng.randint(0, 40, n),
+        'home_score': rng.poisson(2, n),
+        'match_date': (pd.Timestamp('2019-01-01') + pd.to_timedelta(rng.randint(0, 1000, n), unit='D')).strftime('%Y-%m-%d'),
+        'sport': rng.choice(['soccer', 'nba'], n),
+        'season': rng.choice([2019, 2020, 2021], n),
+        'venue': rng.choice(['north', 'south', 'east'], n),
+        'odds': rng.rand(n) * 3,
+    })
+    path = tmp_path / 'matches.csv'
+    df.to_csv(path, index=False)
+    return str(path), df
+
+def test_downcast_schema(matches_csv):
+    """Small integers, floats and repeated strings get compact dtypes"""
+    path, df = matches_csv
+    loaded = dataset.load(path)
+    assert loaded['id'].dtype == np.int16
+    assert loaded['home_team_id'].dtype == np.int8
+    assert loaded['odds'].dtype == np.float32
+    assert isinstance(loaded['venue'].dtype, pd.CategoricalDtype)
+    assert isinstance(loaded['sport'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(loaded['match_date'])
+    assert loaded.memory_usage(deep=True).sum() < df.memory_usage(deep=True).sum() / 2
+
+    loaded = loaded.sort_values('id').reset_index(drop=True)
+    np.testing.assert_array_equal(loaded['home_score'], df['home_score'])
+    np.testing.assert_allclose(loaded['odds'], df['odds'], rtol=1e-6)
+
+def test_integer_ids_with_gaps_keep_precision(tmp_path, monkeypatch):
+    """Integer columns read as float because of missing values are not rounded to float32"""
+    monkeypatch.setattr(dataset, 'PARQUET_DIR', str(tmp_path / 'parquet'))
+    ids = [2 ** 24 + 1, np.nan, 123456789, 2 ** 31 + 7]
+    path = tmp_path / 'player_stats.csv'
+    pd.DataFrame({'match_id': ids, 'rating': [0.5, 1.5, 2.25, np.nan]}).to_csv(path, index=False)
+
+    loaded = dataset.load(str(path))
+    assert loaded['match_id'].dtype == np.float64
+    assert loaded['rating'].dtype == np.float32
+    np.testing.assert_array_equal(loaded['match_id'], ids)
+
+def test_pruning_and_pushdown(matches_csv):
+    """Only requested columns and matching partitions/dates are read"""
+    path, df = matches_csv
+    loaded = dataset.load(path, columns=['id', 'match_date'], seasons=2020, sports=['nba'], start_date='2020-06-01')
+    expected = df[(df['season'] == 2020) & (df['sport'] == 'nba') & (pd.to_datetime(df['match_date']) >= '2020-06-01')]
+    assert list(loaded.columns) == ['id', 'match_date']
+    assert sorted(loaded['id']) == sorted(expected['id'])
+
+    no_seasons = os.path.join(os.path.dirname(path), 'teams.csv')
+    df[['home_team_id', 'venue']].drop_duplicates().to_csv(no_seasons, index=False)
+    with pytest.raises(ValueError):
+        dataset.load(no_seasons, seasons=2020)
+
+def test_scan_streams_batches(matches_csv):
+    """Batches are bounded in size and cover every matching row once"""
+    path, df = matches_csv
+    batches = list(dataset.scan(path, columns=['id'], seasons=[2019, 2021], batch_size=500))
+    assert all(len(batch) <= 500 for batch in batches)
+    ids = np.concatenate([batch['id'].values for batch in batches])
+    assert sorted(ids) == sorted(df.loc[df['season'] != 2020, 'id'])
+
+def test_reconverts_when_csv_changes(matches_csv):
+    """A newer CSV replaces the cached Parquet copy"""
+    path, df = matches_csv
+    assert len(dataset.load(path)) == len(df)
+    df.iloc[:10].to_csv(path, index=False)
+    os.utime(path, (os.path.getmtime(path) + 10,) * 2)
+    assert len(dataset.load(path)) == 10
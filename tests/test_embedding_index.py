@@ -0,0 +1,67 @@
+import pytest
+import numpy as np
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.advanced.embedding_index import EmbeddingIndex, IVFIndex
+
+@pytest.fixture
+def embeddings():
+    """Clustered embeddings keyed by player id"""
+    rng = np.random.RandomState(0)
+    centers = rng.normal(size=(20, 16))
+    vectors = centers[rng.randint(0, 20, 2000)] + rng.normal(scale=0.5, size=(2000, 16))
+    return [f"player{i}" for i in range(2000)], vectors
+
+def brute_force(ids, vectors, player_id, top_k):
+    target = vectors[ids.index(player_id)]
+    scores = vectors @ target / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(target))
+    order = [row for row in np.argsort(-scores) if ids[row] != player_id][:top_k]
+    return [(ids[row], scores[row]) for row in order]
+
+def assert_same_neighbours(result, expected):
+    assert [pid for pid, _ in result] == [pid for pid, _ in expected]
+    np.testing.assert_allclose([score for _, score in result], [score for _, score in expected], rtol=1e-5)
+
+def test_exact_index_matches_brute_force(embeddings):
+    """Cosine top-k from the normalized matrix equals the pairwise computation"""
+    ids, vectors = embeddings
+    index = EmbeddingIndex(ids, vectors)
+    assert index.vectors.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(index.vectors, axis=1), 1.0, rtol=1e-5)
+
+    for player_id in ['player0', 'player17', 'player1999']:
+        assert_same_neighbours(index.similar(player_id, top_k=5), brute_force(ids, vectors, player_id, 5))
+
+    batch = index.similar_batch(['player0', 'player17'], top_k=5)
+    assert_same_neighbours(batch['player0'], index.similar('player0', top_k=5))
+    with pytest.raises(ValueError):
+        index.similar('unknown')
+
+def test_from_dict_and_search_vectors(embeddings):
+    """Dict input keeps ids, and raw vectors can be searched directly"""
+    ids, vectors = embeddings
+    index = EmbeddingIndex.from_dict(dict(zip(ids[:100], vectors[:100])))
+    rows, scores = index.search(vectors[:3], k=1)
+    assert rows[:, 0].tolist() == [0, 1, 2]
+    np.testing.assert_allclose(scores[:, 0], 1.0, rtol=1e-5)
+
+def test_ivf_recall(embeddings):
+    """Probing a few cells recovers nearly all exact neighbours; probing all is exact"""
+    ids, vectors = embeddings
+    exact = EmbeddingIndex(ids, vectors)
+    ivf = IVFIndex(ids, vectors, n_probe=8)
+    queries = ids[:100]
+    truth = exact.similar_batch(queries, top_k=10)
+
+    approx = ivf.similar_batch(queries, top_k=10)
+    recall = np.mean([len({p for p, _ in truth[q]} & {p for p, _ in approx[q]}) / 10 for q in queries])
+    assert recall > 0.9
+
+    ivf.n_probe = ivf.n_lists
+    for q, result in ivf.similar_batch(queries[:5], top_k=10).items():
+        assert_same_neighbours(result, truth[q])
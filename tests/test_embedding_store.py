@@ -0,0 +1,79 @@
+import pytest
+import numpy as np
+import pandas as pd
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.advanced.embedding_index import EmbeddingIndex
+from backend.advanced.embedding_store import EmbeddingStore, save_embeddings, KEEP_VERSIONS
+
+@pytest.fixture
+def embeddings():
+    """Random embeddings keyed by player id"""
+    rng = np.random.RandomState(0)
+    return [f"player{i}" for i in range(200)], rng.normal(size=(200, 8))
+
+def test_store_serves_memory_mapped_index(embeddings, tmp_path):
+    """The served index is mapped from disk and matches an in-memory index"""
+    ids, vectors = embeddings
+    store = EmbeddingStore(str(tmp_path))
+    assert store.index() is None
+
+    save_embeddings(str(tmp_path), ids, vectors)
+    index = store.index()
+    assert isinstance(index.vectors, np.memmap)
+    expected = EmbeddingIndex(ids, vectors).similar('player3', top_k=5)
+    result = index.similar('player3', top_k=5)
+    assert [pid for pid, _ in result] == [pid for pid, _ in expected]
+    np.testing.assert_allclose([s for _, s in result], [s for _, s in expected], rtol=1e-5)
+    assert store.index() is index
+
+def test_store_swaps_to_new_version(embeddings, tmp_path):
+    """A later save is picked up by the next lookup and old versions are pruned"""
+    ids, vectors = embeddings
+    store = EmbeddingStore(str(tmp_path))
+    save_embeddings(str(tmp_path), ids, vectors)
+    first = store.index()
+
+    for _ in range(KEEP_VERSIONS + 1):
+        save_embeddings(str(tmp_path), ids[:50], vectors[:50])
+    assert len(store.index()) == 50
+    assert store.index() is not first
+    assert len([name for name in os.listdir(tmp_path) if os.path.isdir(tmp_path / name)]) == KEEP_VERSIONS
+
+def test_save_model_materializes_embeddings(tmp_path):
+    """Saving a trained model with player data writes the served store"""
+    from backend.advanced.player_embeddings import PlayerEmbeddings
+
+    rng = np.random.RandomState(0)
+    players = pd.DataFrame(rng.normal(size=(100, 6)), index=[f"player{i}" for i in range(100)])
+    model = PlayerEmbeddings(embedding_dim=4)
+    model.train_model(players, epochs=2, verbose=False)
+    model.save_model(str(tmp_path), players)
+
+    index = EmbeddingStore(str(tmp_path / 'index')).index()
+    assert len(index) == 100
+    np.testing.assert_allclose(index.vector('player7'), EmbeddingIndex(players.index, model.encode(players)).vector('player7'),
+                               rtol=1e-5, atol=1e-6)
+
+def test_store_is_keyed_by_player_id(tmp_path):
+    """Per-match stat rows are keyed by player_id and averaged, not by row number"""
+    from backend.advanced.player_embeddings import PlayerEmbeddings
+
+    rng = np.random.RandomState(0)
+    stats = pd.DataFrame(rng.normal(size=(60, 4)), columns=['goals', 'assists', 'shots', 'passes'])
+    stats.insert(0, 'player_id', [f"player{i % 20}" for i in range(60)])
+    model = PlayerEmbeddings(embedding_dim=3)
+    model.train_model(stats, epochs=2, verbose=False)
+    assert 'player_id' not in model.feature_names
+    model.save_model(str(tmp_path), stats)
+
+    index = EmbeddingStore(str(tmp_path / 'index')).index()
+    assert sorted(index.ids) == sorted(f"player{i}" for i in range(20))
+    rows = stats[stats['player_id'] == 'player7']
+    expected = model.encode(rows).mean(axis=0)
+    np.testing.assert_allclose(index.vector('player7'), expected / np.linalg.norm(expected), rtol=1e-5, atol=1e-6)
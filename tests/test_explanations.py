@@ -0,0 +1,97 @@
+import pytest
+import numpy as np
+import os
+import sys
+from types import SimpleNamespace
+from lightgbm import LGBMClassifier
+from sklearn.ensemble import StackingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.neural_network import MLPClassifier
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.advanced.explanations import ExplanationCache, explain_stacking, head_shap_values, sample_background
+
+@pytest.fixture
+def stacked_model():
+    """Small stacking ensemble with tree, neural and linear members"""
+    rng = np.random.RandomState(0)
+    X = rng.normal(size=(200, 4))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int)
+    model = StackingClassifier(
+        estimators=[
+            ('rf', RandomForestClassifier(n_estimators=10, random_state=0)),
+            ('lgbm', LGBMClassifier(n_estimators=10, verbose=-1)),
+            ('mlp', MLPClassifier(max_iter=50, random_state=0)),
+        ],
+        final_estimator=LogisticRegression(),
+        cv=3
+    )
+    model.fit(X, y)
+    return model, X
+
+def test_explainer_per_model_type(stacked_model):
+    """Linear SHAP for the head, TreeExplainer for trees, others skipped"""
+    model, X = stacked_model
+    background = sample_background(X, 50)
+    explanation = explain_stacking(model, ['a', 'b', 'c', 'd'], X[:20], background)
+
+    assert explanation['head']['explainer'] == 'linear'
+    assert set(explanation['base_models']) == {'rf', 'lgbm'}
+    assert explanation['skipped'] == ['mlp']
+
+    # Linear SHAP is exact: values plus the expected value give the head's log-odds
+    head = explanation['head']
+    margin = model.final_estimator_.decision_function(model.transform(X[:20]))
+    np.testing.assert_allclose(head['values'].sum(1) + head['expected_value'], margin, atol=1e-8)
+
+def test_cache_serves_precomputed_results(stacked_model, tmp_path):
+    """Background results are looked up per row and summarised per version"""
+    model, X = stacked_model
+    meta_model = SimpleNamespace(meta_model=model, feature_columns=['a', 'b', 'c', 'd'])
+    cache = ExplanationCache(cache_dir=str(tmp_path), background_size=50, max_rows=500)
+
+    assert cache.schedule('v1', meta_model, X)
+    assert not cache.schedule('v1', meta_model, X)
+    cache.wait(timeout=60)
+    assert cache.status('v1') == 'ready'
+
+    summary = cache.get_summary()
+    assert summary['version'] == 'v1'
+    assert set(summary['summary']['feature_importance']) == {'a', 'b', 'c', 'd'}
+
+    values = cache.get_row_values('v1', np.vstack([X[:5], np.full((1, 4), 99.0)]))
+    assert not np.isnan(values[:5]).any()
+    assert np.isnan(values[5]).all()
+
+    # A fresh cache reads the persisted version from disk
+    reloaded = ExplanationCache(cache_dir=str(tmp_path))
+    assert reloaded.status('v1') == 'ready'
+    assert reloaded.get_summary('v1')['n_rows'] == len(X)
+
+def test_cache_without_directory_stays_in_memory(stacked_model, tmp_path, monkeypatch):
+    """No cache_dir means results are served from memory and nothing is written"""
+    model, X = stacked_model
+    meta_model = SimpleNamespace(meta_model=model, feature_columns=['a', 'b', 'c', 'd'])
+    monkeypatch.chdir(tmp_path)
+    cache = ExplanationCache(cache_dir=None, background_size=50, max_rows=500)
+
+    assert cache.schedule('v1', meta_model, X)
+    cache.wait(timeout=60)
+    assert cache.status('v1') == 'ready'
+    assert cache.get_summary('v1')['n_rows'] == len(X)
+    assert list(tmp_path.iterdir()) == []
+
+def test_head_shap_for_unseen_rows(stacked_model):
+    """Head SHAP is computed for any input, not only rows in the explained sample"""
+    model, X = stacked_model
+    reference = model.transform(sample_background(X, 50)).mean(axis=0)
+    unseen = np.full((3, 4), 99.0)
+
+    head = head_shap_values(model, unseen, reference)
+    assert head['values'].shape == (3, len(head['feature_names']))
+    assert not np.isnan(head['values']).any()
+    margin = model.final_estimator_.decision_function(model.transform(unseen))
+    np.testing.assert_allclose(head['values'].sum(1) + head['expected_value'], margin, atol=1e-8)
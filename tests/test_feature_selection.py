@@ -0,0 +1,82 @@
+import pytest
+import json
+import numpy as np
+import pandas as pd
+import os
+import sys
+from sklearn.ensemble import RandomForestClassifier
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.model_training.feature_selection import FeatureSelector, geometric_schedule
+
+@pytest.fixture
+def informative_data():
+    """Two informative features among eight noise columns"""
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame(rng.normal(size=(400, 10)), columns=[f"f{i}" for i in range(10)])
+    y = (X['f3'] + X['f7'] > 0).astype(int)
+    return X, y
+
+def make_selector(tmp_path, **kwargs):
+    estimator = RandomForestClassifier(n_estimators=30, random_state=0)
+    return FeatureSelector(estimator=estimator, n_jobs=1, cache_dir=str(tmp_path), **kwargs)
+
+def test_geometric_schedule():
+    """Each round drops a fraction of what remains and stops at the target"""
+    assert geometric_schedule(100, 10, 0.5) == [100, 50, 25, 12, 10]
+    assert geometric_schedule(5, 5, 0.5) == [5]
+    assert geometric_schedule(3, 1, 0.1) == [3, 2, 1]
+
+def test_permutation_selection_finds_signal(informative_data, tmp_path):
+    """Held-out permutation importance keeps the informative features"""
+    X, y = informative_data
+    selector = make_selector(tmp_path)
+    importance = selector.get_feature_importance(X, y)
+    assert set(importance) == set(X.columns)
+    assert sum(importance.values()) == pytest.approx(1.0)
+
+    selected = selector.select_features(X, y)
+    assert {'f3', 'f7'} <= set(selected)
+    assert len(selected) < len(X.columns)
+
+    top_two = make_selector(tmp_path, n_features_to_select=2).select_features(X, y)
+    assert top_two == ['f3', 'f7']
+
+def test_rfe_selection(informative_data, tmp_path):
+    """Geometric RFE keeps the requested number of features"""
+    X, y = informative_data
+    selector = make_selector(tmp_path, method='rfe', n_features_to_select=2, step=0.5)
+    assert selector.select_features(X, y) == ['f3', 'f7']
+    assert sorted(set(selector.ranking_.values())) == [1, 2, 3]
+
+def test_importance_cache_keyed_by_data(informative_data, tmp_path, monkeypatch):
+    """Unchanged data is served from the disk cache; changed data is recomputed"""
+    X, y = informative_data
+    first = make_selector(tmp_path).get_feature_importance(X, y)
+
+    import backend.model_training.feature_selection as feature_selection
+    calls = []
+    original = feature_selection.permutation_importance
+    monkeypatch.setattr(feature_selection, 'permutation_importance',
+                        lambda *args, **kwargs: calls.append(1) or original(*args, **kwargs))
+
+    assert make_selector(tmp_path).get_feature_importance(X, y) == first
+    assert calls == []
+
+    changed = X.copy()
+    changed.iloc[0, 0] += 1
+    make_selector(tmp_path).get_feature_importance(changed, y)
+    assert calls == [1]
+
+def test_save_selected_features(informative_data, tmp_path):
+    """selected_features.json indexes into the full feature order"""
+    X, y = informative_data
+    selector = make_selector(tmp_path, n_features_to_select=2)
+    selector.select_features(X, y)
+    path = selector.save(str(tmp_path / 'selected_features.json'))
+    with open(path) as f:
+        payload = json.load(f)
+    assert payload == {'selected_feature_indices': [3, 7], 'feature_order': list(X.columns)}
@@ -0,0 +1,53 @@
+import pytest
+import numpy as np
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.model_training.hyperparameter_tuning import HyperparameterTuner, TrialJournal
+
+@pytest.fixture
+def sample_data():
+    """Small nonlinear classification problem"""
+    rng = np.random.RandomState(0)
+    X = rng.normal(size=(300, 5))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int)
+    return X, y
+
+def test_successive_halving_prunes_candidates(sample_data, tmp_path):
+    """Only the best third of each rung advances to a larger budget"""
+    X, y = sample_data
+    tuner = HyperparameterTuner(estimator='lgb', n_candidates=9, n_estimators=90, min_n_estimators=10,
+                                n_jobs=1, journal_path=str(tmp_path / "journal.sqlite"))
+    best_params = tuner.tune(X, y)
+
+    rungs = [sum(1 for r in tuner.results_ if r['rung'] == rung) for rung in range(3)]
+    assert rungs == [9, 3, 1]
+    assert best_params['n_estimators'] == 90
+    assert set(best_params) >= {'num_leaves', 'learning_rate'}
+    assert tuner.best_estimator(X, y).n_estimators == 90
+
+def test_journal_resumes_and_warm_starts(sample_data, tmp_path):
+    """A repeated search reuses journaled scores and past winners seed new searches"""
+    X, y = sample_data
+    journal_path = str(tmp_path / "journal.sqlite")
+    grid = {'max_depth': [2, 3, 4], 'learning_rate': [0.05, 0.1, 0.3]}
+    first = HyperparameterTuner(estimator='xgb', n_candidates=9, n_estimators=30, n_jobs=2,
+                                journal_path=journal_path)
+    best = first.tune(X, y, param_grid=grid)
+
+    # Same data: every score comes from the journal, so no model is fit
+    resumed = HyperparameterTuner(estimator='xgb', n_candidates=9, n_estimators=30, n_jobs=1,
+                                  journal_path=journal_path)
+    assert resumed.tune(X, y, param_grid=grid) == best
+    assert resumed.best_score_ == first.best_score_
+
+    # New data: the previous winner is evaluated first
+    journal = TrialJournal(journal_path)
+    previous_best = journal.best_params('xgb', 1)[0]
+    warm = HyperparameterTuner(estimator='xgb', n_candidates=4, n_estimators=30, n_jobs=1,
+                               journal_path=journal_path)
+    assert warm._candidates(grid)[0] == previous_best
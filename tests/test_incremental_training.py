@@ -0,0 +1,56 @@
+import pytest
+import numpy as np
+import pandas as pd
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.advanced.train_predict import ModelTrainer
+
+def make_data(n_rows, seed):
+    rng = np.random.RandomState(seed)
+    data = pd.DataFrame(rng.normal(size=(n_rows, 5)), columns=[f"f{i}" for i in range(5)])
+    data['target'] = (data['f0'] + data['f1'] * data['f2'] > 0).astype(int)
+    return data
+
+@pytest.fixture
+def trained_trainer(tmp_path):
+    """ModelTrainer fit on an initial history"""
+    trainer = ModelTrainer(model_dir=str(tmp_path))
+    trainer.train_models(make_data(400, 0), 'target')
+    return trainer
+
+def test_update_models_continues_ensembles(trained_trainer):
+    """Incremental updates add trees to the existing models"""
+    before = {
+        'rf': len(trained_trainer.models['rf'].estimators_),
+        'gb': trained_trainer.models['gb'].estimators_.shape[0],
+        'xgb': trained_trainer.models['xgb'].get_booster().num_boosted_rounds(),
+        'lgb': trained_trainer.models['lgb'].booster_.num_trees(),
+    }
+    scaler_mean = trained_trainer.scaler.mean_.copy()
+
+    best_model, score = trained_trainer.update_models(make_data(200, 1), 'target', n_new_estimators=10)
+    assert best_model in ['rf', 'gb', 'xgb', 'lgb']
+    assert 0 <= score <= 1
+
+    models = trained_trainer.models
+    assert len(models['rf'].estimators_) == before['rf'] + 10
+    assert models['gb'].estimators_.shape[0] == before['gb'] + 10
+    assert models['xgb'].get_booster().num_boosted_rounds() == before['xgb'] + 10
+    assert models['lgb'].booster_.num_trees() == before['lgb'] + 10
+    # The fitted scaler is kept so old splits remain valid
+    np.testing.assert_array_equal(trained_trainer.scaler.mean_, scaler_mean)
+
+    predictions, probabilities = trained_trainer.predict(make_data(50, 2).drop(columns=['target']))
+    assert len(predictions) == 50
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+
+def test_update_models_requires_trained_models(tmp_path):
+    """Incremental mode needs models to continue from"""
+    trainer = ModelTrainer(model_dir=str(tmp_path))
+    with pytest.raises(ValueError):
+        trainer.update_models(make_data(100, 0), 'target')
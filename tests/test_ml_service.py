@@ -0,0 +1,162 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import asyncio
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.services.ml_service import MLService
+from backend.services.model_bundle import KEEP_VERSIONS, LEASE_NAME, ModelBundle, write_bundle
+
+@pytest.fixture
+def trained_service(tmp_path):
+    """Train an MLService on a small synthetic dataset"""
+    rng = np.random.RandomState(0)
+    data = pd.DataFrame(rng.normal(size=(200, 4)), columns=['f1', 'f2', 'f3', 'f4'])
+    data['target'] = (data['f1'] + 0.5 * data['f2'] > 0).astype(int)
+
+    service = MLService(model_dir=str(tmp_path))
+    service.train_models(data, 'target')
+    return service, data
+
+def test_predict_batch_matches_single(trained_service):
+    """Batch scoring returns the same outcomes and confidences as single calls"""
+    service, data = trained_service
+    feature_order = ['f1', 'f2', 'f3', 'f4']
+    rows = data[feature_order].head(25).to_dict(orient='records')
+
+    batch = service.predict_batch(rows, feature_order)
+    assert len(batch) == len(rows)
+
+    for row, (outcome, confidence, insights) in zip(rows, batch):
+        single_outcome, single_confidence, _ = service.predict(row, feature_order)
+        assert outcome == single_outcome
+        assert confidence == pytest.approx(single_confidence)
+        assert insights['confidence'] == confidence
+        assert 'feature_contributions' in insights
+
+def test_training_records_model_timings(trained_service):
+    """Each candidate's fit time is kept in the training history"""
+    service, _ = trained_service
+    timings = service.training_history[-1]['model_timings']
+    assert set(timings) == {'rf', 'gb', 'xgb', 'lgb', 'calibrated'}
+    assert all(seconds > 0 for seconds in timings.values())
+
+def test_predict_batch_empty(trained_service):
+    """An empty batch does not invoke the model"""
+    service, _ = trained_service
+    assert service.predict_batch([], ['f1', 'f2', 'f3', 'f4']) == []
+
+def test_predict_async_coalesces_requests(trained_service):
+    """Concurrent single-row requests are served by one batch"""
+    service, data = trained_service
+    feature_order = ['f1', 'f2', 'f3', 'f4']
+    rows = data[feature_order].head(20).to_dict(orient='records')
+    service.configure_batcher(window_ms=50, max_batch_size=64)
+
+    async def run():
+        return await asyncio.gather(*[service.predict_async(row, feature_order) for row in rows])
+
+    results = asyncio.run(run())
+    assert len(results) == len(rows)
+    stats = service.batcher.get_stats()
+    assert stats['total_batches'] == 1
+    assert stats['total_items'] == len(rows)
+
+def test_bundle_round_trip_is_lazy(trained_service):
+    """Loading a bundle defers estimators and serves compiled models"""
+    service, data = trained_service
+    feature_order = ['f1', 'f2', 'f3', 'f4']
+    rows = data[feature_order].head(30).to_dict(orient='records')
+    native = service.models['calibrated'].predict_proba(
+        service.scaler.transform(data[feature_order].head(30))
+    )
+
+    loaded = MLService(model_dir=service.model_dir)
+    loaded.load_models()
+    assert loaded.model_version == service.model_version
+    assert 'calibrated' in loaded.models
+    assert loaded.bundle._estimators == {}
+
+    results = loaded.predict_batch(rows, feature_order)
+    confidences = np.array([confidence for _, confidence, _ in results])
+    np.testing.assert_allclose(confidences, native.max(axis=1), rtol=0, atol=1e-6)
+    # Only the served model was materialised, and never as a full estimator
+    assert loaded.bundle._estimators == {}
+    assert set(loaded.bundle._compiled) == {'calibrated'}
+
+def test_prediction_cache_hits_and_invalidates(trained_service):
+    """Repeated rows are served from the cache until the models change"""
+    service, data = trained_service
+    feature_order = ['f1', 'f2', 'f3', 'f4']
+    rows = data[feature_order].head(10).to_dict(orient='records')
+
+    first = service.predict_batch(rows, feature_order)
+    second = service.predict_batch(rows, feature_order)
+    assert [r[:2] for r in first] == [r[:2] for r in second]
+    stats = service.prediction_cache.get_stats()
+    assert stats['hits'] == len(rows)
+    assert stats['hit_ratio'] == 0.5
+
+    service.load_models()
+    assert service.prediction_cache.get_stats()['size'] == 0
+    service.predict_batch(rows, feature_order)
+    assert service.prediction_cache.get_stats()['hits'] == len(rows)
+
+def test_insights_carry_per_row_contributions(trained_service):
+    """Each prediction gets its own path-based feature contributions"""
+    service, data = trained_service
+    feature_order = ['f1', 'f2', 'f3', 'f4']
+    rows = data[feature_order].head(5).to_dict(orient='records')
+
+    results = service.predict_batch(rows, feature_order, explain=True)
+    contributions = [insights['feature_contributions'] for _, _, insights in results]
+    assert all(set(c) == set(feature_order) for c in contributions)
+    assert contributions[0] != contributions[1]
+    assert all('contribution_base_value' in insights for _, _, insights in results)
+
+def test_contributions_are_opt_in(trained_service):
+    """Plain predictions skip the decomposition; explaining cached rows recomputes them"""
+    service, data = trained_service
+    feature_order = ['f1', 'f2', 'f3', 'f4']
+    rows = data[feature_order].head(5).to_dict(orient='records')
+
+    plain = service.predict_batch(rows, feature_order)
+    assert all('contribution_base_value' not in insights for _, _, insights in plain)
+    explained = service.predict_batch(rows, feature_order, explain=True)
+    assert all('contribution_base_value' in insights for _, _, insights in explained)
+    assert [r[0] for r in plain] == [r[0] for r in explained]
+    assert [r[1] for r in explained] == pytest.approx([r[1] for r in plain])
+
+def test_large_batches_use_native_estimator(trained_service):
+    """Compiled models serve small batches; larger ones go to the native estimator"""
+    service, _ = trained_service
+    loaded = MLService(model_dir=service.model_dir, compiled_max_rows=10)
+    loaded.load_models()
+
+    assert loaded._serving_model('calibrated', 10) is loaded.bundle.load_compiled('calibrated')
+    assert loaded._serving_model('calibrated', 11) is loaded.bundle.load_estimator('calibrated')
+
+def test_prune_keeps_versions_still_in_use(trained_service):
+    """Old versions another worker has opened survive pruning until their lease expires"""
+    service, _ = trained_service
+    old = ModelBundle.open_current(service.bundle_dir)
+    time.sleep(1.1)  # versions sort by their one-second timestamp
+    models = {'calibrated': service.models['calibrated']}
+    # Each write with a new scaler is a new version; the scaler is part of the digest
+    for i in range(KEEP_VERSIONS + 1):
+        service.scaler.mean_[0] += 1.0
+        write_bundle(service.bundle_dir, models, service.scaler)
+    assert os.path.isdir(old.path)
+    assert old.load_estimator('calibrated') is not None
+
+    # Once the lease is stale the next write removes it
+    os.utime(os.path.join(old.path, LEASE_NAME), (0, 0))
+    service.scaler.mean_[0] += 1.0
+    write_bundle(service.bundle_dir, models, service.scaler)
+    assert not os.path.isdir(old.path)
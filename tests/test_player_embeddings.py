@@ -0,0 +1,65 @@
+import pytest
+import numpy as np
+import pandas as pd
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.advanced.player_embeddings import PlayerEmbeddings
+
+@pytest.fixture
+def player_stats():
+    """Player table whose eight stats come from three latent skills"""
+    rng = np.random.RandomState(0)
+    latent = rng.normal(size=(500, 3))
+    stats = latent @ rng.normal(size=(3, 8)) + rng.normal(scale=0.05, size=(500, 8))
+    return pd.DataFrame(stats, columns=[f"stat_{i}" for i in range(8)],
+                        index=[f"player{i}" for i in range(500)])
+
+def test_autoencoder_reconstructs_and_stops_early(player_stats):
+    """Reconstruction loss falls and training stops once it plateaus"""
+    embeddings = PlayerEmbeddings(embedding_dim=4)
+    history = embeddings.train_model(player_stats, epochs=300, batch_size=64, patience=5,
+                                     num_threads=1, verbose=False)
+    assert history['val_loss'][history['best_epoch']] < history['val_loss'][0] / 2
+    assert len(history['val_loss']) < 300
+    assert history['samples_per_sec'] > 0
+
+    vectors = embeddings.get_embeddings(player_stats.iloc[:10])
+    assert list(vectors) == list(player_stats.index[:10])
+    assert all(vector.shape == (4,) for vector in vectors.values())
+
+def test_embeddings_use_training_scaler(player_stats):
+    """Embedding a subset does not refit the scaler on that subset"""
+    embeddings = PlayerEmbeddings(embedding_dim=4)
+    embeddings.train_model(player_stats, epochs=2, verbose=False)
+    full = embeddings.get_embeddings(player_stats)
+    subset = embeddings.get_embeddings(player_stats.iloc[:5])
+    for player_id, vector in subset.items():
+        np.testing.assert_allclose(vector, full[player_id], rtol=1e-5, atol=1e-6)
+
+def test_checkpoint_resume(player_stats, tmp_path):
+    """Training resumes from the saved checkpoint epoch"""
+    checkpoint = str(tmp_path / 'embeddings.pt')
+    first = PlayerEmbeddings(embedding_dim=4)
+    first.train_model(player_stats, epochs=3, patience=10, checkpoint_path=checkpoint, verbose=False)
+    assert os.path.exists(checkpoint)
+
+    resumed = PlayerEmbeddings(embedding_dim=4)
+    history = resumed.train_model(player_stats, epochs=5, patience=10, checkpoint_path=checkpoint, verbose=False)
+    assert len(history['train_loss']) == 2
+
+def test_save_and_load(player_stats, tmp_path):
+    """Saved models reproduce the same embeddings"""
+    embeddings = PlayerEmbeddings(embedding_dim=4)
+    embeddings.train_model(player_stats, epochs=2, verbose=False)
+    embeddings.save_model(str(tmp_path / 'player_embeddings'))
+
+    loaded = PlayerEmbeddings(embedding_dim=4)
+    loaded.load_model(str(tmp_path / 'player_embeddings'))
+    expected = embeddings.get_embeddings(player_stats.iloc[:3])
+    for player_id, vector in loaded.get_embeddings(player_stats.iloc[:3]).items():
+        np.testing.assert_allclose(vector, expected[player_id], rtol=1e-5, atol=1e-6)
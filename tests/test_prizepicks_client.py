@@ -0,0 +1,91 @@
+import asyncio
+import httpx
+import os
+import sys
+import threading
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.services.prizepicks_client import PrizePicksClient, PRIZEPICKS_APP_URL
+
+API_URL = "https://api.prizepicks.com/projections"
+
+class Upstream:
+    """Records requests; the app URL sets a session cookie, the API needs it"""
+
+    def __init__(self, cookie_max_age=3600):
+        self.requests = []
+        self.cookie_max_age = cookie_max_age
+        self.reject_next = False
+
+    def __call__(self, request):
+        self.requests.append(str(request.url.copy_with(query=None)))
+        if str(request.url) == PRIZEPICKS_APP_URL:
+            return httpx.Response(200, headers={'set-cookie': f"session=abc; Max-Age={self.cookie_max_age}; Path=/; Domain=.prizepicks.com"})
+        if self.reject_next or 'session=abc' not in request.headers.get('cookie', ''):
+            self.reject_next = False
+            return httpx.Response(403)
+        return httpx.Response(200, json={'data': []})
+
+def test_warms_once_and_pools_requests():
+    """Concurrent calls share one warm-up, so upstream requests are about one per call"""
+    upstream = Upstream()
+    client = PrizePicksClient(transport=httpx.MockTransport(upstream))
+
+    async def run():
+        responses = await asyncio.gather(*[client.get(API_URL, 'projections') for _ in range(20)])
+        await client.aclose()
+        return responses
+
+    responses = asyncio.run(run())
+    assert all(response.status_code == 200 for response in responses)
+    assert upstream.requests.count(PRIZEPICKS_APP_URL) == 1
+    assert len(upstream.requests) == 21
+    stats = client.get_stats()
+    assert stats['warmups'] == 1
+    assert stats['endpoints']['projections']['requests'] == 20
+    assert stats['endpoints']['projections']['latency_ms_p95'] >= 0
+
+def test_rewarms_on_expiry_and_rejection():
+    """Expired cookies and 403 responses trigger a fresh warm-up"""
+    upstream = Upstream()
+    client = PrizePicksClient(transport=httpx.MockTransport(upstream), cookie_ttl=0)
+
+    async def run():
+        await client.get(API_URL, 'projections')
+        await client.get(API_URL, 'projections')
+        client.cookie_ttl = 3600
+        upstream.reject_next = True
+        response = await client.get(API_URL, 'projections')
+        await client.aclose()
+        return response
+
+    assert asyncio.run(run()).status_code == 200
+    assert client.warmups == 3
+    assert client.get_stats()['endpoints']['projections']['requests'] == 4
+
+def test_loop_change_closes_previous_client():
+    """A client created on another, still running loop is closed there, not leaked"""
+    client = PrizePicksClient(transport=httpx.MockTransport(Upstream()))
+    other_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        asyncio.run_coroutine_threadsafe(client.get(API_URL, 'projections'), other_loop).result(10)
+        previous = client._client
+
+        async def run():
+            response = await client.get(API_URL, 'projections')
+            await client.aclose()
+            return response
+
+        assert asyncio.run(run()).status_code == 200
+        # The close runs on the other loop; wait for it to get there
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), other_loop).result(10)
+        assert previous.is_closed
+    finally:
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join(10)
+        other_loop.close()
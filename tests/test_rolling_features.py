@@ -0,0 +1,83 @@
+import pytest
+import numpy as np
+import pandas as pd
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.model_training.rolling_features import rolling_features
+from backend.advanced.train_predict import time_series_features
+
+@pytest.fixture
+def matches():
+    """Shuffled team-match rows with missing values and repeated teams"""
+    rng = np.random.RandomState(0)
+    n = 2000
+    df = pd.DataFrame({
+        'team': rng.choice(['a', 'b', 'c', 'd', 'e'], n),
+        'match_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.permutation(n) * 2, unit='D'),
+        'goals': rng.poisson(1.5, n).astype(float),
+        'result': rng.choice([-1, 0, 1], n),
+    })
+    df.loc[rng.rand(n) < 0.05, 'goals'] = np.nan
+    return df
+
+def test_matches_pandas_groupby(matches):
+    """Windows, EWMAs and rest days agree with pandas on the caller's index"""
+    features = rolling_features(matches, 'team', 'match_date', ['goals'], windows=[3, 20], ewm_spans=[5],
+                                rest_days=True)
+    ordered = matches.sort_values(['team', 'match_date'])
+    grouped = ordered.groupby('team')['goals']
+
+    for window in [3, 20]:
+        expected = grouped.rolling(window, min_periods=1).mean().reset_index(level=0, drop=True)
+        np.testing.assert_allclose(features.loc[expected.index, f'goals_mean_{window}'], expected)
+    expected = grouped.transform(lambda x: x.ewm(span=5).mean())
+    np.testing.assert_allclose(features.loc[expected.index, 'goals_ewm_5'], expected)
+    expected = ordered.groupby('team')['match_date'].diff().dt.days
+    np.testing.assert_allclose(features.loc[expected.index, 'rest_days'], expected)
+
+def test_streaks_run_length():
+    """Streaks count the current run per team and reset on draws and other outcomes"""
+    df = pd.DataFrame({
+        'team': ['x'] * 6 + ['y'] * 3,
+        'match_date': list(range(6)) + list(range(3)),
+        'result': [1, 1, 0, 1, -1, -1, -1, 1, 1],
+    })
+    features = rolling_features(df, 'team', 'match_date', [], result_col='result')
+    assert features['win_streak'].tolist() == [1, 2, 0, 1, 0, 0, 0, 1, 2]
+    assert features['loss_streak'].tolist() == [0, 0, 0, 0, 1, 2, 1, 0, 0]
+
+def test_time_series_features():
+    """Legacy columns come from the engine, with a real win streak"""
+    df = pd.DataFrame({
+        'team': ['x', 'x', 'x', 'y'],
+        'match_date': pd.to_datetime(['2024-01-03', '2024-01-01', '2024-01-02', '2024-01-01']),
+        'goals': [3.0, 1.0, 2.0, 4.0],
+        'win': [1, 0, 1, 1],
+    })
+    result = time_series_features(df, window=3)
+    assert result['avg_goals_last_5'].tolist() == [1.0, 1.5, 2.0, 4.0]
+    assert result['win_streak'].tolist() == [0, 1, 2, 1]
+
+def test_time_series_features_string_dates():
+    """CSV-style string dates are parsed; frames shorter than the window get empty features"""
+    df = pd.DataFrame({
+        'team': ['x'] * 5 + ['y'],
+        'match_date': ['2024-01-10', '2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05', '2024-01-01'],
+        'goals': [5.0, 1.0, 2.0, 3.0, 4.0, 4.0],
+        'win': [1, 0, 1, 1, 1, 1],
+    })
+    result = time_series_features(df)
+    assert result['avg_goals_last_5'].tolist() == [1.0, 1.5, 2.0, 2.5, 3.0, 4.0]
+    assert result['win_streak'].tolist() == [0, 1, 2, 3, 4, 1]
+
+    short = time_series_features(df.head(3))
+    assert short['avg_goals_last_5'].isna().all()
+    assert (short['win_streak'] == 0).all()
+
+    features = rolling_features(df, 'team', 'match_date', ['goals'], windows=[2], ewm_spans=[], rest_days=True)
+    np.testing.assert_allclose(features['rest_days'], [5.0, np.nan, 1.0, 1.0, 1.0, np.nan])
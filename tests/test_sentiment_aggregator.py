@@ -0,0 +1,71 @@
+import pytest
+import numpy as np
+import os
+import sys
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.advanced.sentiment_aggregator import SentimentAggregator
+
+NOW = datetime(2025, 6, 1, 12).timestamp()
+
+class RecordingStore:
+    """Collects written snapshot batches"""
+
+    def __init__(self):
+        self.batches = []
+
+    def write_snapshots(self, snapshots, source):
+        self.batches.append([snapshot['team'] for snapshot in snapshots])
+
+@pytest.fixture
+def posts():
+    """Scored posts spread over the last two days, in arrival order"""
+    rng = np.random.RandomState(0)
+    ages = rng.uniform(0, 48 * 3600, 200)
+    return [{'text': f"post {i}", 'created_at': NOW - age,
+             'vader_score': float(rng.uniform(-1, 1)), 'transformer_score': float(rng.uniform(-1, 1))}
+            for i, age in enumerate(ages)]
+
+def batch_summary(posts, now, decay_hours=24):
+    values = np.array([p['vader_score'] * 0.4 + p['transformer_score'] * 0.6 for p in posts])
+    weights = np.exp(-(now - np.array([p['created_at'] for p in posts])) / (decay_hours * 3600))
+    mean = np.average(values, weights=weights)
+    std = np.sqrt(np.average((values - mean) ** 2, weights=weights))
+    return (mean + 1) / 2, 1 - min(std, 1), weights.sum()
+
+def test_streaming_matches_batch_computation(posts):
+    """Incremental updates over several polls equal recomputing over all posts"""
+    aggregator = SentimentAggregator(flush_size=100)
+    for start in range(0, len(posts), 50):
+        aggregator.update('Arsenal', posts[start:start + 50], now=NOW)
+    # Re-polled posts are not counted twice
+    aggregator.update('Arsenal', posts[:20], now=NOW)
+
+    snapshot = aggregator.snapshot('Arsenal', now=NOW + 3600)
+    score, confidence, volume = batch_summary(posts, NOW + 3600)
+    assert snapshot['overall_score'] == pytest.approx(score)
+    assert snapshot['confidence'] == pytest.approx(confidence)
+    assert snapshot['volume'] == round(volume)
+
+def test_unknown_team_is_neutral():
+    """Teams without posts report the neutral score"""
+    aggregator = SentimentAggregator()
+    assert aggregator.snapshot('Chelsea')['overall_score'] == 0.5
+    assert aggregator.snapshot('Chelsea')['updated_at'] is None
+
+def test_snapshots_flush_in_batches(posts):
+    """Snapshots are queued per team and written once the batch fills"""
+    store = RecordingStore()
+    aggregator = SentimentAggregator(store=store, flush_size=3, flush_seconds=3600)
+    aggregator.update('Arsenal', posts[:10], now=NOW)
+    aggregator.update('Arsenal', posts[10:20], now=NOW)
+    aggregator.update('Chelsea', posts[20:30], now=NOW)
+    assert store.batches == []
+
+    aggregator.update('Spurs', posts[30:40], now=NOW)
+    assert store.batches == [['Arsenal', 'Chelsea', 'Spurs']]
+    assert aggregator.flush() == 0
@@ -0,0 +1,80 @@
+import pytest
+import asyncio
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.services.sentiment_cache import StaleWhileRevalidateCache
+
+@pytest.fixture
+def clock():
+    """Controllable clock, advanced by the tests"""
+    return [1000.0]
+
+def make_loader(calls, delay=0.0):
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return len(calls)
+    return loader
+
+def test_concurrent_misses_share_one_load(clock):
+    """Many callers of a cold key wait on a single load"""
+    async def run():
+        cache = StaleWhileRevalidateCache(fresh_seconds=10, stale_seconds=60, clock=lambda: clock[0])
+        calls = []
+        values = await asyncio.gather(*[cache.get('lakers', make_loader(calls, 0.01)) for _ in range(30)])
+        return cache, calls, values
+
+    cache, calls, values = asyncio.run(run())
+    assert calls == [1] and values == [1] * 30
+    assert cache.stats()['misses'] == 30
+
+def test_stale_value_served_while_refreshing(clock):
+    """After the fresh window the old value is returned at once and refreshed in the background"""
+    async def run():
+        cache = StaleWhileRevalidateCache(fresh_seconds=10, stale_seconds=60, clock=lambda: clock[0])
+        calls = []
+        loader = make_loader(calls)
+        first = await cache.get('lakers', loader)
+        clock[0] += 5
+        fresh = await cache.get('lakers', loader)
+        clock[0] += 10
+        stale = await cache.get('lakers', loader)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        refreshed = await cache.get('lakers', loader)
+        clock[0] += 100
+        expired = await cache.get('lakers', loader)
+        return first, fresh, stale, refreshed, expired, cache
+
+    first, fresh, stale, refreshed, expired, cache = asyncio.run(run())
+    assert (first, fresh, stale, refreshed, expired) == (1, 1, 1, 2, 3)
+    assert cache.stats()['refreshes'] == 1
+
+def test_failed_loads_are_not_cached(clock):
+    """A loader error reaches the caller and the next call retries"""
+    async def failing():
+        raise RuntimeError("reddit down")
+
+    async def run():
+        cache = StaleWhileRevalidateCache(clock=lambda: clock[0])
+        with pytest.raises(RuntimeError):
+            await cache.get('lakers', failing)
+        return await cache.get('lakers', make_loader([]))
+
+    assert asyncio.run(run()) == 1
+
+def test_lru_bound(clock):
+    """The cache keeps at most max_size topics"""
+    async def run():
+        cache = StaleWhileRevalidateCache(max_size=2, clock=lambda: clock[0])
+        for topic in ['a', 'b', 'c']:
+            await cache.get(topic, make_loader([]))
+        return cache
+
+    cache = asyncio.run(run())
+    assert cache.peek('a') is None and cache.stats()['size'] == 2
@@ -0,0 +1,71 @@
+import pytest
+import numpy as np
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.advanced.sentiment_scoring import score_posts, score_texts, transformer_scores
+
+class RecordingPipeline:
+    """Pipeline-shaped callable that records each batch call; sentiment follows a keyword"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, batch_size, truncation, max_length):
+        self.calls.append({'n': len(texts), 'lengths': [len(t) for t in texts], 'truncation': truncation})
+        return [{'label': 'POSITIVE' if 'win' in text else 'NEGATIVE', 'score': 0.9} for text in texts]
+
+class KeywordVader:
+    """VADER-shaped analyzer returning a compound score per keyword"""
+
+    def polarity_scores(self, text):
+        return {'compound': 0.5 if 'win' in text else -0.5}
+
+@pytest.fixture
+def texts():
+    """Posts of varied length with a repeated post"""
+    return ["big win today", "loss", "another win for the side at home", "loss", "draw"]
+
+def test_scores_keep_input_order(texts):
+    """One length-sorted batched call, truncated, with scores mapped back to input order"""
+    transformer = RecordingPipeline()
+    scores = transformer_scores(transformer, texts, batch_size=2)
+    np.testing.assert_allclose(scores, [0.9, -0.9, 0.9, -0.9, -0.9])
+    assert len(transformer.calls) == 1
+    assert transformer.calls[0]['lengths'] == sorted(transformer.calls[0]['lengths'])
+    assert transformer.calls[0]['truncation']
+
+def test_duplicates_scored_once(texts):
+    """Repeated texts are scored once and the posts get both scores"""
+    transformer = RecordingPipeline()
+    stats = score_texts(texts, transformer, KeywordVader())
+    assert stats['unique'] == 4 and transformer.calls[0]['n'] == 4
+    np.testing.assert_allclose(stats['vader_score'], [0.5, -0.5, 0.5, -0.5, -0.5])
+    assert stats['posts_per_sec'] > 0
+
+    posts = [{'text': text} for text in texts]
+    score_posts(posts, texts, transformer, KeywordVader())
+    assert posts[0] == {'text': texts[0], 'vader_score': 0.5, 'transformer_score': pytest.approx(0.9)}
+
+def test_empty_input():
+    """No posts means no forward passes"""
+    transformer = RecordingPipeline()
+    assert score_texts([], transformer, KeywordVader())['posts'] == 0
+    assert transformer.calls == []
+
+def test_near_duplicates_skip_inference():
+    """With a duplicate filter, reposted variants reuse the original's scores"""
+    from backend.advanced.text_dedup import DuplicateFilter
+
+    texts = ["huge win for the lakers tonight in overtime thriller",
+             "RT @fan: huge win for the lakers tonight in overtime thriller",
+             "ugly loss for the celtics at home again"]
+    transformer = RecordingPipeline()
+    stats = score_texts(texts, transformer, KeywordVader(), topics='nba', dedup=DuplicateFilter())
+    assert transformer.calls[0]['n'] == 2
+    assert stats['saved'] == 1
+    np.testing.assert_allclose(stats['transformer_score'], [0.9, 0.9, -0.9])
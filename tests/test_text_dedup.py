@@ -0,0 +1,68 @@
+import pytest
+import numpy as np
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.advanced.text_dedup import DuplicateFilter, NearDuplicateIndex, minhash_signatures, normalize_text
+
+ORIGINAL = "Lakers cover the spread tonight, LeBron and AD both cleared from the injury report"
+
+@pytest.fixture
+def texts():
+    """An original post, its retweet and cross-post variants, and an unrelated post"""
+    return [
+        ORIGINAL,
+        f"RT @picks: {ORIGINAL} https://t.co/xyz",
+        f"{ORIGINAL}!! #NBA",
+        "Celtics bench has been awful on the road, fading them against the number",
+    ]
+
+def test_normalization_strips_retweet_noise():
+    """Retweet prefixes, links and hashtags do not change the normalized text"""
+    assert normalize_text(f"RT @picks: {ORIGINAL} https://t.co/xyz") == normalize_text(ORIGINAL)
+
+def test_signatures_estimate_similarity(texts):
+    """Variants share most signature slots; unrelated text shares almost none"""
+    signatures = minhash_signatures(texts)
+    assert signatures.shape == (4, 64)
+    assert np.mean(signatures[0] == signatures[1]) == 1.0
+    assert np.mean(signatures[0] == signatures[2]) > 0.7
+    assert np.mean(signatures[0] == signatures[3]) < 0.2
+
+def test_filter_scores_each_cluster_once_across_polls(texts):
+    """Near duplicates reuse the first score, in the same poll and in later ones"""
+    dedup = DuplicateFilter()
+    calls = []
+
+    def scorer(unique):
+        calls.append(list(unique))
+        return np.arange(len(unique), dtype=float) + 10 * len(calls)
+
+    first = dedup.score('lakers', texts, scorer)
+    assert calls == [[texts[0], texts[3]]]
+    assert first['scores'].tolist() == [10.0, 10.0, 10.0, 11.0]
+    assert (first['scored'], first['saved']) == (2, 2)
+    assert first['new'].tolist() == [True, False, False, True]
+
+    second = dedup.score('lakers', [texts[2], "Warriors starters resting on the back end of a back to back"], scorer)
+    assert second['scores'].tolist() == [10.0, 20.0]
+
+    # Topics keep separate indexes
+    other = dedup.score('celtics', [texts[0]], scorer)
+    assert other['scored'] == 1
+
+def test_index_evicts_oldest_items():
+    """The index never holds more than its capacity"""
+    index = NearDuplicateIndex(capacity=2)
+    signatures = minhash_signatures(["first post about the lakers game", "second about the celtics",
+                                     "third about warriors trade rumors"])
+    first = index.add(signatures[0])
+    for signature in signatures[1:]:
+        index.add(signature)
+    assert len(index) == 2
+    assert first not in index
+    assert index.query(signatures[0]) is None
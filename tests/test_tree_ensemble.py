@@ -0,0 +1,96 @@
+import pytest
+import numpy as np
+import os
+import sys
+import lightgbm as lgb
+from xgboost import XGBClassifier
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.advanced.tree_ensemble import compile_ensemble, compile_models
+
+@pytest.fixture
+def sample_data():
+    """Create a small nonlinear classification problem"""
+    rng = np.random.RandomState(0)
+    X = rng.normal(size=(400, 6))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int)
+    return X, y
+
+@pytest.mark.parametrize("model", [
+    RandomForestClassifier(n_estimators=20, random_state=42),
+    GradientBoostingClassifier(n_estimators=20, random_state=42),
+    XGBClassifier(n_estimators=20, random_state=42),
+    lgb.LGBMClassifier(n_estimators=20, random_state=42, verbose=-1),
+])
+def test_compiled_matches_native(sample_data, model):
+    """Compiled ensembles reproduce native probabilities"""
+    X, y = sample_data
+    model.fit(X, y)
+    flat = compile_ensemble(model)
+
+    native = model.predict_proba(X)
+    compiled = flat.predict_proba(X)
+    assert compiled.shape == native.shape
+    np.testing.assert_allclose(compiled, native, rtol=0, atol=1e-6)
+    assert np.array_equal(flat.predict(X), model.predict(X))
+
+@pytest.mark.parametrize("model", [
+    XGBClassifier(n_estimators=20, random_state=42),
+    lgb.LGBMClassifier(n_estimators=20, random_state=42, verbose=-1),
+])
+def test_compiled_handles_missing_values(sample_data, model):
+    """Missing values follow the learned default direction"""
+    X, y = sample_data
+    X = X.copy()
+    X[::7, 1] = np.nan
+    model.fit(X, y)
+
+    np.testing.assert_allclose(compile_ensemble(model).predict_proba(X), model.predict_proba(X),
+                               rtol=0, atol=1e-6)
+
+def test_multiclass_boosting():
+    """Multiclass boosted models use one tree per class"""
+    rng = np.random.RandomState(1)
+    X = rng.normal(size=(300, 4))
+    y = np.digitize(X[:, 0] + X[:, 1], [-0.5, 0.5])
+    for model in (GradientBoostingClassifier(n_estimators=10, random_state=0),
+                  XGBClassifier(n_estimators=10, random_state=0),
+                  lgb.LGBMClassifier(n_estimators=10, random_state=0, verbose=-1)):
+        model.fit(X, y)
+        np.testing.assert_allclose(compile_ensemble(model).predict_proba(X), model.predict_proba(X),
+                                   rtol=0, atol=1e-6)
+
+def test_compile_models_skips_unsupported(sample_data):
+    """Models that are not tree ensembles are left out"""
+    from sklearn.linear_model import LogisticRegression
+    X, y = sample_data
+    models = {
+        'rf': RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y),
+        'lr': LogisticRegression().fit(X, y),
+    }
+    assert set(compile_models(models)) == {'rf'}
+
+@pytest.mark.parametrize("model", [
+    RandomForestClassifier(n_estimators=20, random_state=42),
+    GradientBoostingClassifier(n_estimators=20, random_state=42),
+    XGBClassifier(n_estimators=20, random_state=42),
+    lgb.LGBMClassifier(n_estimators=20, random_state=42, verbose=-1),
+])
+def test_contributions_decompose_prediction(sample_data, model):
+    """Bias plus per-feature path deltas add up to the raw prediction"""
+    X, y = sample_data
+    model.fit(X, y)
+    flat = compile_ensemble(model)
+
+    bias, contribs = flat.contributions(X)
+    assert contribs.shape == (len(X), X.shape[1], flat.n_outputs)
+    np.testing.assert_allclose(bias + contribs.sum(axis=1), flat.raw_predict(X), rtol=0, atol=1e-5)
+
+    proba, _, _ = flat.explain(X)
+    np.testing.assert_allclose(proba, model.predict_proba(X), rtol=0, atol=1e-6)
+    # Contributions vary per row, unlike global importances
+    assert not np.allclose(contribs[0], contribs[1])
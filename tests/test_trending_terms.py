@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+import os
+import sys
+from collections import Counter
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import custom modules
+from backend.advanced.trending_terms import CountMinSketch, TopicTrends, TrendingTerms, tokenize
+
+NOW = 1_700_000_000.0
+
+@pytest.fixture
+def zipf_terms():
+    """Term stream with a Zipf-distributed vocabulary of 5,000 terms"""
+    rng = np.random.RandomState(0)
+    ranks = np.minimum(rng.zipf(1.3, 50000), 5000)
+    return [f"term{rank}" for rank in ranks]
+
+def test_tokenize_drops_stop_words_and_links():
+    """Short words, stop words and URLs are not terms"""
+    assert tokenize("The Lakers would've covered, see https://t.co/abc THEY really cover") == \
+        ['lakers', "would've", 'covered', 'cover']
+
+def test_count_min_never_underestimates(zipf_terms):
+    """Sketch estimates are upper bounds on the true counts"""
+    sketch = CountMinSketch(width=512, depth=4)
+    counts = Counter(zipf_terms)
+    terms = list(counts)
+    sketch.add(terms, np.array([counts[t] for t in terms], dtype=float))
+    assert (sketch.estimate(terms) >= np.array([counts[t] for t in terms])).all()
+
+def test_heavy_hitters_match_exact_counts(zipf_terms):
+    """Bounded counters recover the exact top terms of a long stream"""
+    trends = TopicTrends(capacity=100, now=NOW)
+    for start in range(0, len(zipf_terms), 1000):
+        trends.add(zipf_terms[start:start + 1000], now=NOW)
+    assert len(trends.counts) == 100
+
+    exact = [term for term, _ in Counter(zipf_terms).most_common(10)]
+    top = trends.top_k(10, now=NOW)
+    assert [term for term, _ in top] == exact
+    assert top[0][1] == pytest.approx(Counter(zipf_terms)[exact[0]])
+
+def test_old_terms_decay():
+    """A burst of newer mentions overtakes a larger but older burst"""
+    trends = TopicTrends(capacity=10, half_life_hours=1, now=NOW)
+    trends.add(['injury'] * 100, now=NOW)
+    trends.add(['trade'] * 30, now=NOW + 3 * 3600)
+    top = trends.top_k(2, now=NOW + 3 * 3600)
+    assert [term for term, _ in top] == ['trade', 'injury']
+    assert top[1][1] == pytest.approx(100 / 8)
+
+def test_topics_are_bounded():
+    """Least recently updated topics are dropped beyond max_topics"""
+    trending = TrendingTerms(max_topics=2)
+    for topic in ['lakers', 'celtics', 'warriors']:
+        trending.update(topic, [f"{topic} playoff push continues"], now=NOW)
+    assert trending.top_k('lakers') == []
+    assert trending.top_k('warriors', 2) == ['warriors', 'playoff']